@@ -4,6 +4,9 @@ setlocal
 
 echo Starting GUI build with PyInstaller...
 
+:: build_gui.cmd onedir - fast-start profile (Eva-onedir.spec: folder build, no UPX)
+set "PROFILE=%~1"
+
 :: Changing to project directory
 cd /d %~dp0
 
@@ -41,6 +44,15 @@ if errorlevel 1 (
 echo Cleaning up previous builds...
 rmdir /s /q build dist main.spec 2>nul
 
+if /i "%PROFILE%"=="onedir" (
+    echo Building onedir .exe without UPX...
+    pyinstaller --noconfirm Eva-onedir.spec
+    echo.
+    echo Build completed!
+    echo ▶ Output folder: dist\Eva ^(run dist\Eva\Eva.exe^)
+    goto :done
+)
+
 :: Building the .exe file
 echo Building .exe file...
 pyinstaller --noconfirm --onefile --windowed --icon=assets/icon.ico ^
@@ -49,5 +61,7 @@ pyinstaller --noconfirm --onefile --windowed --icon=assets/icon.ico ^
 echo.
 echo Build completed!
 echo ▶ Output file: dist\Eva.exe
+
+:done
 pause
 endlocal
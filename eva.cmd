@@ -0,0 +1,11 @@
+@echo off
+:: Headless CLI: eva.cmd status | up | down | pull MODEL | rm MODEL | bench MODEL | daemon
+:: (on Linux: python3 -m eva ...)
+setlocal
+set "PYTHONPATH=%~dp0;%PYTHONPATH%"
+if exist "%~dp0venv\Scripts\python.exe" (
+    "%~dp0venv\Scripts\python.exe" -m eva %*
+) else (
+    python -m eva %*
+)
+exit /b %errorlevel%
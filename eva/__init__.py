@@ -0,0 +1,3 @@
+"""
+Ядро Eva: Red Dragon без зависимостей от Qt (клиенты docker и Ollama).
+"""
@@ -0,0 +1,379 @@
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_REGISTRY = "registry.ollama.ai"
+DEFAULT_NAMESPACE = "library"
+INDEX_NAME = "eva-export.json"
+HASH_BLOCK = 4 * 1024 * 1024
+# Блобы — гигабайты; хэширование в hashlib отпускает GIL, поэтому потоки дают реальный параллелизм
+DEFAULT_WORKERS = 4
+
+ProgressCallback = Callable[[str], None]
+
+DIGEST_RE = re.compile(r"sha256:[0-9a-f]{64}")
+BLOB_MEMBER_RE = re.compile(r"blobs/sha256-[0-9a-f]{64}")
+
+
+class ArchiveError(Exception):
+    """
+    Ошибка экспорта/импорта моделей: нет манифеста, не сошёлся дайджест, битый архив.
+    """
+
+
+def manifest_relpath(name: str) -> str:
+    """
+    Имя модели → путь манифеста внутри models/manifests, как его раскладывает Ollama:
+    "llama3:8b" → registry.ollama.ai/library/llama3/8b, "user/model" → registry.ollama.ai/user/model/latest.
+    """
+    tag = "latest"
+    if ":" in name.rsplit("/", 1)[-1]:
+        name, tag = name.rsplit(":", 1)
+    parts = name.split("/")
+    if len(parts) == 1:
+        parts = [DEFAULT_REGISTRY, DEFAULT_NAMESPACE] + parts
+    elif len(parts) == 2:
+        parts = [DEFAULT_REGISTRY] + parts
+    return os.path.join(*parts, tag)
+
+
+def blob_name(digest: str) -> str:
+    # "sha256:abc..." → "sha256-abc..." (двоеточие недопустимо в именах файлов Windows)
+    return digest.replace(":", "-")
+
+
+def manifest_digests(manifest: dict) -> List[Tuple[str, int]]:
+    entries = [manifest.get("config") or {}] + list(manifest.get("layers") or [])
+    return [(entry["digest"], int(entry.get("size") or 0)) for entry in entries if entry.get("digest")]
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return "sha256:" + digest.hexdigest()
+
+
+class ModelStore:
+    """
+    Хранилище Ollama на диске (ollama_data/models): manifests/... и blobs/sha256-<hex>.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.manifests = os.path.join(root, "manifests")
+        self.blobs = os.path.join(root, "blobs")
+
+    def manifest_path(self, name: str) -> str:
+        return os.path.join(self.manifests, manifest_relpath(name))
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blobs, blob_name(digest))
+
+    def read_manifest(self, name: str) -> dict:
+        path = self.manifest_path(name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ArchiveError(f"Модель {name} не найдена в {self.manifests}") from None
+        except ValueError as e:
+            raise ArchiveError(f"Повреждён манифест {name}: {e}") from e
+
+    def has_blob(self, digest: str, size: int) -> bool:
+        try:
+            return os.path.getsize(self.blob_path(digest)) == size
+        except OSError:
+            return False
+
+
+def copy_verified(src: str, dst: str, digest: str):
+    """
+    Копирует блоб через shutil.copyfile (sendfile/copy_file_range там, где есть),
+    затем проверяет sha256 копии и только после этого переименовывает её в dst.
+    """
+    tmp = dst + ".partial"
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    shutil.copyfile(src, tmp)
+    actual = file_sha256(tmp)
+    if actual != digest:
+        os.remove(tmp)
+        raise ArchiveError(f"Дайджест не совпал: {os.path.basename(src)} ({actual})")
+    os.replace(tmp, dst)
+
+
+def stream_verified(source, dst: str, digest: str):
+    """
+    Пишет поток (член tar-архива) в dst, считая sha256 на лету — один проход по данным.
+    """
+    tmp = dst + ".partial"
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    hasher = hashlib.sha256()
+    with open(tmp, "wb") as out:
+        for block in iter(lambda: source.read(HASH_BLOCK), b""):
+            hasher.update(block)
+            out.write(block)
+    if "sha256:" + hasher.hexdigest() != digest:
+        os.remove(tmp)
+        raise ArchiveError(f"Дайджест не совпал: {blob_name(digest)}")
+    os.replace(tmp, dst)
+
+
+class _HashingReader(io.RawIOBase):
+    """
+    Обёртка над файлом для tarfile.addfile: считает sha256 того, что реально ушло в архив.
+    """
+    def __init__(self, f):
+        self.f = f
+        self.hasher = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.hasher.update(data)
+        return data
+
+
+def collect(store: ModelStore, names: Iterable[str]) -> Tuple[Dict[str, dict], Dict[str, int]]:
+    """
+    Манифесты моделей и общий набор блобов (каждый дайджест — один раз, даже если он у нескольких моделей).
+    """
+    manifests = {}
+    blobs: Dict[str, int] = {}
+    for name in names:
+        manifest = store.read_manifest(name)
+        manifests[name] = manifest
+        for digest, size in manifest_digests(manifest):
+            blobs[digest] = size
+    return manifests, blobs
+
+
+def _index(manifests: Dict[str, dict], blobs: Dict[str, int]) -> dict:
+    return {
+        "format": 1,
+        "models": {name: manifest_relpath(name).replace(os.sep, "/") for name in manifests},
+        "blobs": blobs,
+    }
+
+
+def export_models(store: ModelStore, names: List[str], destination: str,
+                  on_progress: Optional[ProgressCallback] = None, workers: int = DEFAULT_WORKERS) -> dict:
+    """
+    Экспорт моделей в папку (destination без расширения .tar) или в tar-архив.
+
+    Папка совместима с раскладкой Ollama (manifests/, blobs/) плюс eva-export.json;
+    блобы, уже лежащие в папке назначения с тем же размером, не копируются —
+    в одну общую папку на сетевом диске можно выгружать модели с разных машин.
+    """
+    on_progress = on_progress or (lambda text: None)
+    manifests, blobs = collect(store, names)
+    report = {"models": list(manifests), "blobs": len(blobs), "copied": 0, "skipped": 0, "bytes": 0}
+    if destination.lower().endswith(".tar"):
+        _export_tar(store, manifests, blobs, destination, on_progress, report)
+        return report
+
+    target = ModelStore(destination)
+    lock = threading.Lock()
+
+    def copy(item):
+        digest, size = item
+        if target.has_blob(digest, size):
+            with lock:
+                report["skipped"] += 1
+            return
+        copy_verified(store.blob_path(digest), target.blob_path(digest), digest)
+        with lock:
+            report["copied"] += 1
+            report["bytes"] += size
+            on_progress(f"Скопировано блобов: {report['copied'] + report['skipped']} из {len(blobs)}")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(copy, sorted(blobs.items(), key=lambda item: -item[1])))
+    # Манифесты — последними: модель не должна появиться раньше своих блобов
+    for name, manifest in manifests.items():
+        path = target.manifest_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+    # Индекс общей папки дополняется, а не перезаписывается: прежние модели остаются в нём
+    index = _index(manifests, blobs)
+    index_path = os.path.join(destination, INDEX_NAME)
+    try:
+        with open(index_path, "rb") as f:
+            previous = _read_index(f.read(), destination)
+        index["models"] = {**previous["models"], **index["models"]}
+        index["blobs"] = {**previous["blobs"], **index["blobs"]}
+    except (OSError, ArchiveError):
+        pass
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    return report
+
+
+def _export_tar(store, manifests, blobs, destination, on_progress, report):
+    tmp = destination + ".partial"
+    with tarfile.open(tmp, "w") as tar:
+        def add_bytes(arcname, data):
+            info = tarfile.TarInfo(arcname)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+        add_bytes(INDEX_NAME, json.dumps(_index(manifests, blobs), indent=2).encode())
+        for done, (digest, size) in enumerate(sorted(blobs.items()), start=1):
+            path = store.blob_path(digest)
+            info = tar.gettarinfo(path, arcname="blobs/" + blob_name(digest))
+            with open(path, "rb") as f:
+                reader = _HashingReader(f)
+                tar.addfile(info, reader)
+            if "sha256:" + reader.hasher.hexdigest() != digest:
+                raise ArchiveError(f"Блоб {blob_name(digest)} в хранилище повреждён")
+            report["copied"] += 1
+            report["bytes"] += size
+            on_progress(f"Упаковано блобов: {done} из {len(blobs)}")
+        for name, manifest in manifests.items():
+            add_bytes("manifests/" + manifest_relpath(name).replace(os.sep, "/"), json.dumps(manifest).encode())
+    os.replace(tmp, destination)
+
+
+def import_models(store: ModelStore, source: str, on_progress: Optional[ProgressCallback] = None,
+                  workers: int = DEFAULT_WORKERS) -> dict:
+    """
+    Импорт из папки или tar-архива экспорта. Блобы, которые уже есть в хранилище,
+    пропускаются по дайджесту; остальные копируются с проверкой sha256
+    (из папки — параллельно). Манифесты пишутся в конце, после всех блобов.
+    """
+    on_progress = on_progress or (lambda text: None)
+    if os.path.isdir(source):
+        return _import_dir(store, source, on_progress, workers)
+    if tarfile.is_tarfile(source):
+        return _import_tar(store, source, on_progress)
+    raise ArchiveError(f"{source}: не папка экспорта и не tar-архив")
+
+
+def _read_index(data: bytes, source: str) -> dict:
+    try:
+        index = json.loads(data)
+        models, blobs = dict(index["models"]), dict(index["blobs"])
+    except (ValueError, KeyError, TypeError):
+        raise ArchiveError(f"{source}: нет или повреждён {INDEX_NAME}") from None
+    # Экспорт может прийти из общей папки на сетевом диске — пути и дайджесты в нём не доверенные
+    for digest in blobs:
+        if not isinstance(digest, str) or not DIGEST_RE.fullmatch(digest):
+            raise ArchiveError(f"{source}: недопустимый дайджест в {INDEX_NAME}: {digest!r}")
+    for relpath in models.values():
+        if not _safe_relpath(relpath):
+            raise ArchiveError(f"{source}: недопустимый путь манифеста в {INDEX_NAME}: {relpath!r}")
+    return index
+
+
+def _safe_relpath(relpath) -> bool:
+    # Только относительный путь "a/b/c" без "..", "." и разделителей/дисков Windows
+    if not isinstance(relpath, str) or not relpath:
+        return False
+    return all(part not in ("", ".", "..") and "\\" not in part and ":" not in part
+               for part in relpath.split("/"))
+
+
+def _contained_path(root: str, relpath: str) -> str:
+    """
+    root/relpath, если он не выходит за пределы root (с учётом .. и символических ссылок), иначе ArchiveError.
+    """
+    path = os.path.join(root, *relpath.split("/"))
+    real_root = os.path.realpath(root)
+    try:
+        contained = os.path.commonpath([real_root, os.path.realpath(path)]) == real_root
+    except ValueError:  # другой диск Windows
+        contained = False
+    if not contained:
+        raise ArchiveError(f"Путь манифеста {relpath!r} выходит за пределы {root}")
+    return path
+
+
+def _write_manifests(store: ModelStore, manifests: Dict[str, bytes]):
+    paths = {relpath: _contained_path(store.manifests, relpath) for relpath in manifests}
+    for relpath, data in manifests.items():
+        path = paths[relpath]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+def _import_dir(store, source, on_progress, workers):
+    try:
+        with open(os.path.join(source, INDEX_NAME), "rb") as f:
+            index = _read_index(f.read(), source)
+    except OSError:
+        raise ArchiveError(f"{source}: нет {INDEX_NAME}") from None
+    exported = ModelStore(source)
+    blobs = index["blobs"]
+    report = {"models": list(index["models"]), "blobs": len(blobs), "copied": 0, "skipped": 0, "bytes": 0}
+    lock = threading.Lock()
+
+    def copy(item):
+        digest, size = item
+        if store.has_blob(digest, size):
+            with lock:
+                report["skipped"] += 1
+            return
+        copy_verified(exported.blob_path(digest), store.blob_path(digest), digest)
+        with lock:
+            report["copied"] += 1
+            report["bytes"] += size
+            on_progress(f"Импортировано блобов: {report['copied'] + report['skipped']} из {len(blobs)}")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(copy, sorted(blobs.items(), key=lambda item: -item[1])))
+    manifests = {}
+    for relpath in index["models"].values():
+        with open(_contained_path(exported.manifests, relpath), "rb") as f:
+            manifests[relpath] = f.read()
+    _write_manifests(store, manifests)
+    return report
+
+
+def _import_tar(store, source, on_progress):
+    manifests: Dict[str, bytes] = {}
+    index = None
+    report = {"models": [], "blobs": 0, "copied": 0, "skipped": 0, "bytes": 0}
+    try:
+        with tarfile.open(source, "r") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                if member.name == INDEX_NAME:
+                    index = _read_index(tar.extractfile(member).read(), source)
+                    report["models"] = list(index["models"])
+                    report["blobs"] = len(index["blobs"])
+                elif member.name.startswith("manifests/"):
+                    manifests[member.name[len("manifests/"):]] = tar.extractfile(member).read()
+                elif member.name.startswith("blobs/"):
+                    if not BLOB_MEMBER_RE.fullmatch(member.name):
+                        raise ArchiveError(f"{source}: недопустимое имя блоба {member.name!r}")
+                    digest = os.path.basename(member.name).replace("-", ":", 1)
+                    if store.has_blob(digest, member.size):
+                        # Несжатый tar умеет пропускать член без чтения данных
+                        report["skipped"] += 1
+                    else:
+                        stream_verified(tar.extractfile(member), store.blob_path(digest), digest)
+                        report["copied"] += 1
+                        report["bytes"] += member.size
+                    on_progress(f"Импортировано блобов: {report['copied'] + report['skipped']} из {report['blobs']}")
+    except tarfile.TarError as e:
+        raise ArchiveError(f"{source}: повреждён архив: {e}") from e
+    if index is None:
+        raise ArchiveError(f"{source}: нет {INDEX_NAME}")
+    missing = [relpath for relpath in index["models"].values() if relpath not in manifests]
+    if missing:
+        raise ArchiveError(f"{source}: нет манифестов: {', '.join(missing)}")
+    # Пишем только манифесты моделей из индекса — лишние члены manifests/ игнорируются
+    _write_manifests(store, {relpath: manifests[relpath] for relpath in index["models"].values()})
+    return report
@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+from eva.ollama import OllamaClient, OllamaError, parse_host
+
+DEFAULT_LEVELS = (1, 2, 4, 8)
+DEFAULT_NUM_PREDICT = 128
+# Запросов на одного параллельного клиента при замере пропускной способности
+ROUNDS = 2
+NS = 1e9
+
+# Промпт на пару сотен токенов, чтобы скорость обработки промпта была измерима
+DEFAULT_PROMPT = (
+    "Ты — помощник, который готовит краткие отчёты по расшифровкам совещаний. "
+    "Ниже фрагмент расшифровки. Выдели участников, принятые решения, открытые вопросы "
+    "и сроки, затем напиши резюме в трёх предложениях.\n\n"
+    "Иван: Коллеги, по интеграции с CRM мы отстаём примерно на неделю, поставщик "
+    "до сих пор не выдал тестовый доступ к API. Предлагаю пока сделать заглушку.\n"
+    "Мария: Согласна, заглушку сделаю до четверга. Но нам нужен ответственный за "
+    "переговоры с поставщиком, иначе мы снова потеряем неделю.\n"
+    "Олег: Возьму на себя. Ещё вопрос по распознаванию голосовых: ночные записи "
+    "обрабатываются до утра, потому что модель грузится на каждый файл.\n"
+    "Иван: Это уже исправили, теперь модель в памяти постоянно. Давайте проверим "
+    "на следующей неделе и вернёмся к вопросу, если будут задержки.\n"
+    "Мария: И последнее — нужен бенчмарк моделей, чтобы выбрать замену для "
+    "суммаризации. Предлагаю сравнить три кандидата к концу месяца."
+)
+
+ProgressCallback = Callable[[str], None]
+
+
+def rate(count: int, duration_ns: int) -> Optional[float]:
+    return round(count * NS / duration_ns, 2) if count and duration_ns else None
+
+
+def run_request(client: OllamaClient, model: str, prompt: str, num_predict: int) -> dict:
+    """
+    Один потоковый запрос: время до первого токена (по часам клиента) и скорости из счётчиков Ollama.
+    """
+    started = time.perf_counter()
+    ttft = None
+    final: dict = {}
+    for event in client.generate(model, prompt, options={"num_predict": num_predict, "temperature": 0, "seed": 42}):
+        if ttft is None and event.get("response"):
+            ttft = time.perf_counter() - started
+        if event.get("done"):
+            final = event
+    return {
+        "wall_seconds": round(time.perf_counter() - started, 4),
+        "ttft_seconds": round(ttft, 4) if ttft is not None else None,
+        "load_seconds": round(final.get("load_duration", 0) / NS, 4),
+        "prompt_tokens": final.get("prompt_eval_count", 0),
+        "prompt_tokens_per_second": rate(final.get("prompt_eval_count", 0), final.get("prompt_eval_duration", 0)),
+        "eval_tokens": final.get("eval_count", 0),
+        "eval_tokens_per_second": rate(final.get("eval_count", 0), final.get("eval_duration", 0)),
+    }
+
+
+def measure_load(client: OllamaClient, model: str) -> float:
+    """
+    Холодная загрузка: модель выгружается и загружается заново пустым /api/generate.
+    """
+    try:
+        client.unload(model)
+    except OllamaError:
+        pass
+    started = time.perf_counter()
+    client.load(model)
+    return round(time.perf_counter() - started, 4)
+
+
+def measure_concurrency(client: OllamaClient, model: str, concurrency: int, prompt: str,
+                        num_predict: int, rounds: int = ROUNDS) -> dict:
+    """
+    concurrency клиентов одновременно, по rounds запросов каждый. Промпты слегка
+    различаются, чтобы Ollama не отвечала из кэша префикса. Сколько запросов
+    реально идёт параллельно, решает OLLAMA_NUM_PARALLEL сервера.
+    """
+    def worker(index):
+        return [run_request(client, model, f"[{index}.{step}] {prompt}", num_predict) for step in range(rounds)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [result for batch in pool.map(worker, range(concurrency)) for result in batch]
+    wall = time.perf_counter() - started
+    tokens = sum(result["eval_tokens"] for result in results)
+    ttfts = [result["ttft_seconds"] for result in results if result["ttft_seconds"] is not None]
+    return {
+        "requests": len(results),
+        "wall_seconds": round(wall, 4),
+        "tokens_per_second": round(tokens / wall, 2) if wall else None,
+        "requests_per_second": round(len(results) / wall, 3) if wall else None,
+        "latency_median_seconds": round(statistics.median(result["wall_seconds"] for result in results), 4),
+        "ttft_median_seconds": round(statistics.median(ttfts), 4) if ttfts else None,
+    }
+
+
+def benchmark_model(client: OllamaClient, model: str, levels: Iterable[int] = DEFAULT_LEVELS,
+                    prompt: str = DEFAULT_PROMPT, num_predict: int = DEFAULT_NUM_PREDICT,
+                    on_progress: Optional[ProgressCallback] = None,
+                    stop: Optional[threading.Event] = None) -> dict:
+    on_progress = on_progress or (lambda text: None)
+    stop = stop or threading.Event()
+    on_progress(f"{model}: загрузка модели...")
+    result = {"load_seconds": measure_load(client, model)}
+    on_progress(f"{model}: одиночный запрос...")
+    result["single"] = run_request(client, model, prompt, num_predict)
+    result["concurrency"] = {}
+    for level in levels:
+        if stop.is_set():
+            break
+        on_progress(f"{model}: {level} параллельных запросов...")
+        result["concurrency"][str(level)] = measure_concurrency(client, model, level, prompt, num_predict)
+    return result
+
+
+def run_benchmark(client: OllamaClient, models: List[str], levels: Iterable[int] = DEFAULT_LEVELS,
+                  prompt: str = DEFAULT_PROMPT, num_predict: int = DEFAULT_NUM_PREDICT,
+                  on_progress: Optional[ProgressCallback] = None,
+                  stop: Optional[threading.Event] = None) -> dict:
+    """
+    Бенчмарк моделей по очереди. Ошибка одной модели не прерывает остальные —
+    она попадает в отчёт полем "error".
+    """
+    levels = list(levels)
+    stop = stop or threading.Event()
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": f"{client.host}:{client.port}",
+        "levels": levels,
+        "num_predict": num_predict,
+        "prompt_chars": len(prompt),
+        "models": {},
+    }
+    for model in models:
+        if stop.is_set():
+            break
+        try:
+            report["models"][model] = benchmark_model(client, model, levels, prompt, num_predict, on_progress, stop)
+        except OllamaError as e:
+            report["models"][model] = {"error": str(e)}
+    return report
+
+
+def write_report(report: dict, directory: str) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, time.strftime("ollama-bench-%Y%m%d-%H%M%S.json"))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def format_report(report: dict) -> str:
+    lines = []
+    for model, result in report["models"].items():
+        if "error" in result:
+            lines.append(f"{model}: ❌ {result['error']}")
+            continue
+        single = result["single"]
+        lines.append(f"{model}: загрузка {result['load_seconds']:.1f} с, первый токен {single['ttft_seconds']} с, "
+                     f"промпт {single['prompt_tokens_per_second']} ток/с, генерация {single['eval_tokens_per_second']} ток/с")
+        for level, values in result["concurrency"].items():
+            lines.append(f"  ×{level}: {values['tokens_per_second']} ток/с, "
+                         f"задержка {values['latency_median_seconds']} с, первый токен {values['ttft_median_seconds']} с")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    """
+    python -m eva.bench llama3:8b qwen2.5:7b --levels 1,2,4,8 --out benchmarks
+    """
+    parser = argparse.ArgumentParser(prog="eva.bench", description="Бенчмарк моделей Ollama")
+    parser.add_argument("models", nargs="+")
+    parser.add_argument("--levels", default=",".join(map(str, DEFAULT_LEVELS)),
+                        help="уровни параллельности через запятую")
+    parser.add_argument("--num-predict", type=int, default=DEFAULT_NUM_PREDICT)
+    parser.add_argument("--host", default=None, help="адрес Ollama (по умолчанию OLLAMA_HOST или 127.0.0.1:11434)")
+    parser.add_argument("--out", default="benchmarks", help="папка для JSON-отчётов")
+    args = parser.parse_args(argv)
+
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    host, port = parse_host(args.host) if args.host else (None, None)
+    client = OllamaClient(host, port, timeout=600, pool_size=max(levels + [1]))
+    report = run_benchmark(client, args.models, levels, num_predict=args.num_predict,
+                           on_progress=lambda text: print(text, flush=True))
+    path = write_report(report, args.out)
+    print(format_report(report))
+    print(f"Отчёт: {path}")
+    client.close()
+    return 0 if all("error" not in result for result in report["models"].values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
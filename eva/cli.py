@@ -0,0 +1,392 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+from typing import Callable, Dict, List, Optional
+
+from eva.docker import ABSENT, COMPOSE_FILE, SERVICES, UNKNOWN, ContainerStateTable, find_project_root, snapshot_command
+
+# Команды, которые можно отдать запущенному демону (bench всегда выполняется на месте)
+DAEMON_COMMANDS = ("status", "up", "down", "pull", "rm")
+DEFAULT_DAEMON_PORT = 11500
+
+
+def daemon_port() -> int:
+    try:
+        return int(os.environ.get("EVA_DAEMON_PORT", DEFAULT_DAEMON_PORT))
+    except ValueError:
+        return DEFAULT_DAEMON_PORT
+
+
+def call_daemon(command: str, params: dict, port: Optional[int] = None, timeout: float = 600) -> Optional[dict]:
+    """
+    Выполняет команду через запущенный `eva daemon`; None, если демона нет (тогда CLI работает сам).
+    Голый сокет вместо http.client — его импорт дороже самого запроса к демону.
+    """
+    body = json.dumps(params).encode()
+    try:
+        sock = socket.create_connection(("127.0.0.1", port or daemon_port()), timeout=0.2)
+    except OSError:
+        return None
+    try:
+        sock.settimeout(timeout)
+        sock.sendall(f"POST /{command} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        chunks = []
+        for chunk in iter(lambda: sock.recv(65536), b""):
+            chunks.append(chunk)
+        head, _, payload = b"".join(chunks).partition(b"\r\n\r\n")
+        return json.loads(payload or b"{}")
+    except (OSError, ValueError) as e:
+        return {"ok": False, "error": f"демон не ответил: {e}"}
+    finally:
+        sock.close()
+
+
+def default_project_dir() -> str:
+    """
+    EVA_PROJECT_DIR, иначе папка с docker-compose.yml от текущей вверх, иначе рядом с пакетом eva.
+    """
+    return (os.environ.get("EVA_PROJECT_DIR")
+            or find_project_root(os.getcwd())
+            or find_project_root(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            or os.getcwd())
+
+
+class Context:
+    """
+    Общие для команд вещи: compose-файл, клиент Ollama (создаётся при первом
+    обращении) и источник состояний контейнеров — разовый `docker ps` или,
+    в демоне, таблица, которую держит `docker events`.
+    """
+    def __init__(self, project_dir: str, states: Optional[Callable[[], Dict[str, str]]] = None,
+                 progress: Optional[Callable[[str], None]] = None):
+        self.project_dir = project_dir
+        self.compose_file = os.path.join(project_dir, COMPOSE_FILE)
+        self.progress = progress or (lambda text: None)
+        self._states = states
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from eva.ollama import OllamaClient
+            self._client = OllamaClient()
+        return self._client
+
+    def states(self) -> Dict[str, str]:
+        if self._states is not None:
+            return self._states()
+        from eva import tracing
+
+        table = ContainerStateTable()
+        try:
+            with tracing.span("docker.ps") as trace:
+                result = subprocess.run(["docker", *snapshot_command()], capture_output=True, text=True, timeout=15)
+                trace.set(exit_code=result.returncode)
+        except (OSError, subprocess.TimeoutExpired):
+            return dict(table.states)
+        if result.returncode == 0:
+            table.apply_snapshot(result.stdout)
+        return dict(table.states)
+
+
+# --- команды: параметры (dict) → результат (dict с ключом "ok") ---
+
+def cmd_status(ctx: Context, params: dict) -> dict:
+    states = ctx.states()
+    return {
+        "ok": all(state != UNKNOWN for state in states.values()),
+        "services": states,
+        "ollama": ctx.client.is_available(),
+    }
+
+
+def cmd_up(ctx: Context, params: dict) -> dict:
+    from eva import startup
+
+    services = params.get("services") or list(SERVICES)
+    probes = {service: probe for service, probe in startup.default_probes().items() if service in services}
+    errors = []
+
+    def on_event(kind, service, payload):
+        if kind == startup.STAGE:
+            ctx.progress(payload)
+        elif kind == startup.READY:
+            ctx.progress(f"✅ {service}: {payload:.1f} с")
+        elif kind == startup.TIMEOUT:
+            ctx.progress(f"⚠️ {service}: не готов за {payload:.0f} с")
+        elif kind == startup.FAILED:
+            errors.append(payload)
+            ctx.progress(f"❌ {payload}")
+
+    orchestrator = startup.StartupOrchestrator(ctx.compose_file, probes,
+                                               deadline=params.get("deadline") or startup.DEFAULT_DEADLINE,
+                                               on_event=on_event, states=ctx.states())
+    report = orchestrator.run()
+    ready = {service: report.get(service) for service in probes}
+    return {
+        "ok": not errors and all(seconds is not None for seconds in ready.values()),
+        "ready": ready,
+        "compose_seconds": report.get("compose"),
+        "errors": errors,
+    }
+
+
+def cmd_down(ctx: Context, params: dict) -> dict:
+    from eva import shutdown
+
+    states = ctx.states()
+    running = None
+    if any(state != UNKNOWN for state in states.values()):
+        running = [service for service in SERVICES if states[service] != ABSENT]
+    orchestrator = shutdown.ShutdownOrchestrator(
+        ctx.compose_file, running, cleanup=not params.get("keep"),
+        on_event=lambda service, outcome: ctx.progress(f"{service}: {outcome}"))
+    results = orchestrator.run()
+    return {
+        "ok": shutdown.FAILED not in results.values(),
+        "results": results,
+        "errors": orchestrator.errors,
+    }
+
+
+def cmd_pull(ctx: Context, params: dict) -> dict:
+    from eva import jobs
+
+    finished = threading.Event()
+    manager = None
+
+    def on_state(job):
+        ctx.progress(f"{job.model}: {job.state}" + (f" ({job.error})" if job.error else ""))
+        if manager is not None and not manager.active_jobs():
+            finished.set()
+
+    manager = jobs.JobManager(ctx.client, concurrency=params.get("parallel") or 2, on_state=on_state)
+    submitted = manager.submit(params.get("models") or [], jobs.PULL)
+    if submitted and manager.active_jobs():
+        finished.wait()
+    return {
+        "ok": all(job.state == jobs.DONE for job in submitted),
+        "models": {job.model: {"state": job.state, "error": job.error, "bytes": job.total} for job in submitted},
+    }
+
+
+def cmd_rm(ctx: Context, params: dict) -> dict:
+    from eva.ollama import OllamaError
+
+    results = {}
+    for model in params.get("models") or []:
+        try:
+            ctx.client.delete(model)
+            results[model] = {"state": "done", "error": ""}
+        except OllamaError as e:
+            results[model] = {"state": "failed", "error": str(e)}
+        ctx.progress(f"{model}: {results[model]['state']}")
+    return {"ok": all(result["state"] == "done" for result in results.values()), "models": results}
+
+
+def cmd_bench(ctx: Context, params: dict) -> dict:
+    from eva import bench
+    from eva.ollama import OllamaClient
+
+    levels = params.get("levels") or list(bench.DEFAULT_LEVELS)
+    client = OllamaClient(timeout=600, pool_size=max(levels))
+    try:
+        report = bench.run_benchmark(client, params.get("models") or [], levels,
+                                     num_predict=params.get("num_predict") or bench.DEFAULT_NUM_PREDICT,
+                                     on_progress=ctx.progress)
+    finally:
+        client.close()
+    path = bench.write_report(report, params.get("out") or os.path.join(ctx.project_dir, "benchmarks"))
+    return {
+        "ok": all("error" not in result for result in report["models"].values()),
+        "report_path": path,
+        "report": report,
+    }
+
+
+def _model_store(ctx: Context):
+    from eva.archive import ModelStore
+    return ModelStore(os.path.join(ctx.project_dir, "ollama_data", "models"))
+
+
+def cmd_export(ctx: Context, params: dict) -> dict:
+    from eva.archive import ArchiveError, export_models
+
+    try:
+        report = export_models(_model_store(ctx), params.get("models") or [], params["path"], on_progress=ctx.progress)
+    except (ArchiveError, OSError) as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "path": params["path"], **report}
+
+
+def cmd_import(ctx: Context, params: dict) -> dict:
+    from eva.archive import ArchiveError, import_models
+
+    try:
+        report = import_models(_model_store(ctx), params["path"], on_progress=ctx.progress)
+    except (ArchiveError, OSError) as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "path": params["path"], **report}
+
+
+COMMANDS = {
+    "status": cmd_status,
+    "up": cmd_up,
+    "down": cmd_down,
+    "pull": cmd_pull,
+    "rm": cmd_rm,
+    "bench": cmd_bench,
+    "export": cmd_export,
+    "import": cmd_import,
+}
+
+
+def run_daemon(project_dir: str, port: Optional[int], progress: Callable[[str], None]) -> dict:
+    from eva.daemon import Daemon
+
+    handlers = {}
+    daemon = Daemon(handlers, port or daemon_port())
+    # Один контекст на все запросы: пул соединений Ollama и таблица `docker events` общие
+    ctx = Context(project_dir, states=daemon.watcher.states)
+
+    def handler(command):
+        return lambda params: COMMANDS[command](ctx, params)
+
+    handlers.update({command: handler(command) for command in DAEMON_COMMANDS})
+    handlers["shutdown"] = lambda params: daemon.shutdown() or {"ok": True}
+    progress(f"eva daemon: 127.0.0.1:{daemon.port}, проект {project_dir}")
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True}
+
+
+# --- вывод ---
+
+def format_human(command: str, result: dict) -> str:
+    if result.get("error"):
+        return f"❌ {result['error']}"
+    lines = []
+    if command == "status":
+        for service, state in result["services"].items():
+            lines.append(f"{service:<10} {state}")
+        lines.append(f"{'ollama api':<10} {'доступен' if result['ollama'] else 'недоступен'}")
+    elif command == "up":
+        for service, seconds in result["ready"].items():
+            lines.append(f"{service:<10} " + (f"готов за {seconds:.1f} с" if seconds is not None else "не готов"))
+        lines.extend(f"❌ {error}" for error in result["errors"])
+    elif command == "down":
+        for service, outcome in result["results"].items():
+            error = result["errors"].get(service)
+            lines.append(f"{service:<10} {outcome}" + (f": {error}" if error else ""))
+    elif command in ("pull", "rm"):
+        for model, info in result["models"].items():
+            lines.append(f"{model}: {info['state']}" + (f" ({info['error']})" if info["error"] else ""))
+    elif command == "bench":
+        from eva.bench import format_report
+        lines.append(format_report(result["report"]))
+        lines.append(f"Отчёт: {result['report_path']}")
+    elif command in ("export", "import"):
+        lines.append(f"Модели: {', '.join(result['models'])}")
+        lines.append(f"Блобов: {result['blobs']}, скопировано {result['copied']} "
+                     f"({result['bytes'] / 1024 ** 3:.2f} ГБ), уже были: {result['skipped']}")
+    return "\n".join(lines)
+
+
+def parse_levels(text: str) -> List[int]:
+    """
+    "1,2,4,8" → [1, 2, 4, 8]; тип аргумента --levels, ошибка — сообщение argparse об использовании.
+    """
+    try:
+        levels = [int(level) for level in text.split(",") if level.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидаются целые числа через запятую, например 1,2,4,8: {text!r}")
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError(f"уровни параллельности должны быть не меньше 1: {text!r}")
+    return levels
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="eva", description="Управление стеком EvaDragon без GUI")
+    parser.add_argument("--json", action="store_true", help="результат одной JSON-строкой в stdout")
+    parser.add_argument("-q", "--quiet", action="store_true", help="без прогресса в stderr")
+    parser.add_argument("--project", default=None, help="папка с docker-compose.yml")
+    parser.add_argument("--no-daemon", action="store_true", help="не обращаться к запущенному eva daemon")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("status", help="состояние контейнеров и Ollama")
+    up = sub.add_parser("up", help="запустить стек и дождаться готовности")
+    up.add_argument("services", nargs="*", metavar="SERVICE", help=", ".join(SERVICES) + " (по умолчанию все)")
+    up.add_argument("--deadline", type=float, default=None, help="секунд на готовность каждого сервиса")
+    down = sub.add_parser("down", help="остановить стек")
+    down.add_argument("--keep", action="store_true", help="не выполнять compose down после остановки")
+    pull = sub.add_parser("pull", help="скачать модели Ollama")
+    pull.add_argument("models", nargs="+")
+    pull.add_argument("--parallel", type=int, default=2)
+    rm = sub.add_parser("rm", help="удалить модели Ollama")
+    rm.add_argument("models", nargs="+")
+    bench = sub.add_parser("bench", help="бенчмарк моделей Ollama")
+    bench.add_argument("models", nargs="+")
+    bench.add_argument("--levels", type=parse_levels, default="1,2,4,8", help="уровни параллельности через запятую")
+    bench.add_argument("--num-predict", type=int, default=None)
+    bench.add_argument("--out", default=None, help="папка для JSON-отчёта (по умолчанию <проект>/benchmarks)")
+    export = sub.add_parser("export", help="выгрузить модели для переноса без интернета")
+    export.add_argument("models", nargs="+")
+    export.add_argument("--to", dest="path", required=True, help="папка или файл .tar")
+    import_ = sub.add_parser("import", help="загрузить модели из папки или .tar экспорта")
+    import_.add_argument("path")
+    daemon = sub.add_parser("daemon", help="фоновый режим: тёплые соединения с docker и Ollama")
+    daemon.add_argument("--port", type=int, default=None)
+    return parser
+
+
+def params_from_args(args) -> dict:
+    params = {}
+    for name in ("services", "deadline", "keep", "models", "parallel", "num_predict", "out", "path", "levels"):
+        value = getattr(args, name, None)
+        if value not in (None, [], False):
+            params[name] = value
+    return params
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    project_dir = os.path.abspath(args.project) if args.project else default_project_dir()
+
+    def progress(text):
+        if not args.quiet:
+            print(text, file=sys.stderr, flush=True)
+
+    def configure_tracing():
+        # Спаны пишет тот процесс, который выполняет команду (CLI или демон), а не клиент демона
+        from eva import tracing
+        tracing.configure_from_env(os.path.join(project_dir, "logs"), "trace-cli.jsonl")
+
+    if args.command == "daemon":
+        configure_tracing()
+        result = run_daemon(project_dir, args.port, progress)
+    else:
+        params = params_from_args(args)
+        unknown = [service for service in params.get("services", []) if service not in SERVICES]
+        if unknown:
+            build_parser().error(f"неизвестные сервисы: {', '.join(unknown)}")
+        result = None
+        if args.command in DAEMON_COMMANDS and not args.no_daemon:
+            result = call_daemon(args.command, params)
+        if result is None:
+            configure_tracing()
+            result = COMMANDS[args.command](Context(project_dir, progress=progress), params)
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+    elif args.command != "daemon":
+        print(format_human(args.command, result))
+    return 0 if result.get("ok") else 1
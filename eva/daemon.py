@@ -0,0 +1,140 @@
+import json
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+from eva import tracing
+from eva.docker import ContainerStateTable, events_command, snapshot_command
+from eva.output import LineSplitter
+
+RETRY_SECONDS = 5.0
+
+
+class EventWatcher:
+    """
+    То же, что ContainerMonitor в GUI, но без Qt: один `docker events` в фоновом
+    потоке держит ContainerStateTable актуальной; при обрыве — снимок заново
+    через RETRY_SECONDS.
+    """
+    def __init__(self):
+        self.table = ContainerStateTable()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.proc: Optional[subprocess.Popen] = None
+        self.thread = threading.Thread(target=self._run, name="eva-events", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.proc is not None:
+            self.proc.kill()
+
+    def states(self) -> Dict[str, str]:
+        with self.lock:
+            return dict(self.table.states)
+
+    def refresh(self):
+        try:
+            with tracing.span("docker.ps") as trace:
+                result = subprocess.run(["docker", *snapshot_command()], capture_output=True, text=True, timeout=15)
+                trace.set(exit_code=result.returncode)
+        except (OSError, subprocess.TimeoutExpired):
+            result = None
+        with self.lock:
+            if result is None or result.returncode != 0:
+                self.table.mark_unknown()
+            else:
+                self.table.apply_snapshot(result.stdout)
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            splitter = LineSplitter()
+            try:
+                self.proc = subprocess.Popen(["docker", *events_command()], stdout=subprocess.PIPE,
+                                             stderr=subprocess.DEVNULL)
+            except OSError:
+                self.proc = None
+            if self.proc is not None:
+                # Снимок после подписки на события, чтобы не пропустить переход между ними
+                self.refresh()
+                trace = tracing.span("docker.events")
+                for chunk in iter(lambda: self.proc.stdout.read1(65536), b""):
+                    with self.lock:
+                        for line in splitter.feed(chunk):
+                            self.table.apply_event_line(line)
+                trace.end(exit_code=self.proc.wait())
+            with self.lock:
+                self.table.mark_unknown()
+            self.stop_event.wait(RETRY_SECONDS)
+
+
+class Daemon:
+    """
+    Долгоживущий режим `eva daemon`: состояния контейнеров из `docker events`
+    и пул keep-alive соединений с Ollama держатся тёплыми, а команды CLI
+    приходят JSON-запросами на 127.0.0.1:port. handlers — команда → функция(параметры) → dict.
+    """
+    def __init__(self, handlers: Dict[str, Callable[[dict], dict]], port: int):
+        self.handlers = handlers
+        self.port = port
+        self.watcher = EventWatcher()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def serve(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                # Браузер может отправить POST на 127.0.0.1 с любой страницы, но всегда добавит Origin,
+                # а JSON-тип без CORS-preflight не выставит — CLI шлёт ровно такие запросы
+                content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if self.headers.get("Origin") is not None:
+                    self.close_connection = True
+                    self.reply(403, {"error": "запросы из браузера не принимаются"})
+                    return
+                if content_type != "application/json":
+                    self.close_connection = True
+                    self.reply(415, {"error": "ожидается Content-Type: application/json"})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    params = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    params = {}
+                handler = daemon.handlers.get(self.path.strip("/"))
+                if handler is None:
+                    status, result = 404, {"error": f"неизвестная команда: {self.path}"}
+                else:
+                    try:
+                        status, result = 200, handler(params)
+                    except Exception as e:  # ответ клиенту важнее падения потока сервера
+                        status, result = 500, {"error": str(e)}
+                self.reply(status, result)
+
+            def reply(self, status: int, result: dict):
+                raw = json.dumps(result, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        self.watcher.start()
+        self.server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.watcher.stop()
+            self.server.server_close()
+
+    def shutdown(self):
+        if self.server is not None:
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
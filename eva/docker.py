@@ -0,0 +1,245 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+COMPOSE_FILE = "docker-compose.yml"
+
+# Сервисы docker-compose.yml и имена их контейнеров (container_name)
+SERVICES: Dict[str, str] = {
+    "postgres": "n8n-postgres",
+    "n8n": "n8n",
+    "pgadmin": "pgadmin",
+    "whisper": "whisper",
+    "ollama": "ollama",
+}
+
+# depends_on из docker-compose.yml: сервис → от чего зависит
+DEPENDS_ON: Dict[str, Tuple[str, ...]] = {
+    "n8n": ("postgres",),
+    "pgadmin": ("postgres",),
+}
+
+# Сколько секунд даём сервису на корректную остановку (docker stop --time), дальше — kill
+STOP_TIMEOUTS: Dict[str, int] = {
+    "postgres": 20,  # checkpoint и сброс WAL
+}
+DEFAULT_STOP_TIMEOUT = 10
+
+# Состояния контейнера в терминах `docker ps --format {{.State}}`, плюс два своих
+RUNNING = "running"
+EXITED = "exited"
+CREATED = "created"
+PAUSED = "paused"
+RESTARTING = "restarting"
+ABSENT = "absent"    # контейнера нет (не создан или удалён)
+UNKNOWN = "unknown"  # docker недоступен или состояние ещё не получено
+
+# Действие из `docker events` → новое состояние контейнера
+EVENT_STATES = {
+    "create": CREATED,
+    "start": RUNNING,
+    "unpause": RUNNING,
+    "restart": RUNNING,
+    "pause": PAUSED,
+    "die": EXITED,
+    "stop": EXITED,
+    "oom": EXITED,
+    "destroy": ABSENT,
+}
+
+
+def find_project_root(start: str, levels: int = 3) -> Optional[str]:
+    """
+    Папка с docker-compose.yml: start или один из его родителей (не выше levels уровней).
+    """
+    path = os.path.abspath(start)
+    for _ in range(levels):
+        if os.path.exists(os.path.join(path, COMPOSE_FILE)):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return None
+
+
+def events_command() -> List[str]:
+    """
+    Аргументы `docker ...` для потока событий по контейнерам стека (по одному JSON на строку).
+    """
+    args = ["events", "--format", "{{json .}}", "--filter", "type=container"]
+    for container in SERVICES.values():
+        args += ["--filter", f"container={container}"]
+    return args
+
+
+def snapshot_command() -> List[str]:
+    """
+    Аргументы `docker ...` для разового снимка состояний (в т.ч. остановленных контейнеров).
+    """
+    return ["ps", "-a", "--format", "{{.Names}}\t{{.State}}"]
+
+
+def memory_command() -> List[str]:
+    """
+    Память, доступная контейнерам (байт): на Windows/macOS — память VM Docker Desktop.
+    """
+    return ["info", "--format", "{{.MemTotal}}"]
+
+
+def compose_command(compose_file: str, *args: str) -> List[str]:
+    return ["compose", "-f", compose_file, *args]
+
+
+def stop_command(service: str, timeout: Optional[int] = None) -> List[str]:
+    if timeout is None:
+        timeout = STOP_TIMEOUTS.get(service, DEFAULT_STOP_TIMEOUT)
+    return ["stop", "--time", str(timeout), SERVICES[service]]
+
+
+def kill_command(service: str) -> List[str]:
+    return ["kill", SERVICES[service]]
+
+
+def restart_command(service: str) -> List[str]:
+    timeout = STOP_TIMEOUTS.get(service, DEFAULT_STOP_TIMEOUT)
+    return ["restart", "--time", str(timeout), SERVICES[service]]
+
+
+def start_depth(service: str) -> int:
+    """
+    Глубина в графе depends_on: 1 — без зависимостей, у зависящего — на 1 больше, чем у его зависимостей.
+    """
+    return 1 + max((start_depth(dep) for dep in DEPENDS_ON.get(service, ())), default=0)
+
+
+def start_order(services: Iterable[str]) -> List[str]:
+    """
+    Сервисы в порядке запуска: зависимости раньше зависящих (postgres до n8n и pgadmin).
+    """
+    return sorted(services, key=lambda service: (start_depth(service), list(SERVICES).index(service)))
+
+
+PLAN_ACTIONS = ("unpause", "start", "up")
+
+
+def start_plan(states: Dict[str, str], services: Optional[Iterable[str]] = None) -> List[Tuple[str, List[str]]]:
+    """
+    Сравнивает желаемое состояние (все services запущены) с фактическим и
+    возвращает шаги [(действие, [сервисы])], которые нужно выполнить:
+
+    - "unpause" — контейнер на паузе;
+    - "start" — контейнер есть, но остановлен (`docker start`, без пересоздания);
+    - "up" — контейнера нет или состояние неизвестно (`docker compose up -d <сервисы>`).
+
+    Запущенные сервисы не трогаются вовсе — модели Ollama остаются в памяти.
+    Шаги идут по глубине зависимостей, как в start_order: если postgres надо
+    создать, а n8n только запустить, `compose up postgres` выполняется раньше
+    `docker start n8n`.
+    """
+    services = list(services) if services is not None else list(SERVICES)
+    steps: Dict[Tuple[int, str], List[str]] = {}
+    for service in start_order(services):
+        state = states.get(service, UNKNOWN)
+        if state in (RUNNING, RESTARTING):
+            continue
+        if state == PAUSED:
+            action = "unpause"
+        elif state in (EXITED, CREATED):
+            action = "start"
+        else:
+            action = "up"
+        steps.setdefault((start_depth(service), action), []).append(service)
+    return [(action, steps[depth, action]) for depth, action in
+            sorted(steps, key=lambda step: (step[0], PLAN_ACTIONS.index(step[1])))]
+
+
+def plan_command(compose_file: str, action: str, services: List[str]) -> List[str]:
+    if action == "up":
+        return compose_command(compose_file, "up", "-d", *services)
+    return [action, *(SERVICES[service] for service in services)]
+
+
+def dependents(service: str) -> List[str]:
+    return [other for other, deps in DEPENDS_ON.items() if service in deps]
+
+
+def stop_ready(service: str, pending: Iterable[str]) -> bool:
+    """
+    Сервис можно останавливать, когда остановлены все, кто от него зависит
+    (postgres — после n8n и pgadmin).
+    """
+    pending = set(pending)
+    return not any(other in pending for other in dependents(service))
+
+
+def service_for_container(name: str) -> Optional[str]:
+    name = name.lstrip("/")
+    for service, container in SERVICES.items():
+        if container == name:
+            return service
+    return None
+
+
+class ContainerStateTable:
+    """
+    Таблица состояний сервисов стека, которая обновляется из `docker ps` и `docker events`.
+
+    apply_* возвращают список фактических изменений [(service, state)], чтобы
+    обёртка (Qt или CLI) оповещала подписчиков только о реальных переходах.
+    """
+    def __init__(self):
+        self.states: Dict[str, str] = {service: UNKNOWN for service in SERVICES}
+
+    def get(self, service: str) -> str:
+        return self.states.get(service, UNKNOWN)
+
+    def is_running(self, service: str) -> bool:
+        return self.get(service) == RUNNING
+
+    def _set(self, service: str, state: str) -> List[Tuple[str, str]]:
+        if self.states.get(service) == state:
+            return []
+        self.states[service] = state
+        return [(service, state)]
+
+    def apply_snapshot(self, output: str) -> List[Tuple[str, str]]:
+        """
+        Применяет вывод snapshot_command(); сервисы, которых нет в выводе, считаются ABSENT.
+        """
+        seen: Dict[str, str] = {}
+        for line in output.splitlines():
+            name, _, state = line.strip().partition("\t")
+            service = service_for_container(name)
+            if service:
+                seen[service] = state.strip().lower() or UNKNOWN
+        changes = []
+        for service in SERVICES:
+            changes += self._set(service, seen.get(service, ABSENT))
+        return changes
+
+    def apply_event_line(self, line: str) -> List[Tuple[str, str]]:
+        """
+        Применяет одну строку вывода events_command(); нераспознанные строки игнорируются.
+        """
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return []
+        actor = event.get("Actor") or {}
+        attributes = actor.get("Attributes") or {}
+        action = (event.get("Action") or event.get("status") or "").split(":")[0].strip()
+        state = EVENT_STATES.get(action)
+        service = service_for_container(attributes.get("name", ""))
+        if not state or not service:
+            return []
+        return self._set(service, state)
+
+    def mark_unknown(self) -> List[Tuple[str, str]]:
+        changes = []
+        for service in SERVICES:
+            changes += self._set(service, UNKNOWN)
+        return changes
+
+    def running(self) -> Iterable[str]:
+        return [service for service, state in self.states.items() if state == RUNNING]
@@ -0,0 +1,3 @@
+"""
+Qt-компоненты лаунчера (PyQt5). Ядро в пакете eva от них не зависит.
+"""
@@ -0,0 +1,29 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from eva.archive import ArchiveError, ModelStore, export_models, import_models
+
+
+class ArchiveTask(QThread):
+    """
+    Экспорт (models заданы) или импорт (models=None) моделей в рабочем потоке.
+    """
+    progress = pyqtSignal(str)
+    done = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, store_root: str, path: str, models=None, parent=None):
+        super().__init__(parent)
+        self.store = ModelStore(store_root)
+        self.path = path
+        self.models = list(models) if models is not None else None
+
+    def run(self):
+        try:
+            if self.models is None:
+                report = import_models(self.store, self.path, on_progress=self.progress.emit)
+            else:
+                report = export_models(self.store, self.models, self.path, on_progress=self.progress.emit)
+        except (ArchiveError, OSError) as e:
+            self.failed.emit(str(e))
+            return
+        self.done.emit(report)
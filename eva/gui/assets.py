@@ -0,0 +1,81 @@
+import hashlib
+import os
+from typing import Dict, Optional
+
+from PyQt5.QtCore import QSize, QStandardPaths, Qt, QUrl
+from PyQt5.QtGui import QPixmap
+
+# Несжатый BMP читается в разы быстрее, чем декодируется и масштабируется исходный JPEG
+CACHE_FORMAT = "bmp"
+
+
+def cache_dir() -> str:
+    base = QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)
+    return os.path.join(base or os.path.expanduser("~"), "Eva")
+
+
+def cached_pixmap(path: str, size: QSize, directory: Optional[str] = None) -> QPixmap:
+    """
+    Фон, уже отмасштабированный под size. Результат масштабирования хранится
+    на диске; ключ — хэш содержимого исходника и размер (mtime не годится:
+    onefile-сборка распаковывает ресурсы заново при каждом запуске).
+    """
+    directory = directory or cache_dir()
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    except OSError:
+        return QPixmap()
+    cached = os.path.join(directory, f"{name}-{size.width()}x{size.height()}-{digest}.{CACHE_FORMAT}")
+    pixmap = QPixmap(cached)
+    if not pixmap.isNull():
+        return pixmap
+
+    pixmap = QPixmap(path).scaled(size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+    if pixmap.isNull():
+        return pixmap
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Старые варианты того же фона (другой исходник или размер) больше не нужны
+        for entry in os.scandir(directory):
+            if entry.name.startswith(name + "-") and entry.name.endswith("." + CACHE_FORMAT):
+                os.remove(entry.path)
+        tmp = cached + ".tmp"
+        if pixmap.save(tmp, CACHE_FORMAT.upper()):
+            os.replace(tmp, cached)
+    except OSError:
+        pass
+    return pixmap
+
+
+class LazySounds:
+    """
+    Звуковые эффекты, которые создаются при первом обращении, а не при старте:
+    импорт QtMultimedia и инициализация аудиоустройства заметно задерживают
+    появление окна. Если мультимедиа недоступна, звуки просто молчат.
+    """
+    def __init__(self, sources: Dict[str, str], volume: float = 0.25):
+        self.sources = sources
+        self.volume = volume
+        self.effects = None
+
+    def load(self):
+        if self.effects is not None:
+            return
+        self.effects = {}
+        try:
+            from PyQt5.QtMultimedia import QSoundEffect
+        except ImportError:
+            return
+        for name, path in self.sources.items():
+            effect = QSoundEffect()
+            effect.setSource(QUrl.fromLocalFile(path))
+            effect.setVolume(self.volume)
+            self.effects[name] = effect
+
+    def play(self, name: str):
+        self.load()
+        effect = self.effects.get(name)
+        if effect is not None:
+            effect.play()
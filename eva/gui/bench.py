@@ -0,0 +1,43 @@
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from eva import bench
+from eva.ollama import OllamaClient
+
+
+class BenchmarkTask(QThread):
+    """
+    Запускает eva.bench.run_benchmark в рабочем потоке; отчёт сохраняется в directory.
+
+    stop() не блокирует GUI: обрывает запросы клиента (ответа можно ждать до 600 с)
+    и возвращается сразу, поток доработает сам — владелец удаляет его по finished.
+    """
+    progress = pyqtSignal(str)
+    done = pyqtSignal(dict, str)  # отчёт, путь к JSON
+    failed = pyqtSignal(str)      # бенчмарк или запись отчёта не удались
+
+    def __init__(self, models, levels, directory: str, parent=None):
+        super().__init__(parent)
+        self.models = list(models)
+        self.levels = list(levels)
+        self.directory = directory
+        self.stop_event = threading.Event()
+        # Свой клиент: загрузка модели идёт дольше обычного таймаута, соединений нужно по уровню параллельности
+        self.client = OllamaClient(timeout=600, pool_size=max(self.levels + [1]))
+
+    def run(self):
+        try:
+            report = bench.run_benchmark(self.client, self.models, self.levels,
+                                         on_progress=self.progress.emit, stop=self.stop_event)
+            path = bench.write_report(report, self.directory)
+        except Exception as e:  # иначе кнопка запуска так и останется выключенной
+            self.failed.emit(f"{type(e).__name__}: {e}")
+            return
+        finally:
+            self.client.close()
+        self.done.emit(report, path)
+
+    def stop(self):
+        self.stop_event.set()
+        self.client.abort()
@@ -0,0 +1,43 @@
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from eva.inventory import ModelInventory
+from eva.ollama import OllamaError
+
+
+class InventoryLoader(QObject):
+    """
+    Обновление ModelInventory в фоновом потоке: диалог сразу показывает
+    снимок из кэша, а свежий приходит сигналом loaded, когда будет готов.
+    """
+    loaded = pyqtSignal(object)  # InventorySnapshot
+    failed = pyqtSignal(str)
+
+    def __init__(self, inventory: ModelInventory, parent=None):
+        super().__init__(parent)
+        self.inventory = inventory
+        self._thread = None
+
+    def is_loading(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def load(self, force: bool = False):
+        if not force and self.inventory.is_fresh():
+            self.loaded.emit(self.inventory.snapshot)
+            return
+        if self.is_loading():
+            return
+        self._thread = threading.Thread(target=self._run, name="eva-inventory", daemon=True)
+        self._thread.start()
+
+    def invalidate(self):
+        self.inventory.invalidate()
+
+    def _run(self):
+        try:
+            snapshot = self.inventory.refresh()
+        except OllamaError as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(snapshot)
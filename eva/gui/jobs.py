@@ -0,0 +1,50 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from eva.jobs import JobManager, ModelJob, PULL
+
+
+class ModelJobManager(QObject):
+    """
+    Очередь операций над моделями, принадлежащая главному окну: задания
+    продолжают выполняться после закрытия диалогов установки и удаления.
+
+    job_changed испускается при смене состояния задания (из рабочего потока,
+    доставляется в GUI-поток очередью Qt). Прогресс читается из самих заданий.
+    """
+    job_changed = pyqtSignal(object)  # ModelJob
+
+    def __init__(self, client, concurrency: int = 2, parent=None):
+        super().__init__(parent)
+        self.core = JobManager(client, concurrency, on_state=self.job_changed.emit)
+
+    @property
+    def jobs(self):
+        return self.core.jobs
+
+    @property
+    def concurrency(self) -> int:
+        return self.core.concurrency
+
+    def submit(self, models, kind: str = PULL):
+        return self.core.submit(models, kind)
+
+    def cancel(self, job: ModelJob):
+        self.core.cancel(job)
+
+    def retry(self, job: ModelJob):
+        self.core.retry(job)
+
+    def set_concurrency(self, concurrency: int):
+        self.core.set_concurrency(concurrency)
+
+    def clear_finished(self):
+        self.core.clear_finished()
+
+    def totals(self):
+        return self.core.totals()
+
+    def active_jobs(self):
+        return self.core.active_jobs()
+
+    def shutdown(self):
+        self.core.shutdown()
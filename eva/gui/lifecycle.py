@@ -0,0 +1,192 @@
+from typing import Dict, Iterable, Optional
+
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+from eva.docker import (
+    DEFAULT_STOP_TIMEOUT, SERVICES, STOP_TIMEOUTS,
+    compose_command, kill_command, stop_command, stop_ready,
+)
+from eva import startup, tracing
+from eva.gui.process import ProcessRunner
+from eva.shutdown import FAILED, KILL_GRACE_SECONDS, KILL_TIMEOUT_SECONDS, KILLED, NOT_RUNNING, STOPPED, STOPPING
+
+KILL_GRACE_MS = KILL_GRACE_SECONDS * 1000
+KILL_TIMEOUT_MS = KILL_TIMEOUT_SECONDS * 1000
+
+
+class StopPipeline(QObject):
+    """
+    Асинхронная остановка стека: сервисы останавливаются параллельно (`docker stop`
+    на каждый контейнер), но не раньше тех, кто от них зависит — postgres ждёт n8n
+    и pgadmin. Если сервис не уложился в таймаут, он добивается `docker kill`.
+    В конце `docker compose down` убирает остановленные контейнеры и сеть.
+
+    Все процессы — ProcessRunner (QProcess), поэтому цикл событий GUI не блокируется;
+    отработавшие удаляются сразу (deleteLater), сам конвейер удаляет владелец после finished.
+    Если и `docker kill` не ответил за KILL_TIMEOUT_SECONDS, сервис считается FAILED.
+    Без Qt (CLI) то же делает eva.shutdown.ShutdownOrchestrator.
+    """
+    progress = pyqtSignal(str, str)  # сервис, итог (STOPPED/KILLED/FAILED/NOT_RUNNING) или STOPPING
+    finished = pyqtSignal(dict)      # сервис → итог, плюс ключ "compose" для down
+
+    def __init__(self, compose_file: str, running: Optional[Iterable[str]] = None,
+                 cleanup: bool = True, parent=None):
+        super().__init__(parent)
+        self.compose_file = compose_file
+        self.cleanup = cleanup
+        # running=None — состояние неизвестно, пробуем остановить всё
+        self.pending = set(SERVICES) if running is None else set(running) & set(SERVICES)
+        self.results: Dict[str, str] = {service: NOT_RUNNING for service in SERVICES if service not in self.pending}
+        self.errors: Dict[str, str] = {}
+        self.procs: Dict[str, ProcessRunner] = {}
+        self.span = None
+        self.timers: Dict[str, QTimer] = {}
+        self.proc_down = None
+
+    def start(self):
+        self.span = tracing.span("stack.stop", services=sorted(self.pending))
+        for service, result in self.results.items():
+            self.progress.emit(service, result)
+        self._schedule()
+
+    def is_running(self) -> bool:
+        return bool(self.pending) or self.proc_down is not None
+
+    def _schedule(self):
+        for service in sorted(self.pending):
+            if service not in self.procs and stop_ready(service, self.pending - {service}):
+                self._stop_service(service)
+        if not self.pending:
+            self._finish_layers()
+
+    def _stop_service(self, service):
+        runner = ProcessRunner(self)
+        runner.finished.connect(lambda exitCode, tail, s=service: self.on_stop_finished(s, exitCode, tail))
+        self.procs[service] = runner
+        timeout_ms = STOP_TIMEOUTS.get(service, DEFAULT_STOP_TIMEOUT) * 1000 + KILL_GRACE_MS
+        self._start_timer(service, timeout_ms, self.escalate)
+        self.progress.emit(service, STOPPING)
+        runner.start("docker", stop_command(service), span="docker.stop", service=service)
+
+    def _done(self, service, result, error=""):
+        if service not in self.pending:
+            return
+        self.pending.discard(service)
+        self.results[service] = result
+        if error:
+            self.errors[service] = error
+        self._drop_timer(service)
+        runner = self.procs.pop(service, None)
+        if runner is not None:
+            runner.deleteLater()
+        self.progress.emit(service, result)
+        self._schedule()
+
+    def _start_timer(self, service, timeout_ms, handler):
+        self._drop_timer(service)
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.timeout.connect(lambda s=service: handler(s))
+        timer.start(timeout_ms)
+        self.timers[service] = timer
+
+    def _drop_timer(self, service):
+        timer = self.timers.pop(service, None)
+        if timer is not None:
+            timer.stop()
+            timer.deleteLater()
+
+    def on_stop_finished(self, service, exitCode, tail):
+        if exitCode == 0:
+            self._done(service, STOPPED)
+        elif "No such container" in tail:
+            self._done(service, NOT_RUNNING)
+        else:
+            self._done(service, FAILED, tail or f"Код выхода: {exitCode}")
+
+    def escalate(self, service):
+        """
+        `docker stop` завис дольше таймаута — прерываем его и шлём SIGKILL контейнеру.
+        """
+        runner = self.procs.get(service)
+        if runner is None:
+            return
+        runner.kill(silent=True)
+        runner.deleteLater()
+        killer = ProcessRunner(self)
+        killer.finished.connect(lambda exitCode, tail, s=service: self._done(
+            s, KILLED if exitCode == 0 else FAILED, "" if exitCode == 0 else tail or "docker kill не сработал"))
+        self.procs[service] = killer
+        self._start_timer(service, KILL_TIMEOUT_MS, self.on_kill_timeout)
+        killer.start("docker", kill_command(service), span="docker.kill", service=service)
+
+    def on_kill_timeout(self, service):
+        """
+        Завис и `docker kill` (например, демон Docker не отвечает) — не ждём его бесконечно.
+        """
+        killer = self.procs.get(service)
+        if killer is not None:
+            killer.kill(silent=True)
+        self._done(service, FAILED, "docker kill не ответил")
+
+    def _finish_layers(self):
+        if self.proc_down is not None:
+            return
+        if not self.cleanup:
+            self._end_span()
+            self.finished.emit(dict(self.results))
+            return
+        # Контейнеры уже остановлены, down лишь удаляет их и сеть — это быстро
+        self.proc_down = ProcessRunner(self)
+        self.proc_down.finished.connect(self.on_down_finished)
+        self.proc_down.start("docker", compose_command(self.compose_file, "down"), span="compose.down")
+
+    def on_down_finished(self, exitCode, tail):
+        self.proc_down.deleteLater()
+        self.proc_down = None
+        self.cleanup = False
+        if exitCode == 0:
+            self.results["compose"] = STOPPED
+        else:
+            self.results["compose"] = FAILED
+            self.errors["compose"] = tail
+        self._end_span()
+        self.finished.emit(dict(self.results))
+
+    def _end_span(self):
+        if self.span is not None:
+            failed = FAILED in self.results.values()
+            self.span.end(tracing.ERROR if failed else tracing.OK, results=dict(self.results))
+            self.span = None
+
+
+class StartupTask(QThread):
+    """
+    Запускает StartupOrchestrator в рабочем потоке и пересылает его события сигналами.
+    """
+    stage = pyqtSignal(str)
+    service_ready = pyqtSignal(str, float)  # сервис, секунды до готовности
+    service_timeout = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    done = pyqtSignal(dict)                 # отчёт StartupOrchestrator.run()
+
+    def __init__(self, compose_file: str, probes=None, states=None, parent=None):
+        super().__init__(parent)
+        self.orchestrator = startup.StartupOrchestrator(compose_file, probes, on_event=self.on_event, states=states)
+
+    def on_event(self, kind, service, payload):
+        if kind == startup.STAGE:
+            self.stage.emit(payload)
+        elif kind == startup.READY:
+            self.service_ready.emit(service, payload)
+        elif kind == startup.TIMEOUT:
+            self.service_timeout.emit(service)
+        elif kind == startup.FAILED:
+            self.failed.emit(payload)
+
+    def run(self):
+        self.done.emit(self.orchestrator.run())
+
+    def stop(self):
+        self.orchestrator.cancel()
+        self.wait()
@@ -0,0 +1,193 @@
+import time
+from typing import Dict, Optional
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QObject, QProcess, Qt, QTimer, pyqtSignal
+
+from eva.docker import SERVICES
+from eva.logs import DEFAULT_MAX_LINES, DEFAULT_TAIL, LogBuffer, LogFilter, logs_command
+from eva.output import LineSplitter
+
+
+class LogFollower(QObject):
+    """
+    `docker logs --follow` по каждому сервису стека, каждый в свой LogBuffer.
+
+    Строки складываются в буфер по мере прихода (память ограничена ёмкостью
+    буфера, сколько бы ни писал сервис), а appended испускается не чаще раза
+    в UPDATE_MS — перерисовка не зависит от болтливости сервиса. Если поток
+    оборвался (контейнер остановлен или перезапущен), через RETRY_MS
+    подключаемся снова с --since, не повторяя уже прочитанное.
+    Работает между start() и stop(), как StatsMonitor.
+    """
+    appended = pyqtSignal(str)  # сервис, в буфер которого пришли строки
+    UPDATE_MS = 200
+    RETRY_MS = 5000
+
+    def __init__(self, parent=None, max_lines: int = DEFAULT_MAX_LINES, tail: int = DEFAULT_TAIL):
+        super().__init__(parent)
+        self.tail = tail
+        self.buffers: Dict[str, LogBuffer] = {service: LogBuffer(max_lines) for service in SERVICES}
+        self.procs: Dict[str, QProcess] = {}
+        self.splitters: Dict[str, LineSplitter] = {}
+        self.ended_at: Dict[str, float] = {}  # когда оборвался поток — для --since
+        self.closed = set()  # сервисы, чей поток оборван и ещё не восстановлен
+        # Вывод переподключения, пока не ясно, живой ли это поток или та же ошибка («No such container»)
+        self.pending: Dict[str, list] = {}
+        self.dirty = set()
+        self.active = False
+        self.update_timer = QTimer(self)
+        self.update_timer.setInterval(self.UPDATE_MS)
+        self.update_timer.timeout.connect(self.flush)
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setInterval(self.RETRY_MS)
+        self.retry_timer.timeout.connect(self.spawn_missing)
+
+    def start(self):
+        self.active = True
+        self.ended_at.clear()
+        self.closed.clear()
+        self.pending.clear()
+        for buffer in self.buffers.values():
+            buffer.clear()
+        self.update_timer.start()
+        self.retry_timer.start()
+        self.spawn_missing()
+
+    def stop(self):
+        self.active = False
+        self.update_timer.stop()
+        self.retry_timer.stop()
+        for proc in self.procs.values():
+            proc.blockSignals(True)
+            proc.kill()
+            proc.waitForFinished(1000)
+        self.procs.clear()
+
+    def spawn_missing(self):
+        for service in SERVICES:
+            if service not in self.procs:
+                self.spawn(service)
+
+    def spawn(self, service: str):
+        if not self.active:
+            return
+        self.splitters[service] = LineSplitter()
+        proc = QProcess(self)
+        # docker logs отдаёт stderr контейнера в свой stderr — нужны оба потока по порядку
+        proc.setProcessChannelMode(QProcess.MergedChannels)
+        proc.readyReadStandardOutput.connect(lambda: self.on_output(service))
+        proc.finished.connect(lambda exitCode, exitStatus: self.on_finished(service, exitCode))
+        proc.errorOccurred.connect(lambda error: self.on_error(service, error))
+        self.procs[service] = proc
+        proc.start("docker", logs_command(service, self.tail, self.ended_at.get(service)))
+
+    def on_output(self, service: str):
+        proc = self.procs.get(service)
+        if proc is None:
+            return
+        lines = self.splitters[service].feed(proc.readAllStandardOutput().data())
+        if lines and service in self.closed:
+            self.pending.setdefault(service, []).extend(lines)
+        elif lines:
+            self.buffers[service].extend(lines)
+            self.dirty.add(service)
+
+    def on_finished(self, service: str, exitCode: int):
+        proc = self.procs.pop(service, None)
+        if proc is None:
+            return
+        lines = (self.pending.pop(service, []) + self.splitters[service].feed(proc.readAllStandardOutput().data())
+                 + self.splitters[service].flush())
+        if exitCode != 0 and service in self.closed:
+            lines = []  # та же ошибка при каждой попытке переподключения — уже показана
+        self.buffers[service].extend(lines)
+        if service not in self.closed:
+            self.closed.add(service)
+            self.buffers[service].append("── поток лога закрыт (контейнер остановлен?), переподключение... ──")
+        if lines or service in self.closed:
+            self.dirty.add(service)
+        self.ended_at[service] = time.time()
+        proc.deleteLater()
+
+    def on_error(self, service: str, error):
+        if error == QProcess.FailedToStart:
+            proc = self.procs.pop(service, None)
+            if proc is not None:
+                proc.deleteLater()
+
+    def flush(self):
+        for service in list(self.pending):
+            # Поток пережил такт обновления — контейнер снова пишет лог
+            if service in self.procs:
+                self.closed.discard(service)
+                self.buffers[service].extend(self.pending.pop(service))
+                self.dirty.add(service)
+        for service in sorted(self.dirty):
+            self.appended.emit(service)
+        self.dirty.clear()
+
+
+class LogListModel(QAbstractListModel):
+    """
+    Строки одного LogBuffer для таблицы в одну колонку, с фильтром.
+
+    Список виртуализирован: data() спрашивается только для видимых строк,
+    поэтому размер буфера на отрисовку не влияет. refresh() сообщает виду
+    только о вытесненных сверху и добавленных снизу строках, без сброса модели —
+    выделение и прокрутка сохраняются.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.buffer: Optional[LogBuffer] = None
+        self.filter: Optional[LogFilter] = None
+        self._rows = 0
+        self._generation = 0
+
+    def set_buffer(self, buffer: Optional[LogBuffer], text: str = ""):
+        self.beginResetModel()
+        self.buffer = buffer
+        self.filter = LogFilter(buffer, text) if buffer is not None else None
+        self._rows = len(self.filter) if self.filter is not None else 0
+        self._generation = buffer.generation if buffer is not None else 0
+        self.endResetModel()
+
+    def set_filter(self, text: str):
+        if self.filter is None:
+            return
+        self.beginResetModel()
+        self.filter.set_text(text)
+        self._rows = len(self.filter)
+        self.endResetModel()
+
+    def refresh(self):
+        if self.buffer is None:
+            return
+        if self.buffer.generation != self._generation:
+            # Буфер очищен (новое подключение к логам) — номера строк начались заново
+            self.set_buffer(self.buffer, self.filter.text)
+            return
+        removed, added = self.filter.update()
+        if removed >= self._rows and self._rows:
+            self.beginResetModel()
+            self._rows = len(self.filter)
+            self.endResetModel()
+            return
+        if removed:
+            self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+            self._rows -= removed
+            self.endRemoveRows()
+        if added:
+            self.beginInsertRows(QModelIndex(), self._rows, self._rows + added - 1)
+            self._rows += added
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid() or index.row() >= self._rows:
+            return None
+        return self.buffer.line(self.filter.seq(index.row()))
+
+    def lines(self, rows) -> list:
+        return [self.buffer.line(self.filter.seq(row)) for row in rows if row < self._rows]
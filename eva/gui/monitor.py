@@ -0,0 +1,118 @@
+from PyQt5.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+from eva import tracing
+from eva.docker import ContainerStateTable, RUNNING, events_command, snapshot_command
+from eva.output import LineSplitter
+
+
+class ContainerMonitor(QObject):
+    """
+    Единственный долгоживущий `docker events` на всё приложение.
+
+    Держит в памяти состояния сервисов стека и испускает state_changed только
+    при реальной смене состояния. Диалоги и статусная строка читают кэш через
+    state()/is_running() вместо запуска `docker ps` на каждое действие.
+    """
+    state_changed = pyqtSignal(str, str)  # сервис, новое состояние
+    RETRY_MS = 5000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.table = ContainerStateTable()
+        self.proc_events = None
+        self.proc_snapshot = None
+        self.events_span = None
+        self.snapshot_span = None
+        self.splitter = LineSplitter()
+        # Если docker не запущен — переподключаемся периодически
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.start)
+
+    def start(self):
+        if self.proc_events is not None:
+            return
+        self.splitter = LineSplitter()
+        self.proc_events = QProcess(self)
+        self.proc_events.readyReadStandardOutput.connect(self.on_events_output)
+        self.proc_events.finished.connect(self.on_events_finished)
+        self.proc_events.errorOccurred.connect(self.on_events_error)
+        self.events_span = tracing.span("docker.events")
+        self.proc_events.start("docker", events_command())
+        # Снимок берём после подписки на события, чтобы не пропустить переход между ними
+        self.refresh()
+
+    def stop(self):
+        self.retry_timer.stop()
+        for proc in (self.proc_events, self.proc_snapshot):
+            if proc is not None:
+                proc.blockSignals(True)
+                proc.kill()
+                proc.waitForFinished(1000)
+        # finished заблокирован — спаны закрываем сами, иначе они не попадут ни в trace.jsonl, ни в метрики
+        for span in (self.events_span, self.snapshot_span):
+            if span is not None:
+                span.end(tracing.OK, stopped=True)
+        self.events_span = None
+        self.snapshot_span = None
+        self.proc_events = None
+        self.proc_snapshot = None
+
+    def refresh(self):
+        """
+        Разовая сверка таблицы с `docker ps -a` (например, после старта или остановки стека).
+        """
+        if self.proc_snapshot is not None:
+            return
+        self.proc_snapshot = QProcess(self)
+        self.proc_snapshot.finished.connect(self.on_snapshot_finished)
+        self.proc_snapshot.errorOccurred.connect(self.on_snapshot_error)
+        self.snapshot_span = tracing.span("docker.ps")
+        self.proc_snapshot.start("docker", snapshot_command())
+
+    def state(self, service: str) -> str:
+        return self.table.get(service)
+
+    def is_running(self, service: str) -> bool:
+        return self.table.get(service) == RUNNING
+
+    def _emit(self, changes):
+        for service, state in changes:
+            self.state_changed.emit(service, state)
+
+    def on_events_output(self):
+        if not self.proc_events:
+            return
+        for line in self.splitter.feed(self.proc_events.readAllStandardOutput().data()):
+            self._emit(self.table.apply_event_line(line))
+
+    def on_events_finished(self, exitCode, exitStatus):
+        # Поток событий оборвался (docker остановлен или перезапущен)
+        self.proc_events = None
+        if self.events_span is not None:
+            self.events_span.end(exit_code=exitCode)
+            self.events_span = None
+        self._emit(self.table.mark_unknown())
+        self.retry_timer.start(self.RETRY_MS)
+
+    def on_events_error(self, error):
+        if error == QProcess.FailedToStart:
+            # docker не установлен — finished в этом случае не приходит
+            self.on_events_finished(-1, QProcess.CrashExit)
+
+    def on_snapshot_finished(self, exitCode, exitStatus):
+        proc, self.proc_snapshot = self.proc_snapshot, None
+        if proc is None:
+            return
+        output = proc.readAllStandardOutput().data()
+        self.snapshot_span.end(exit_code=exitCode, output_bytes=len(output))
+        if exitCode != 0:
+            self._emit(self.table.mark_unknown())
+            return
+        self._emit(self.table.apply_snapshot(output.decode(errors="replace")))
+
+    def on_snapshot_error(self, error):
+        if error == QProcess.FailedToStart:
+            self.proc_snapshot = None
+            self.snapshot_span.end(exit_code=-1, error="failed to start")
+            self._emit(self.table.mark_unknown())
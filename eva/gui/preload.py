@@ -0,0 +1,50 @@
+import threading
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from eva.ollama import OllamaError
+from eva.preload import PreloadScheduler
+
+
+class PreloadRunner(QObject):
+    """
+    Периодический запуск PreloadScheduler.tick() в фоновом потоке.
+    Следующий проход не начинается, пока не закончился предыдущий
+    (загрузка больших моделей может идти минуты).
+    """
+    report = pyqtSignal(object)  # [(модель, действие, подробности)]
+    failed = pyqtSignal(str)
+
+    def __init__(self, scheduler: PreloadScheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(scheduler.config.interval * 1000))
+        self.timer.timeout.connect(self.tick)
+        self._thread = None
+
+    def start(self):
+        self.scheduler.stop_event.clear()
+        self.timer.start()
+        self.tick()
+
+    def stop(self):
+        self.timer.stop()
+        self.scheduler.stop()
+
+    def is_running(self) -> bool:
+        return self.timer.isActive()
+
+    def tick(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="eva-preload", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            report = self.scheduler.tick()
+        except OllamaError as e:
+            self.failed.emit(str(e))
+            return
+        self.report.emit(report)
@@ -0,0 +1,127 @@
+from typing import List, Optional
+
+from PyQt5.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+from eva import tracing
+from eva.output import LineSplitter, RingLog, parse_progress
+
+
+class ProcessRunner(QObject):
+    """
+    QProcess для долгих операций с ограниченным по памяти выводом.
+
+    - stdout и stderr объединены и построчно (инкрементально) складываются в RingLog;
+    - прогресс-бары, перерисовываемые через '\\r', не плодят строк;
+    - updated испускается не чаще interval_ms (по умолчанию 10 раз в секунду),
+      сколько бы readyRead ни пришло за это время;
+    - если в start() передан span, запуск пишется спаном eva.tracing
+      (длительность, код выхода, объём вывода).
+    """
+    updated = pyqtSignal(str, object)  # последняя непустая строка, процент или None
+    finished = pyqtSignal(int, str)    # код выхода (-1 — не удалось запустить), хвост лога
+
+    def __init__(self, parent=None, max_lines: int = 2000, interval_ms: int = 100, tail_lines: int = 40):
+        super().__init__(parent)
+        self.log = RingLog(max_lines)
+        self.splitter = LineSplitter()
+        self.tail_lines = tail_lines
+        self.last_line = ""
+        self.progress: Optional[float] = None
+        self._dirty = False
+        self.proc: Optional[QProcess] = None
+        self.span: Optional[tracing.Span] = None
+        self.output_bytes = 0
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.flush_update)
+
+    def start(self, program: str, args: List[str], span: Optional[str] = None, **attrs):
+        self.log.clear()
+        self.output_bytes = 0
+        self.span = tracing.span(span, **attrs) if span else None
+        self.splitter = LineSplitter()
+        self.last_line = ""
+        self.progress = None
+        self.proc = QProcess(self)
+        self.proc.setProcessChannelMode(QProcess.MergedChannels)
+        self.proc.readyReadStandardOutput.connect(self.on_output)
+        self.proc.finished.connect(self.on_finished)
+        self.proc.errorOccurred.connect(self.on_error)
+        self.timer.start()
+        self.proc.start(program, args)
+
+    def is_running(self) -> bool:
+        return self.proc is not None
+
+    def kill(self, silent: bool = False):
+        """
+        Убивает процесс; при silent=True сигнал finished не испускается,
+        а процесс дожидается завершения сразу — runner можно удалять (deleteLater).
+        """
+        if self.proc is None:
+            return
+        proc = self.proc
+        if silent:
+            proc.blockSignals(True)
+            self.proc = None
+            self.timer.stop()
+            self._end_span(tracing.ERROR, killed=True)
+        proc.kill()
+        if silent:
+            proc.waitForFinished(1000)
+
+    def tail(self, count: Optional[int] = None) -> str:
+        return self.log.text(count or self.tail_lines)
+
+    def _consume(self, lines):
+        self.log.extend(lines)
+        partial = self.splitter.partial
+        for line in reversed(lines + ([partial] if partial else [])):
+            if line.strip():
+                self.last_line = line.strip()
+                progress = parse_progress(self.last_line)
+                if progress is not None:
+                    self.progress = progress
+                self._dirty = True
+                break
+
+    def _end_span(self, status=None, **attrs):
+        if self.span is not None:
+            self.span.end(status, output_bytes=self.output_bytes, **attrs)
+            self.span = None
+
+    def _read(self) -> bytes:
+        data = self.proc.readAllStandardOutput().data()
+        self.output_bytes += len(data)
+        return data
+
+    def on_output(self):
+        if self.proc is None:
+            return
+        self._consume(self.splitter.feed(self._read()))
+
+    def flush_update(self):
+        if self._dirty:
+            self._dirty = False
+            self.updated.emit(self.last_line, self.progress)
+
+    def on_finished(self, exitCode, exitStatus):
+        if self.proc is None:
+            return
+        self._consume(self.splitter.feed(self._read()) + self.splitter.flush())
+        self.proc = None
+        self.timer.stop()
+        self.flush_update()
+        if exitStatus == QProcess.CrashExit and exitCode == 0:
+            exitCode = -1
+        self._end_span(exit_code=exitCode)
+        self.finished.emit(exitCode, self.tail())
+
+    def on_error(self, error):
+        if error == QProcess.FailedToStart and self.proc is not None:
+            program = self.proc.program()
+            self.proc = None
+            self.timer.stop()
+            self.log.append(f"Не удалось запустить {program}")
+            self._end_span(exit_code=-1, error="failed to start")
+            self.finished.emit(-1, self.tail())
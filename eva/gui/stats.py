@@ -0,0 +1,125 @@
+import time
+
+from PyQt5.QtCore import QObject, QPointF, QProcess, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter, QPen, QPolygonF
+from PyQt5.QtWidgets import QWidget
+
+from eva.output import LineSplitter
+from eva.stats import ResourceHistory, parse_stats_line, stats_command
+
+# Сервис, по которому нет сэмплов дольше этого, считается остановленным
+STALE_SECONDS = 5.0
+
+
+class StatsMonitor(QObject):
+    """
+    Один долгоживущий `docker stats` вместо процесса на каждый замер.
+
+    Сэмплы складываются в ResourceHistory по мере прихода, а updated
+    испускается не чаще раза в UPDATE_MS, чтобы перерисовка не стоила
+    больше самого сбора. Работает только между start() и stop() — окно
+    ресурсов запускает монитор, пока оно открыто.
+    """
+    updated = pyqtSignal()
+    UPDATE_MS = 1000
+    RETRY_MS = 5000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.history = ResourceHistory()
+        self.proc = None
+        self.splitter = LineSplitter()
+        self.active = False
+        self.dirty = False
+        self.update_timer = QTimer(self)
+        self.update_timer.setInterval(self.UPDATE_MS)
+        self.update_timer.timeout.connect(self.flush)
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.spawn)
+
+    def start(self):
+        self.active = True
+        self.update_timer.start()
+        self.spawn()
+
+    def stop(self):
+        self.active = False
+        self.update_timer.stop()
+        self.retry_timer.stop()
+        if self.proc is not None:
+            self.proc.blockSignals(True)
+            self.proc.kill()
+            self.proc.waitForFinished(1000)
+            self.proc = None
+
+    def spawn(self):
+        if self.proc is not None or not self.active:
+            return
+        self.splitter = LineSplitter()
+        self.proc = QProcess(self)
+        self.proc.readyReadStandardOutput.connect(self.on_output)
+        self.proc.finished.connect(self.on_finished)
+        self.proc.errorOccurred.connect(self.on_error)
+        self.proc.start("docker", stats_command())
+
+    def is_stale(self, service: str) -> bool:
+        sample = self.history.latest(service)
+        return sample is None or time.monotonic() - sample.time > STALE_SECONDS
+
+    def on_output(self):
+        if not self.proc:
+            return
+        for line in self.splitter.feed(self.proc.readAllStandardOutput().data()):
+            parsed = parse_stats_line(line)
+            if parsed is not None:
+                self.history.append(*parsed)
+                self.dirty = True
+
+    def flush(self):
+        # Остановленные контейнеры пропадают из потока docker stats — их строки тоже надо обновить
+        if self.dirty or any(self.history.samples):
+            self.dirty = False
+            self.updated.emit()
+
+    def on_finished(self, exitCode, exitStatus):
+        self.proc = None
+        if self.active:
+            self.retry_timer.start(self.RETRY_MS)
+
+    def on_error(self, error):
+        if error == QProcess.FailedToStart:
+            self.on_finished(-1, QProcess.CrashExit)
+
+
+class Sparkline(QWidget):
+    """
+    Мини-график истории значения. Рисуется только при setValues() и только
+    видимая часть: последние width() точек, по пикселю на сэмпл.
+    """
+    def __init__(self, color: str = "#4caf50", parent=None):
+        super().__init__(parent)
+        self.values = []
+        self.maximum = None
+        self.color = QColor(color)
+        self.setMinimumSize(120, 28)
+
+    def setValues(self, values, maximum=None):
+        self.values = values
+        self.maximum = maximum
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 40))
+        values = self.values[-max(2, self.width()):]
+        if len(values) < 2:
+            return
+        top = self.maximum or max(values) or 1.0
+        height = self.height() - 2
+        step = self.width() / (len(values) - 1)
+        points = QPolygonF([QPointF(index * step, 1 + height - min(value, top) * height / top)
+                            for index, value in enumerate(values)])
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(self.color, 1.5, Qt.SolidLine))
+        painter.drawPolyline(points)
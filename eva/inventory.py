@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from typing import Iterable, List, NamedTuple, Optional
+
+from eva.ollama import OllamaClient
+
+# Список моделей меняется только через pull/rm, которые сбрасывают кэш сами;
+# TTL нужен на случай `ollama pull` из консоли в обход лаунчера
+DEFAULT_TTL = 300.0
+
+
+class ModelInfo(NamedTuple):
+    """
+    Установленная модель из GET /api/tags.
+    """
+    name: str
+    size: int
+    digest: str
+    quantization: str = ""
+    parameter_size: str = ""
+    family: str = ""
+    modified: str = ""
+
+    @property
+    def short_digest(self) -> str:
+        return self.digest.split(":")[-1][:12]
+
+    @property
+    def modified_text(self) -> str:
+        # "2024-05-10T14:03:11.123456789+03:00" → "2024-05-10 14:03"
+        return self.modified[:16].replace("T", " ")
+
+
+class InventorySnapshot(NamedTuple):
+    models: List[ModelInfo]
+    disk_usage: Optional[int]  # байт в ollama_data (None — папка недоступна)
+    fetched_at: float  # time.monotonic()
+    stale: bool = False  # после pull/delete: показывать можно, но при get() обновить
+
+    @property
+    def total_size(self) -> int:
+        return sum(model.size for model in self.models)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+def parse_model(entry: dict) -> ModelInfo:
+    details = entry.get("details") or {}
+    return ModelInfo(
+        name=entry.get("name") or entry.get("model") or "",
+        size=int(entry.get("size") or 0),
+        digest=entry.get("digest") or "",
+        quantization=details.get("quantization_level") or "",
+        parameter_size=details.get("parameter_size") or "",
+        family=details.get("family") or "",
+        modified=entry.get("modified_at") or "",
+    )
+
+
+def normalize_name(name: str) -> str:
+    # Ollama дописывает тег по умолчанию: "llama3" и "llama3:latest" — одна модель
+    return name if ":" in name.rsplit("/", 1)[-1] else name + ":latest"
+
+
+def directory_size(path: str) -> Optional[int]:
+    """
+    Размер папки на диске (без перехода по симлинкам); None, если папки нет.
+    """
+    if not os.path.isdir(path):
+        return None
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+    return total
+
+
+class ModelInventory:
+    """
+    Кэш списка установленных моделей Ollama.
+
+    get() отдаёт снимок из памяти, пока он моложе ttl, и только потом
+    обращается к /api/tags и пересчитывает размер data_dir (bind mount
+    ./ollama_data). invalidate() вызывается после каждого pull/delete.
+    Методы потокобезопасны; refresh() блокирующий — из GUI его зовут в потоке.
+    """
+    def __init__(self, client: OllamaClient, data_dir: Optional[str] = None, ttl: float = DEFAULT_TTL):
+        self.client = client
+        self.data_dir = data_dir
+        self.ttl = ttl
+        self._snapshot: Optional[InventorySnapshot] = None
+        self._generation = 0  # растёт при каждом invalidate()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> Optional[InventorySnapshot]:
+        """
+        Последний снимок, даже устаревший (для мгновенного показа до обновления).
+        """
+        return self._snapshot
+
+    def is_fresh(self) -> bool:
+        snapshot = self._snapshot
+        return snapshot is not None and not snapshot.stale and snapshot.age < self.ttl
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            if self._snapshot is not None:
+                # Устаревший снимок остаётся для показа, но следующий get() его обновит
+                self._snapshot = self._snapshot._replace(stale=True)
+
+    def refresh(self) -> InventorySnapshot:
+        """
+        Запрашивает список заново; при OllamaError кэш не трогается.
+        """
+        with self._refresh_lock:
+            generation = self._generation
+            models = sorted((parse_model(entry) for entry in self.client.tags()), key=lambda model: model.name)
+            disk_usage = directory_size(self.data_dir) if self.data_dir else None
+            snapshot = InventorySnapshot(models, disk_usage, time.monotonic())
+            with self._lock:
+                if generation != self._generation:
+                    # Пока шёл запрос, закончился pull/delete — ответ мог устареть
+                    snapshot = snapshot._replace(stale=True)
+                self._snapshot = snapshot
+            return snapshot
+
+    def get(self, force: bool = False) -> InventorySnapshot:
+        if not force and self.is_fresh():
+            return self._snapshot
+        return self.refresh()
+
+    def unknown(self, names: Iterable[str]) -> List[str]:
+        """
+        Имена, которых нет среди установленных моделей по последнему снимку
+        (пустой список, если свежего снимка нет — проверять не по чему).
+        """
+        snapshot = self._snapshot
+        if not self.is_fresh():
+            return []
+        installed = {normalize_name(model.name) for model in snapshot.models}
+        return [name for name in names if normalize_name(name) not in installed]
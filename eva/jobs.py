@@ -0,0 +1,265 @@
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from eva import tracing
+from eva.ollama import OllamaClient, OllamaError, PullProgress, format_progress, shutdown_connection
+
+# Операции
+PULL = "pull"
+DELETE = "delete"
+
+# Состояния задания
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Итог задания → статус спана eva.tracing; отмена — не ошибка, а ok с cancelled=True
+TRACE_STATUS = {DONE: tracing.OK, CANCELLED: tracing.OK, FAILED: tracing.ERROR}
+
+# Окно сглаживания скорости загрузки (экспоненциальное среднее)
+SPEED_SMOOTHING = 0.3
+
+
+class ModelJob:
+    """
+    Одна операция над моделью (pull или delete) в очереди JobManager.
+
+    Прогресс pull складывается из слоёв (digest → completed/total), поэтому
+    total растёт по мере того, как Ollama объявляет новые слои.
+    """
+    def __init__(self, job_id: int, model: str, kind: str = PULL):
+        self.id = job_id
+        self.model = model
+        self.kind = kind
+        self.state = QUEUED
+        self.status_text = ""
+        self.error = ""
+        self.layers: Dict[str, Tuple[int, int]] = {}
+        self.speed = 0.0  # байт/с
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self.connection = None  # соединение стрима pull — cancel() обрывает его сразу
+        self._sample: Optional[Tuple[float, int]] = None
+
+    @property
+    def completed(self) -> int:
+        return sum(done for done, total in self.layers.values())
+
+    @property
+    def total(self) -> int:
+        return sum(total for done, total in self.layers.values())
+
+    @property
+    def percent(self) -> Optional[float]:
+        if self.state == DONE:
+            return 100.0
+        total = self.total
+        return self.completed * 100.0 / total if total else None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def reset(self):
+        self.state = QUEUED
+        self.status_text = ""
+        self.error = ""
+        self.layers = {}
+        self.speed = 0.0
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.connection = None
+        self._sample = None
+
+    def update(self, progress: PullProgress, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self.status_text = format_progress(progress)
+        if progress.digest and progress.total:
+            self.layers[progress.digest] = (progress.completed, progress.total)
+        completed = self.completed
+        if self._sample is not None:
+            last_time, last_completed = self._sample
+            elapsed = now - last_time
+            if elapsed >= 0.5:
+                instant = max(0, completed - last_completed) / elapsed
+                self.speed = instant if not self.speed else (
+                    SPEED_SMOOTHING * instant + (1 - SPEED_SMOOTHING) * self.speed)
+                self._sample = (now, completed)
+        else:
+            self._sample = (now, completed)
+
+
+class JobManager:
+    """
+    Очередь операций над моделями с ограничением параллельности.
+
+    Каждое выполняемое задание — отдельный поток, но одновременно их не больше
+    concurrency. on_state(job) вызывается из рабочих потоков при смене состояния
+    задания; прогресс (completed/total/speed) обновляется в объекте задания и
+    читается владельцем с нужной ему частотой.
+    """
+    def __init__(self, client: OllamaClient, concurrency: int = 2,
+                 on_state: Optional[Callable[[ModelJob], None]] = None):
+        self.client = client
+        self.concurrency = max(1, concurrency)
+        self.on_state = on_state or (lambda job: None)
+        self.jobs: List[ModelJob] = []
+        self._queue: deque = deque()
+        self._active = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, models: Iterable[str], kind: str = PULL) -> List[ModelJob]:
+        """
+        Ставит модели в очередь; модель, уже ожидающая или выполняемая с той же операцией, пропускается.
+        """
+        added = []
+        with self._lock:
+            busy = {(job.model, job.kind) for job in self.jobs if not job.finished}
+            for model in models:
+                model = model.strip()
+                if not model or (model, kind) in busy:
+                    continue
+                busy.add((model, kind))
+                job = ModelJob(next(self._ids), model, kind)
+                self.jobs.append(job)
+                self._queue.append(job)
+                added.append(job)
+        for job in added:
+            self.on_state(job)
+        self._dispatch()
+        return added
+
+    def cancel(self, job: ModelJob) -> bool:
+        """
+        Отменяет задание в очереди или идущий pull; False — отменять нечего.
+        Идущее удаление не отменяется: это один короткий запрос, и Ollama
+        всё равно доведёт его до конца.
+        """
+        with self._lock:
+            if job.state == QUEUED:
+                self._queue.remove(job)
+                job.state = CANCELLED
+                job.finished_at = time.monotonic()
+            elif job.state == RUNNING and job.kind == PULL:
+                # Обрываем стрим сразу: зависший pull может не присылать событий минутами
+                job.cancel_event.set()
+                connection = job.connection
+                if connection is not None:
+                    shutdown_connection(connection)
+                return True
+            else:
+                return False
+        self.on_state(job)
+        return True
+
+    def retry(self, job: ModelJob):
+        with self._lock:
+            if not job.finished or job.state == DONE:
+                return
+            job.reset()
+            self._queue.append(job)
+        self.on_state(job)
+        self._dispatch()
+
+    def set_concurrency(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self._dispatch()
+
+    def clear_finished(self):
+        with self._lock:
+            self.jobs = [job for job in self.jobs if not job.finished]
+
+    def shutdown(self):
+        with self._lock:
+            queued = list(self._queue)
+        for job in queued:
+            self.cancel(job)
+        for job in list(self.jobs):
+            if job.state == RUNNING:
+                self.cancel(job)
+
+    def active_jobs(self) -> List[ModelJob]:
+        return [job for job in self.jobs if not job.finished]
+
+    def totals(self) -> Tuple[int, int, float]:
+        """
+        Суммарный прогресс всех pull-заданий: (completed, total, скорость байт/с).
+        """
+        completed = total = 0
+        speed = 0.0
+        for job in list(self.jobs):
+            if job.kind != PULL or job.state == CANCELLED:
+                continue
+            completed += job.completed
+            total += job.total
+            if job.state == RUNNING:
+                speed += job.speed
+        return completed, total, speed
+
+    def _dispatch(self):
+        started = []
+        with self._lock:
+            while self._queue and self._active < self.concurrency:
+                job = self._queue.popleft()
+                job.state = RUNNING
+                job.started_at = time.monotonic()
+                self._active += 1
+                started.append(job)
+        for job in started:
+            self.on_state(job)
+            threading.Thread(target=self._run, args=(job,), name=f"eva-job-{job.id}", daemon=True).start()
+
+    def _attach(self, job: ModelJob, connection):
+        with self._lock:
+            job.connection = connection
+            cancelled = job.cancel_event.is_set()
+        if cancelled:  # отменили, пока соединение устанавливалось
+            shutdown_connection(connection)
+
+    def _run(self, job: ModelJob):
+        trace = tracing.span(f"model.{job.kind}", model=job.model)
+        state = FAILED
+        try:
+            if job.kind == PULL:
+                events = self.client.pull(job.model, on_connection=lambda conn: self._attach(job, conn))
+                status = ""
+                for progress in events:
+                    job.update(progress)
+                    status = progress.status
+                    if job.cancel_event.is_set() and status != "success":
+                        events.close()
+                        break
+                # Итог — по тому, что прислала Ollama: отмена после "success" загрузку уже не отменила,
+                # а оборванный cancel() стрим может закончиться и без ошибки
+                state = DONE if status == "success" or not job.cancel_event.is_set() else CANCELLED
+            else:
+                self.client.delete(job.model)
+                state = DONE
+        except OllamaError as e:
+            if job.kind == PULL and job.cancel_event.is_set():
+                state = CANCELLED  # обрыв соединения — это и есть отмена
+            else:
+                job.error = str(e)
+        except Exception as e:  # обрыв соединения, битая строка прогресса — задание не должно занять слот навсегда
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            trace.end(TRACE_STATUS[state], cancelled=state == CANCELLED,
+                      bytes=job.total if job.kind == PULL else 0, error=job.error or None)
+            with self._lock:
+                job.state = state
+                job.connection = None
+                job.speed = 0.0
+                job.finished_at = time.monotonic()
+                self._active -= 1
+            self.on_state(job)
+            self._dispatch()
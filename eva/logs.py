@@ -0,0 +1,164 @@
+import bisect
+from typing import List, Optional, Tuple
+
+from eva.docker import SERVICES
+
+# Строк в буфере на сервис: n8n в debug пишет десятки тысяч строк за прогон
+DEFAULT_MAX_LINES = 100_000
+# Сколько уже накопленных строк забрать при подключении к логу
+DEFAULT_TAIL = 5000
+MAX_LINE_LENGTH = 4096
+
+
+def logs_command(service: str, tail: Optional[int] = DEFAULT_TAIL, since: Optional[float] = None) -> List[str]:
+    """
+    Аргументы `docker ...` для непрерывного лога контейнера сервиса.
+    since (unix-время) — продолжение после переподключения, без повтора уже прочитанного хвоста.
+    """
+    args = ["logs", "--follow"]
+    if since is not None:
+        args += ["--since", str(int(since))]
+    else:
+        args += ["--tail", "all" if tail is None else str(tail)]
+    return args + [SERVICES[service]]
+
+
+class LogBuffer:
+    """
+    Кольцевой буфер строк лога фиксированной ёмкости.
+
+    В отличие от RingLog (deque), строка берётся по номеру за O(1) — это нужно
+    виртуализированному списку, который спрашивает только видимые строки.
+    Номера сквозные: total — номер следующей строки, first — самой старой из
+    сохранённых; всё, что старше, вытеснено. generation меняется при clear().
+    """
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES, max_line_length: int = MAX_LINE_LENGTH):
+        self.capacity = max(1, max_lines)
+        self.max_line_length = max_line_length
+        self._lines: list = []
+        self.total = 0
+        self.generation = 0
+
+    @property
+    def first(self) -> int:
+        return max(0, self.total - self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        return self.first
+
+    def append(self, line: str):
+        if len(line) > self.max_line_length:
+            line = line[:self.max_line_length] + "…"
+        if len(self._lines) < self.capacity:
+            self._lines.append(line)
+        else:
+            self._lines[self.total % self.capacity] = line
+        self.total += 1
+
+    def extend(self, lines: List[str]):
+        # Срезами, а не по строке: болтливый сервис присылает тысячи строк за одно чтение
+        limit = self.max_line_length
+        lines = [line if len(line) <= limit else line[:limit] + "…" for line in lines]
+        if len(lines) >= self.capacity:
+            # Пачка больше буфера целиком вытесняет старое; строка seq лежит в позиции seq % capacity
+            self.total += len(lines)
+            last = lines[-self.capacity:]
+            shift = (self.total - self.capacity) % self.capacity
+            self._lines = last[self.capacity - shift:] + last[:self.capacity - shift]
+            return
+        while lines:
+            if len(self._lines) < self.capacity:
+                take = self.capacity - len(self._lines)
+                self._lines.extend(lines[:take])
+            else:
+                position = self.total % self.capacity
+                take = min(len(lines), self.capacity - position)
+                self._lines[position:position + take] = lines[:take]
+            take = min(take, len(lines))
+            self.total += take
+            lines = lines[take:]
+
+    def line(self, seq: int) -> str:
+        return self._lines[seq % self.capacity]
+
+    def clear(self):
+        self._lines = []
+        self.total = 0
+        self.generation += 1
+
+    def __len__(self):
+        return self.total - self.first
+
+
+class LogFilter:
+    """
+    Строки буфера под фильтр (подстрока без учёта регистра), обновляемые инкрементально.
+
+    update() проверяет только строки, пришедшие с прошлого вызова, и отбрасывает
+    вытесненные из буфера; уточнение фильтра (к «error» дописали « n8n») проверяет
+    только уже найденные строки. Полный проход по буферу — лишь при новом фильтре.
+    Без фильтра номера строк берутся прямо из буфера, список совпадений не хранится.
+    """
+    def __init__(self, buffer: LogBuffer, text: str = ""):
+        self.buffer = buffer
+        self.text = ""
+        self._needle = ""
+        self._matches: list = []
+        self._head = 0  # вытесненные совпадения в начале _matches, удаляются пачкой
+        self._first = buffer.first
+        self._scanned = buffer.first
+        self.set_text(text)
+        self.update()
+
+    def _match(self, seq: int) -> bool:
+        return self._needle in self.buffer.line(seq).lower()
+
+    def set_text(self, text: str):
+        needle = text.strip().lower()
+        refine = bool(self._needle) and self._needle in needle
+        self.text = text
+        self._needle = needle
+        first = self.buffer.first
+        self._scanned = max(self._scanned, first)
+        if not needle:
+            self._matches, self._head = [], 0
+        elif refine:
+            self._matches = [seq for seq in self._matches[self._head:] if seq >= first and self._match(seq)]
+            self._head = 0
+        else:
+            self._matches = [seq for seq in range(first, self._scanned) if self._match(seq)]
+            self._head = 0
+        self._first = first
+
+    def update(self) -> Tuple[int, int]:
+        """
+        Подтягивает изменения буфера: (сколько строк ушло из начала, сколько добавилось в конец).
+        """
+        first, total = self.buffer.first, self.buffer.total
+        if not self._needle:
+            before = self._scanned - self._first
+            removed = min(before, first - self._first)
+            self._first, self._scanned = first, total
+            return removed, (total - first) - (before - removed)
+        head = bisect.bisect_left(self._matches, first, self._head)
+        removed = head - self._head
+        self._head = head
+        before = len(self._matches)
+        self._matches.extend(seq for seq in range(max(self._scanned, first), total) if self._match(seq))
+        added = len(self._matches) - before
+        if self._head > 4096 and self._head * 2 > len(self._matches):
+            del self._matches[:self._head]
+            self._head = 0
+        self._first, self._scanned = first, total
+        return removed, added
+
+    def seq(self, row: int) -> int:
+        if not self._needle:
+            return self._first + row
+        return self._matches[self._head + row]
+
+    def __len__(self):
+        if not self._needle:
+            return self._scanned - self._first
+        return len(self._matches) - self._head
@@ -0,0 +1,304 @@
+import json
+import os
+import socket
+import threading
+from http.client import HTTPConnection, HTTPException
+from typing import Callable, Iterator, List, NamedTuple, Optional, Set
+from urllib.parse import urlsplit
+
+from eva import tracing
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 11434
+
+
+class OllamaError(Exception):
+    """
+    Ошибка обращения к HTTP API Ollama (нет соединения, код ответа != 200, {"error": ...} в потоке).
+    """
+
+
+class PullProgress(NamedTuple):
+    """
+    Одно событие из потокового ответа /api/pull.
+    """
+    status: str
+    digest: str = ""
+    total: int = 0
+    completed: int = 0
+
+    @property
+    def percent(self) -> Optional[float]:
+        if self.total <= 0:
+            return None
+        return min(100.0, self.completed * 100.0 / self.total)
+
+
+def format_bytes(num: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num) < 1024 or unit == "GB":
+            return f"{num:.0f} {unit}" if unit == "B" else f"{num:.1f} {unit}"
+        num /= 1024
+    return f"{num:.1f} GB"
+
+
+def format_progress(progress: PullProgress) -> str:
+    """
+    Короткая строка для status_label: «pulling 6a0746a1ec1a: 42% (1.2 GB / 2.9 GB)».
+    """
+    status = progress.status
+    if progress.digest and progress.digest in status:
+        # "pulling sha256:..." слишком длинно для статусной строки
+        status = status.replace(progress.digest, progress.digest.split(":")[-1][:12])
+    percent = progress.percent
+    if percent is None:
+        return status
+    return f"{status}: {percent:.0f}% ({format_bytes(progress.completed)} / {format_bytes(progress.total)})"
+
+
+def parse_host(value: str):
+    """
+    Адрес в формате ollama CLI: "host", "host:port" или "http://host:port" → (host, port).
+    """
+    value = value.strip()
+    if not value:
+        return DEFAULT_HOST, DEFAULT_PORT
+    if "://" not in value:
+        value = "http://" + value
+    parts = urlsplit(value)
+    host = parts.hostname or DEFAULT_HOST
+    if host == "0.0.0.0":
+        host = DEFAULT_HOST
+    return host, parts.port or DEFAULT_PORT
+
+
+def _host_from_env():
+    return parse_host(os.environ.get("OLLAMA_HOST", ""))
+
+
+def shutdown_connection(conn: HTTPConnection):
+    """
+    Обрывает соединение из другого потока: recv, ждущий ответа, сразу завершается ошибкой.
+    """
+    sock = conn.sock
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class OllamaClient:
+    """
+    Клиент HTTP API Ollama (порт 11434) с пулом keep-alive соединений.
+
+    Соединения переиспользуются между запросами и потоками: после полностью
+    прочитанного ответа соединение возвращается в пул, после ошибки или
+    прерванного стрима — закрывается. abort() обрывает и те, что сейчас
+    заняты запросами в других потоках.
+    """
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 timeout: float = 30.0, pool_size: int = 4):
+        env_host, env_port = _host_from_env()
+        self.host = host or env_host
+        self.port = port or env_port
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._pool: List[HTTPConnection] = []
+        self._busy: Set[HTTPConnection] = set()
+        self._aborted = False
+        self._lock = threading.Lock()
+
+    # --- пул соединений ---
+
+    def _acquire(self) -> HTTPConnection:
+        with self._lock:
+            if self._aborted:
+                raise OllamaError("Запрос к Ollama отменён")
+            conn = self._pool.pop() if self._pool else HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._busy.add(conn)
+        return conn
+
+    def _release(self, conn: HTTPConnection, reusable: bool = True):
+        with self._lock:
+            self._busy.discard(conn)
+            if reusable and not self._aborted and len(self._pool) < self.pool_size:
+                self._pool.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, []
+        for conn in pool:
+            conn.close()
+
+    def abort(self):
+        """
+        Обрывает все запросы клиента, в том числе идущие в других потоках (они получат
+        OllamaError), и отклоняет новые. Для клиента, который больше не нужен, — например,
+        бенчмарка, остановленного посреди десятиминутного ожидания ответа.
+        """
+        with self._lock:
+            self._aborted = True
+            busy = list(self._busy)
+        for conn in busy:
+            shutdown_connection(conn)
+        self.close()
+
+    def _request(self, method: str, path: str, payload: Optional[dict] = None):
+        """
+        Отправляет запрос и возвращает (conn, response). Если соединение из пула
+        уже закрыто сервером, повторяет запрос один раз на новом соединении.
+        """
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in (0, 1):
+            conn = self._acquire()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except (HTTPException, ConnectionError) as e:
+                self._release(conn, reusable=False)
+                if attempt:
+                    raise OllamaError(f"Ollama недоступна ({self.host}:{self.port}): {e}") from e
+            except OSError as e:
+                self._release(conn, reusable=False)
+                raise OllamaError(f"Ollama недоступна ({self.host}:{self.port}): {e}") from e
+        raise OllamaError("unreachable")
+
+    @staticmethod
+    def _error_text(raw: bytes, status: int) -> str:
+        try:
+            return json.loads(raw).get("error") or f"HTTP {status}"
+        except (ValueError, AttributeError):
+            return raw.decode(errors="replace").strip() or f"HTTP {status}"
+
+    def _call(self, method: str, path: str, payload: Optional[dict] = None) -> bytes:
+        # ollama.tags, ollama.delete, ollama.ps... — имя операции по последнему сегменту пути
+        with tracing.span("ollama." + path.rsplit("/", 1)[-1]) as trace:
+            conn, resp = self._request(method, path, payload)
+            try:
+                raw = resp.read()
+            except (HTTPException, OSError) as e:
+                self._release(conn, reusable=False)
+                raise OllamaError(f"Обрыв соединения с Ollama: {e}") from e
+            self._release(conn, reusable=not resp.will_close)
+            trace.set(http_status=resp.status, bytes=len(raw))
+            if resp.status != 200:
+                raise OllamaError(self._error_text(raw, resp.status))
+        return raw
+
+    # --- API ---
+
+    def tags(self) -> List[dict]:
+        """
+        Список установленных моделей (GET /api/tags).
+        """
+        raw = self._call("GET", "/api/tags")
+        return json.loads(raw or b"{}").get("models") or []
+
+    def ps(self) -> List[dict]:
+        """
+        Модели, загруженные сейчас в память (GET /api/ps): name, size, size_vram, expires_at.
+        """
+        raw = self._call("GET", "/api/ps")
+        return json.loads(raw or b"{}").get("models") or []
+
+    def load(self, model: str, keep_alive=None):
+        """
+        Загружает модель в память без генерации (POST /api/generate без prompt).
+        keep_alive — сколько держать модель после последнего запроса: секунды
+        или строка в формате Ollama ("30m", "2h"); -1 — не выгружать, 0 — выгрузить сразу.
+        """
+        payload = {"model": model, "stream": False}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        self._call("POST", "/api/generate", payload)
+
+    def unload(self, model: str):
+        self.load(model, keep_alive=0)
+
+    def is_available(self) -> bool:
+        try:
+            self._call("GET", "/api/version")
+            return True
+        except OllamaError:
+            return False
+
+    def delete(self, model: str):
+        """
+        Удаляет модель (DELETE /api/delete). Старые версии Ollama ждут поле "name", новые — "model".
+        """
+        self._call("DELETE", "/api/delete", {"model": model, "name": model})
+
+    def _stream(self, path: str, payload: dict,
+                on_connection: Optional[Callable[[HTTPConnection], None]] = None) -> Iterator[dict]:
+        """
+        POST с потоковым ответом: по JSON-объекту на строку. {"error": ...} → OllamaError.
+        Если итерацию прервать (break / close()), соединение закрывается.
+        on_connection(conn) получает соединение стрима — чтобы оборвать его
+        из другого потока (shutdown_connection), не дожидаясь следующего события.
+        """
+        conn, resp = self._request("POST", path, payload)
+        if on_connection is not None:
+            on_connection(conn)
+        reusable = False
+        try:
+            if resp.status != 200:
+                raise OllamaError(self._error_text(resp.read(), resp.status))
+            while True:
+                line = resp.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("error"):
+                    raise OllamaError(event["error"])
+                yield event
+            reusable = not resp.will_close
+        except (HTTPException, OSError) as e:
+            raise OllamaError(f"Обрыв соединения с Ollama: {e}") from e
+        finally:
+            self._release(conn, reusable=reusable)
+
+    def pull(self, model: str, insecure: bool = False,
+             on_connection: Optional[Callable[[HTTPConnection], None]] = None) -> Iterator[PullProgress]:
+        """
+        Скачивает модель (POST /api/pull) и построчно отдаёт JSON-прогресс.
+
+        Если итерацию прервать (break / close()), соединение закрывается и
+        Ollama прекращает загрузку. on_connection — как в _stream.
+        """
+        events = self._stream("/api/pull", {"model": model, "name": model, "insecure": insecure, "stream": True},
+                              on_connection)
+        try:
+            for event in events:
+                yield PullProgress(
+                    status=event.get("status", ""),
+                    digest=event.get("digest", ""),
+                    total=int(event.get("total") or 0),
+                    completed=int(event.get("completed") or 0),
+                )
+        finally:
+            events.close()
+
+    def generate(self, model: str, prompt: str, options: Optional[dict] = None,
+                 keep_alive=None) -> Iterator[dict]:
+        """
+        Потоковая генерация (POST /api/generate): события с полем "response" по мере
+        генерации, последнее — с done=true и счётчиками (prompt_eval_count, eval_count,
+        *_duration в наносекундах).
+        """
+        payload = {"model": model, "prompt": prompt, "stream": True}
+        if options:
+            payload["options"] = options
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        return self._stream("/api/generate", payload)
@@ -0,0 +1,111 @@
+import codecs
+import re
+from collections import deque
+from typing import List, Optional
+
+# "45%", "45.5 %"
+PERCENT_RE = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*%")
+# "1.2GB/4.1GB", "512 MiB / 2 GiB"
+SIZES_RE = re.compile(r"([\d.]+)\s*([kKMGT]?i?B)\s*/\s*([\d.]+)\s*([kKMGT]?i?B)")
+UNITS = {"B": 1, "KB": 1e3, "MB": 1e6, "GB": 1e9, "TB": 1e12,
+         "KIB": 2 ** 10, "MIB": 2 ** 20, "GIB": 2 ** 30, "TIB": 2 ** 40}
+
+
+class LineSplitter:
+    """
+    Инкрементальное декодирование и разбиение вывода процесса на строки.
+
+    Куски байтов приходят в произвольных местах (в том числе посреди UTF-8
+    символа). '\\r' без '\\n' — это перерисовка прогресс-бара, поэтому от такой
+    строки остаётся только последний вариант.
+    """
+    def __init__(self, encoding: str = "utf-8", max_partial: int = 65536):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._partial = ""
+        self.max_partial = max_partial
+
+    @property
+    def partial(self) -> str:
+        """
+        Незавершённая строка (например, прогресс-бар, который ещё перерисовывается).
+        """
+        return self._partial.rstrip("\r")
+
+    def feed(self, data: bytes) -> List[str]:
+        text = self._partial + self._decoder.decode(data)
+        *complete, self._partial = text.split("\n")
+        # Не даём незавершённому прогресс-бару расти бесконечно: храним только последний вариант
+        if "\r" in self._partial.rstrip("\r"):
+            self._partial = self._partial.rsplit("\r", 1)[-1]
+        lines = [line.rstrip("\r").rsplit("\r", 1)[-1] for line in complete]
+        if len(self._partial) > self.max_partial:
+            # Строка без перевода строки длиннее лимита — отдаём как есть
+            lines.append(self._partial)
+            self._partial = ""
+        return lines
+
+    def flush(self) -> List[str]:
+        rest = self.partial + self._decoder.decode(b"", final=True)
+        self._partial = ""
+        return [rest] if rest else []
+
+
+class RingLog:
+    """
+    Лог фиксированного размера: последние max_lines строк, каждая не длиннее max_line_length.
+    """
+    def __init__(self, max_lines: int = 2000, max_line_length: int = 4096):
+        self.lines: deque = deque(maxlen=max_lines)
+        self.max_line_length = max_line_length
+        self.total = 0
+
+    def append(self, line: str):
+        if len(line) > self.max_line_length:
+            line = line[:self.max_line_length] + "…"
+        self.lines.append(line)
+        self.total += 1
+
+    def extend(self, lines: List[str]):
+        for line in lines:
+            self.append(line)
+
+    @property
+    def dropped(self) -> int:
+        return self.total - len(self.lines)
+
+    def tail(self, count: Optional[int] = None) -> List[str]:
+        if count is None or count >= len(self.lines):
+            return list(self.lines)
+        return list(self.lines)[-count:]
+
+    def text(self, count: Optional[int] = None) -> str:
+        lines = self.tail(count)
+        if self.dropped and (count is None or count >= len(self.lines)):
+            lines = [f"… пропущено строк: {self.dropped}"] + lines
+        return "\n".join(lines)
+
+    def clear(self):
+        self.lines.clear()
+        self.total = 0
+
+    def __len__(self):
+        return len(self.lines)
+
+
+def parse_progress(line: str) -> Optional[float]:
+    """
+    Процент из строки прогресса («45%» или «1.2GB/4.1GB»); None, если прогресса в строке нет.
+    """
+    match = PERCENT_RE.search(line)
+    if match:
+        return min(100.0, float(match.group(1)))
+    match = SIZES_RE.search(line)
+    if match:
+        try:
+            done = float(match.group(1)) * UNITS.get(match.group(2).upper(), 1)
+            total = float(match.group(3)) * UNITS.get(match.group(4).upper(), 1)
+        except ValueError:
+            return None
+        if total > 0:
+            return min(100.0, done * 100.0 / total)
+    return None
@@ -0,0 +1,212 @@
+import json
+import subprocess
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from eva.docker import memory_command
+from eva.inventory import normalize_name
+from eva.ollama import OllamaClient, OllamaError
+
+CONFIG_NAME = "preload.json"
+DEFAULT_INTERVAL = 300.0
+DEFAULT_RESERVE = 2 * 1024 ** 3
+# Модель в памяти больше файла весов: KV-кэш контекста и рабочие буферы
+MEMORY_OVERHEAD = 1.2
+
+# Действия в плане PreloadScheduler
+LOAD = "load"        # загрузить в память
+KEEP = "keep"        # уже загружена — продлить keep_alive
+UNLOAD = "unload"    # окно закончилось — выгрузить
+SKIP = "skip"        # не загружаем: не установлена или не помещается в память
+
+
+class PreloadModel(NamedTuple):
+    """
+    Модель из preload.json. windows — интервалы «ЧЧ:ММ-ЧЧ:ММ» (могут переходить
+    через полночь); пусто — держать всегда. keep_alive — как в API Ollama; если не
+    задан, модель держится до конца текущего окна (или бессрочно без окон).
+    """
+    name: str
+    keep_alive: Optional[object] = None
+    windows: Tuple[Tuple[int, int], ...] = ()
+
+
+class PreloadConfig(NamedTuple):
+    models: List[PreloadModel]
+    interval: float = DEFAULT_INTERVAL
+    reserve: int = DEFAULT_RESERVE         # байт, которые не занимаем моделями
+    memory_limit: Optional[int] = None     # байт; None — берём из `docker info`
+
+
+def parse_window(text: str) -> Tuple[int, int]:
+    """
+    "08:00-20:00" → (480, 1200) в минутах от полуночи.
+    """
+    try:
+        start, end = (part.strip() for part in text.split("-"))
+        minutes = []
+        for value in (start, end):
+            hours, mins = value.split(":")
+            if not (0 <= int(hours) <= 24 and 0 <= int(mins) < 60):
+                raise ValueError
+            minutes.append(int(hours) * 60 + int(mins))
+    except ValueError:
+        raise ValueError(f"Неверное окно времени: {text!r} (ожидается ЧЧ:ММ-ЧЧ:ММ)") from None
+    return minutes[0], minutes[1]
+
+
+def minutes_left(windows, now: datetime) -> Optional[int]:
+    """
+    Сколько минут осталось до конца окна, в которое попадает now; None — вне всех окон.
+    Без окон модель нужна всегда (-1).
+    """
+    if not windows:
+        return -1
+    current = now.hour * 60 + now.minute
+    for start, end in windows:
+        if start <= end:
+            if start <= current < end:
+                return end - current
+        elif current >= start or current < end:
+            return (end - current) % (24 * 60)
+    return None
+
+
+def load_config(path: str) -> PreloadConfig:
+    """
+    preload.json рядом с docker-compose.yml:
+    {"models": [{"name": "llama3:8b", "windows": ["08:00-20:00"]}, "qwen2.5:7b"],
+     "interval_seconds": 300, "reserve_gb": 2, "memory_limit_gb": null}
+    Порядок моделей — приоритет: при нехватке памяти остаются первые.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    models = []
+    for entry in data.get("models") or []:
+        if isinstance(entry, str):
+            entry = {"name": entry}
+        models.append(PreloadModel(
+            name=entry["name"],
+            keep_alive=entry.get("keep_alive"),
+            windows=tuple(parse_window(window) for window in entry.get("windows") or ()),
+        ))
+    limit = data.get("memory_limit_gb")
+    return PreloadConfig(
+        models=models,
+        interval=float(data.get("interval_seconds") or DEFAULT_INTERVAL),
+        reserve=int(float(data.get("reserve_gb", DEFAULT_RESERVE / 1024 ** 3)) * 1024 ** 3),
+        memory_limit=int(float(limit) * 1024 ** 3) if limit else None,
+    )
+
+
+def docker_memory() -> Optional[int]:
+    try:
+        result = subprocess.run(["docker", *memory_command()], capture_output=True, text=True, timeout=15)
+        return int(result.stdout.strip()) if result.returncode == 0 else None
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+
+
+def plan(config: PreloadConfig, now: datetime, installed: Dict[str, int], loaded: Dict[str, int],
+         memory: Optional[int], warmed: Optional[Set[str]] = None) -> List[Tuple[str, str, object]]:
+    """
+    План на текущий момент: [(модель, действие, keep_alive или причина)].
+
+    installed — размеры файлов установленных моделей, loaded — фактический
+    размер уже загруженных (из /api/ps). Имена сравниваются с тегом, как их
+    отдаёт Ollama ("nomic-embed-text" — это "nomic-embed-text:latest").
+    Модели идут по приоритету и занимают бюджет memory - reserve, пока он
+    не кончится; загруженные считаются по фактическому размеру, незагруженные —
+    по размеру весов с запасом. Память моделей, загруженных в обход конфига
+    (и не выгружаемых планом), из бюджета вычитается сразу.
+    Вне окна выгружаются только модели из warmed (загруженные планировщиком),
+    чтобы не мешать запросам, которые подняли модель сами.
+    """
+    installed = {normalize_name(name): size for name, size in installed.items()}
+    loaded = {normalize_name(name): size for name, size in loaded.items()}
+    warmed = {normalize_name(name) for name in warmed} if warmed is not None else None
+    budget = memory - config.reserve if memory else None
+    actions = []
+    wanted = []
+    seen = set()
+    for model in config.models:
+        name = normalize_name(model.name)
+        if name in seen:
+            continue
+        seen.add(name)
+        left = minutes_left(model.windows, now)
+        if left is None:
+            if name in loaded and (warmed is None or name in warmed):
+                actions.append((name, UNLOAD, "вне окна"))
+            continue
+        wanted.append((model, name, left))
+    planned = {name for model, name, left in wanted} | {name for name, action, detail in actions}
+    used = sum(size for name, size in loaded.items() if name not in planned)
+    for model, name, left in wanted:
+        if name not in installed:
+            actions.append((name, SKIP, "не установлена"))
+            continue
+        need = loaded.get(name) or int(installed[name] * MEMORY_OVERHEAD)
+        if budget is not None and used + need > budget and name not in loaded:
+            actions.append((name, SKIP, "не помещается в память"))
+            continue
+        used += need
+        keep_alive = model.keep_alive
+        if keep_alive is None:
+            keep_alive = -1 if left < 0 else f"{left}m"
+        actions.append((name, KEEP if name in loaded else LOAD, keep_alive))
+    return actions
+
+
+class PreloadScheduler:
+    """
+    Прогрев моделей Ollama по preload.json, чтобы первый запрос из n8n не ждал
+    загрузки весов. tick() сверяет план с /api/ps: загружает недостающие
+    модели (по одной, чтобы не было пика памяти), продлевает keep_alive
+    загруженным и выгружает те, у которых закончилось окно. Блокирующий —
+    GUI вызывает его из рабочего потока раз в config.interval секунд.
+    """
+    def __init__(self, client: OllamaClient, config: PreloadConfig,
+                 memory_probe: Callable[[], Optional[int]] = docker_memory):
+        self.client = client
+        self.config = config
+        self.memory_probe = memory_probe
+        self.stop_event = threading.Event()
+        self._memory: Optional[int] = None
+        self.warmed: Set[str] = set()
+
+    def memory(self) -> Optional[int]:
+        if self.config.memory_limit:
+            return self.config.memory_limit
+        if self._memory is None:
+            self._memory = self.memory_probe()
+        return self._memory
+
+    def tick(self, now: Optional[datetime] = None) -> List[Tuple[str, str, object]]:
+        """
+        Один проход; возвращает выполненный план с результатами:
+        [(модель, действие, keep_alive / причина / текст ошибки)].
+        """
+        now = now or datetime.now()
+        installed = {entry.get("name"): int(entry.get("size") or 0) for entry in self.client.tags()}
+        loaded = {entry.get("name"): int(entry.get("size") or 0) for entry in self.client.ps()}
+        report = []
+        for name, action, detail in plan(self.config, now, installed, loaded, self.memory(), self.warmed):
+            if self.stop_event.is_set():
+                break
+            try:
+                if action in (LOAD, KEEP):
+                    self.client.load(name, keep_alive=detail)
+                    self.warmed.add(name)
+                elif action == UNLOAD:
+                    self.client.unload(name)
+                    self.warmed.discard(name)
+            except OllamaError as e:
+                report.append((name, SKIP, str(e)))
+                continue
+            report.append((name, action, detail))
+        return report
+
+    def stop(self):
+        self.stop_event.set()
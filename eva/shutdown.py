@@ -0,0 +1,116 @@
+import subprocess
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+from eva import tracing
+from eva.docker import (
+    DEFAULT_STOP_TIMEOUT, SERVICES, STOP_TIMEOUTS,
+    compose_command, kill_command, stop_command, stop_ready,
+)
+
+# Итог остановки сервиса
+STOPPED = "stopped"
+KILLED = "killed"            # не уложился в таймаут, добит docker kill
+FAILED = "failed"
+NOT_RUNNING = "not running"
+STOPPING = "stopping"        # промежуточное событие: docker stop запущен
+
+# Сколько ждём сам `docker stop` сверх его --time, прежде чем звать docker kill
+KILL_GRACE_SECONDS = 5
+# Сколько ждём `docker kill`, прежде чем считать остановку сервиса неудачной
+KILL_TIMEOUT_SECONDS = 30
+
+
+class ShutdownOrchestrator:
+    """
+    Остановка стека без Qt — то же, что StopPipeline в GUI: сервисы
+    останавливаются параллельно, но не раньше зависящих от них (postgres ждёт
+    n8n и pgadmin), зависший `docker stop` добивается `docker kill`, в конце
+    `docker compose down`.
+
+    on_event(service, outcome) вызывается из рабочих потоков; run() блокирует
+    до конца и возвращает {сервис: итог, "compose": итог down}, ошибки — в errors.
+    """
+    def __init__(self, compose_file: str, running: Optional[Iterable[str]] = None, cleanup: bool = True,
+                 on_event: Optional[Callable[[str, str], None]] = None):
+        self.compose_file = compose_file
+        self.cleanup = cleanup
+        self.on_event = on_event or (lambda service, outcome: None)
+        # running=None — состояние неизвестно, пробуем остановить всё
+        self.pending = set(SERVICES) if running is None else set(running) & set(SERVICES)
+        self.results: Dict[str, str] = {service: NOT_RUNNING for service in SERVICES if service not in self.pending}
+        self.errors: Dict[str, str] = {}
+        self._cond = threading.Condition()
+
+    def _docker(self, args, timeout: Optional[float] = None, span: str = "docker", **attrs) -> subprocess.CompletedProcess:
+        with tracing.span(span, **attrs) as trace:
+            result = subprocess.run(["docker", *args], capture_output=True, text=True, timeout=timeout)
+            trace.set(exit_code=result.returncode)
+        return result
+
+    def stop_service(self, service: str):
+        """
+        Останавливает один сервис; возвращает (итог, текст ошибки).
+        """
+        timeout = STOP_TIMEOUTS.get(service, DEFAULT_STOP_TIMEOUT) + KILL_GRACE_SECONDS
+        try:
+            result = self._docker(stop_command(service), timeout=timeout, span="docker.stop", service=service)
+        except FileNotFoundError:
+            return FAILED, "Docker не установлен"
+        except subprocess.TimeoutExpired:
+            try:
+                killed = self._docker(kill_command(service), timeout=KILL_TIMEOUT_SECONDS,
+                                      span="docker.kill", service=service)
+            except subprocess.TimeoutExpired:
+                return FAILED, "docker kill не сработал"
+            if killed.returncode == 0:
+                return KILLED, ""
+            return FAILED, killed.stderr.strip() or "docker kill не сработал"
+        if result.returncode == 0:
+            return STOPPED, ""
+        if "No such container" in result.stderr:
+            return NOT_RUNNING, ""
+        return FAILED, result.stderr.strip() or f"Код выхода: {result.returncode}"
+
+    def _worker(self, service: str):
+        try:
+            outcome, error = self.stop_service(service)
+        except Exception as e:  # иначе сервис навсегда останется в pending и run() не вернётся
+            outcome, error = FAILED, f"{type(e).__name__}: {e}"
+        with self._cond:
+            self.pending.discard(service)
+            self.results[service] = outcome
+            if error:
+                self.errors[service] = error
+            self._cond.notify_all()
+        self.on_event(service, outcome)
+
+    def run(self) -> Dict[str, str]:
+        with tracing.span("stack.stop", services=sorted(self.pending)) as trace:
+            results = self._run()
+            trace.end(tracing.ERROR if FAILED in results.values() else tracing.OK, results=results)
+        return results
+
+    def _run(self) -> Dict[str, str]:
+        for service, outcome in self.results.items():
+            self.on_event(service, outcome)
+        started = set()
+        with self._cond:
+            while self.pending:
+                for service in sorted(self.pending - started):
+                    if stop_ready(service, self.pending - {service}):
+                        started.add(service)
+                        self.on_event(service, STOPPING)
+                        threading.Thread(target=self._worker, args=(service,), daemon=True).start()
+                self._cond.wait()
+        if self.cleanup:
+            try:
+                result = self._docker(compose_command(self.compose_file, "down"), timeout=120, span="compose.down")
+                self.results["compose"] = STOPPED if result.returncode == 0 else FAILED
+                if result.returncode != 0:
+                    self.errors["compose"] = result.stderr.strip()
+            except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+                self.results["compose"] = FAILED
+                self.errors["compose"] = str(e)
+            self.on_event("compose", self.results["compose"])
+        return dict(self.results)
@@ -0,0 +1,206 @@
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException
+from typing import Callable, Dict, Optional
+
+from eva import tracing
+from eva.docker import SERVICES, UNKNOWN, plan_command, start_plan
+from eva.ollama import OllamaClient, OllamaError
+
+# Адаптивный backoff проб: первая попытка почти сразу, дальше интервал растёт до потолка
+BACKOFF_INITIAL = 0.1
+BACKOFF_FACTOR = 1.5
+BACKOFF_MAX = 2.0
+DEFAULT_DEADLINE = 120.0
+
+# События, которые StartupOrchestrator передаёт в on_event(kind, service, payload)
+STAGE = "stage"      # service="", payload — описание этапа
+READY = "ready"      # payload — секунды от `compose up` до готовности
+TIMEOUT = "timeout"  # payload — дедлайн в секундах, так и не дождались
+FAILED = "failed"    # ошибка docker/compose (service="") или пробы сервиса, payload — текст
+
+
+def tcp_probe(host: str, port: int) -> Callable[[], bool]:
+    def probe():
+        try:
+            with socket.create_connection((host, port), timeout=1.0):
+                return True
+        except OSError:
+            return False
+    return probe
+
+
+def http_probe(host: str, port: int, path: str = "/") -> Callable[[], bool]:
+    """
+    Готов, если HTTP-сервер ответил не 5xx (n8n отдаёт 200 на /healthz, pgadmin — на /misc/ping).
+    """
+    def probe():
+        conn = HTTPConnection(host, port, timeout=2.0)
+        try:
+            conn.request("GET", path)
+            return conn.getresponse().status < 500
+        except (HTTPException, OSError):
+            return False
+        finally:
+            conn.close()
+    return probe
+
+
+def ollama_probe(client: Optional[OllamaClient] = None) -> Callable[[], bool]:
+    client = client or OllamaClient(timeout=2.0)
+
+    def probe():
+        try:
+            client.tags()
+            return True
+        except OllamaError:
+            return False
+    return probe
+
+
+def container_probe(service: str) -> Callable[[], bool]:
+    """
+    Проба по состоянию контейнера — для сервисов без сетевого порта (whisper).
+    """
+    def probe():
+        try:
+            result = subprocess.run(["docker", "inspect", "-f", "{{.State.Running}}", SERVICES[service]],
+                                    capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return result.returncode == 0 and result.stdout.strip() == "true"
+    return probe
+
+
+def default_probes(host: str = "127.0.0.1") -> Dict[str, Callable[[], bool]]:
+    return {
+        "postgres": tcp_probe(host, 5432),
+        "n8n": http_probe(host, 5678, "/healthz"),
+        "pgadmin": http_probe(host, 8080, "/misc/ping"),
+        "ollama": ollama_probe(OllamaClient(host=host, timeout=2.0)),
+        "whisper": container_probe("whisper"),
+    }
+
+
+def wait_ready(probe: Callable[[], bool], deadline: float, stop: Optional[threading.Event] = None) -> bool:
+    """
+    Опрашивает probe с растущим интервалом, пока она не вернёт True или не выйдет время.
+    """
+    stop = stop or threading.Event()
+    delay = BACKOFF_INITIAL
+    end = time.monotonic() + deadline
+    while not stop.is_set():
+        if probe():
+            return True
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return False
+        stop.wait(min(delay, remaining))
+        delay = min(delay * BACKOFF_FACTOR, BACKOFF_MAX)
+    return False
+
+
+class StartupOrchestrator:
+    """
+    Запуск стека без start_n8n.cmd: запуск только недостающих сервисов (start_plan)
+    и параллельные пробы готовности всех сервисов.
+
+    states — текущие состояния сервисов (например, из ContainerMonitor). Если они
+    известны и всё уже запущено, docker не вызывается вовсе.
+
+    Результаты приходят в on_event по мере готовности; run() возвращает отчёт
+    {сервис: секунды до готовности или None} и длительность compose в ключе "compose".
+    Работает синхронно — GUI вызывает его из рабочего потока.
+    """
+    def __init__(self, compose_file: str, probes: Optional[Dict[str, Callable[[], bool]]] = None,
+                 deadline: float = DEFAULT_DEADLINE,
+                 on_event: Optional[Callable[[str, str, object], None]] = None,
+                 states: Optional[Dict[str, str]] = None):
+        self.compose_file = compose_file
+        self.states = states or {}
+        self.probes = probes if probes is not None else default_probes()
+        self.deadline = deadline
+        self.on_event = on_event or (lambda kind, service, payload: None)
+        self.stop_event = threading.Event()
+
+    def cancel(self):
+        self.stop_event.set()
+
+    def _docker(self, *args: str, span: str = "docker", timeout: float = 300, **attrs) -> subprocess.CompletedProcess:
+        with tracing.span(span, **attrs) as trace:
+            result = subprocess.run(["docker", *args], capture_output=True, text=True, timeout=timeout)
+            trace.set(exit_code=result.returncode)
+        return result
+
+    def compose_up(self) -> bool:
+        states = {service: self.states.get(service, UNKNOWN) for service in self.probes}
+        plan = start_plan(states, self.probes)
+        if not plan:
+            self.on_event(STAGE, "", "Все сервисы уже запущены")
+            return True
+        try:
+            if any(state == UNKNOWN for state in states.values()):
+                # Состояние не знаем — возможно, docker вообще не запущен
+                self.on_event(STAGE, "", "Проверка Docker...")
+                if self._docker("version", span="docker.version", timeout=15).returncode != 0:
+                    self.on_event(FAILED, "", "Docker не запущен. Запустите Docker Desktop и повторите попытку")
+                    return False
+            for action, services in plan:
+                self.on_event(STAGE, "", f"Запуск: {', '.join(services)}...")
+                result = self._docker(*plan_command(self.compose_file, action, services),
+                                      span=f"compose.{action}", services=services)
+                if result.returncode != 0:
+                    self.on_event(FAILED, "", result.stderr.strip() or f"docker {action}: код {result.returncode}")
+                    return False
+        except FileNotFoundError:
+            self.on_event(FAILED, "", "Docker не установлен")
+            return False
+        except subprocess.TimeoutExpired as e:
+            self.on_event(FAILED, "", f"Превышено время ожидания: {' '.join(e.cmd)}")
+            return False
+        return True
+
+    def run(self) -> Dict[str, Optional[float]]:
+        with tracing.span("stack.start") as trace:
+            report = self._run()
+            late = [service for service, seconds in report.items() if seconds is None]
+            trace.end(tracing.ERROR if not report or late else tracing.OK,
+                      ready={service: None if seconds is None else round(seconds, 3)
+                             for service, seconds in report.items()})
+        return report
+
+    def _run(self) -> Dict[str, Optional[float]]:
+        report: Dict[str, Optional[float]] = {}
+        started = time.monotonic()
+        if not self.compose_up():
+            return report
+        t0 = time.monotonic()
+        report["compose"] = t0 - started
+        self.on_event(STAGE, "", "Ожидание готовности сервисов...")
+
+        def watch(service, probe):
+            try:
+                ready = wait_ready(probe, self.deadline, self.stop_event)
+            except Exception as e:  # результат pool.submit никто не читает — без этого ошибка пробы потеряется
+                report[service] = None
+                tracing.tracer.record("service.ready", time.monotonic() - t0, tracing.ERROR,
+                                      service=service, error=f"{type(e).__name__}: {e}")
+                self.on_event(FAILED, service, f"{service}: ошибка проверки готовности: {type(e).__name__}: {e}")
+                return
+            if ready:
+                report[service] = time.monotonic() - t0
+                tracing.tracer.record("service.ready", report[service], service=service)
+                self.on_event(READY, service, report[service])
+            else:
+                report[service] = None
+                tracing.tracer.record("service.ready", time.monotonic() - t0, tracing.ERROR, service=service)
+                if not self.stop_event.is_set():
+                    self.on_event(TIMEOUT, service, self.deadline)
+
+        with ThreadPoolExecutor(max_workers=max(1, len(self.probes))) as pool:
+            for service, probe in self.probes.items():
+                pool.submit(watch, service, probe)
+        return report
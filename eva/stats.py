@@ -0,0 +1,130 @@
+import json
+import re
+import time
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from eva.docker import service_for_container
+from eva.output import UNITS
+
+# Сэмплов истории на сервис: docker stats обновляет раз в ~1 с, т.е. около 5 минут
+HISTORY = 300
+
+# docker stats в потоковом режиме перед каждой порцией очищает экран (ESC[2J ESC[H) даже без TTY
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+SIZE_RE = re.compile(r"([\d.]+)\s*([kKMGTP]?i?B)")
+
+
+def stats_command() -> List[str]:
+    """
+    Аргументы `docker ...` для одного долгоживущего потока статистики (по JSON на контейнер в секунду).
+    Без имён контейнеров: иначе docker stats завершается, если какого-то контейнера нет.
+    """
+    return ["stats", "--format", "{{json .}}"]
+
+
+class StatsSample(NamedTuple):
+    time: float        # time.monotonic()
+    cpu: float         # % одного ядра (может быть > 100 на нескольких ядрах)
+    memory: int        # байт
+    memory_limit: int  # байт
+    net_rx: int        # байт с запуска контейнера
+    net_tx: int
+    block_read: int
+    block_write: int
+    pids: int
+
+
+def parse_size(text: str) -> int:
+    match = SIZE_RE.search(text)
+    if not match:
+        return 0
+    return int(float(match.group(1)) * UNITS.get(match.group(2).upper(), 1))
+
+
+def parse_pair(text: str) -> Tuple[int, int]:
+    # "1.2kB / 648B" → (1200, 648)
+    first, _, second = text.partition("/")
+    return parse_size(first), parse_size(second)
+
+
+def parse_percent(text: str) -> float:
+    try:
+        return float(text.strip().rstrip("%") or 0)
+    except ValueError:
+        return 0.0
+
+
+def parse_stats_line(line: str, now: Optional[float] = None) -> Optional[Tuple[str, StatsSample]]:
+    """
+    Строка `docker stats --format {{json .}}` → (сервис, сэмпл); None для чужих контейнеров и мусора.
+    """
+    line = ANSI_RE.sub("", line).strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+    service = service_for_container(data.get("Name", ""))
+    if service is None:
+        return None
+    memory, memory_limit = parse_pair(data.get("MemUsage", ""))
+    net_rx, net_tx = parse_pair(data.get("NetIO", ""))
+    block_read, block_write = parse_pair(data.get("BlockIO", ""))
+    try:
+        pids = int(data.get("PIDs") or 0)
+    except ValueError:
+        pids = 0
+    return service, StatsSample(
+        time=time.monotonic() if now is None else now,
+        cpu=parse_percent(data.get("CPUPerc", "")),
+        memory=memory,
+        memory_limit=memory_limit,
+        net_rx=net_rx,
+        net_tx=net_tx,
+        block_read=block_read,
+        block_write=block_write,
+        pids=pids,
+    )
+
+
+class ResourceHistory:
+    """
+    История ресурсов по сервисам в кольцевых буферах фиксированного размера.
+    Сетевой и дисковый ввод-вывод docker отдаёт накопительно — скорость
+    считается по разнице соседних сэмплов.
+    """
+    def __init__(self, size: int = HISTORY):
+        self.size = size
+        self.samples: Dict[str, deque] = {}
+
+    def append(self, service: str, sample: StatsSample):
+        history = self.samples.get(service)
+        if history is None:
+            history = self.samples[service] = deque(maxlen=self.size)
+        history.append(sample)
+
+    def latest(self, service: str) -> Optional[StatsSample]:
+        history = self.samples.get(service)
+        return history[-1] if history else None
+
+    def series(self, service: str, field: str) -> List[float]:
+        return [getattr(sample, field) for sample in self.samples.get(service, ())]
+
+    def rate(self, service: str, field: str) -> float:
+        """
+        Байт/с по накопительному счётчику field за последний интервал.
+        """
+        history = self.samples.get(service)
+        if not history or len(history) < 2:
+            return 0.0
+        previous, last = history[-2], history[-1]
+        elapsed = last.time - previous.time
+        if elapsed <= 0:
+            return 0.0
+        # Счётчик обнуляется при перезапуске контейнера
+        return max(0, getattr(last, field) - getattr(previous, field)) / elapsed
+
+    def forget(self, service: str):
+        self.samples.pop(service, None)
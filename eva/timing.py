@@ -0,0 +1,121 @@
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Момент импорта модуля (epoch, perf_counter): main.py импортирует его первым
+IMPORTED_AT = (time.time(), time.perf_counter())
+
+
+class PhaseTimer:
+    """
+    Замер фаз запуска: mark(name) закрывает фазу, начавшуюся с предыдущей отметки.
+    started — время (epoch) создания таймера, чтобы внешний замер мог посчитать,
+    сколько ушло на запуск интерпретатора и распаковку сборки до первой строки main.py.
+    """
+    def __init__(self, since: Optional[Tuple[float, float]] = None):
+        self.started, self._last = since or (time.time(), time.perf_counter())
+        self.phases: Dict[str, float] = {}
+
+    @classmethod
+    def since_import(cls) -> "PhaseTimer":
+        """
+        Таймер, отсчитывающий первую фазу от импорта eva.timing, а не от своего создания.
+        """
+        return cls(IMPORTED_AT)
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + now - self._last
+        self._last = now
+
+    def report(self) -> dict:
+        return {
+            "started": self.started,
+            "finished": time.time(),
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "total": round(sum(self.phases.values()), 4),
+        }
+
+    def write(self, path: str):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.report()) + "\n")
+
+
+def summarize(runs: List[dict]) -> dict:
+    """
+    Медиана/минимум/максимум по каждой фазе и по времени до первой отрисовки.
+    """
+    rows = [{"launch": run["launch"], **run["phases"], "first_paint_total": run["first_paint_total"]}
+            for run in runs]
+    names: List[str] = []
+    for row in rows:
+        names.extend(name for name in row if name not in names)
+    phases = {}
+    for name in names:
+        values = [row.get(name, 0.0) for row in rows]
+        phases[name] = {
+            "median": round(statistics.median(values), 4),
+            "min": round(min(values), 4),
+            "max": round(max(values), 4),
+        }
+    return {"runs": len(runs), "phases": phases}
+
+
+def run_startup_benchmark(command: List[str], runs: int = 5, timeout: float = 60.0) -> dict:
+    """
+    Запускает приложение runs раз с ключом --bench-startup <файл>; каждый запуск
+    дописывает в файл свои фазы и завершается сразу после первой отрисовки окна.
+    launch — время от вызова процесса до первой строки main.py (интерпретатор,
+    распаковка onefile-сборки), first_paint_total — от вызова до первой отрисовки,
+    failed — запуски, не дошедшие до первой отрисовки за timeout секунд.
+    """
+    fd, path = tempfile.mkstemp(prefix="eva-startup-", suffix=".jsonl")
+    os.close(fd)
+    results = []
+    failed = 0
+    try:
+        for _ in range(max(1, runs)):
+            open(path, "w").close()
+            spawned = time.time()
+            try:
+                subprocess.run(command + ["--bench-startup", path], timeout=timeout,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except subprocess.TimeoutExpired:
+                # Окно так и не отрисовалось (run убивает процесс по таймауту) — запуск не удался
+                failed += 1
+                continue
+            with open(path, encoding="utf-8") as f:
+                lines = [line for line in f if line.strip()]
+            if not lines:
+                failed += 1
+                continue
+            run = json.loads(lines[-1])
+            run["launch"] = round(max(0.0, run["started"] - spawned), 4)
+            run["first_paint_total"] = round(run["finished"] - spawned, 4)
+            results.append(run)
+    finally:
+        os.remove(path)
+    report = summarize(results) if results else {"runs": 0, "phases": {}}
+    report["failed"] = failed
+    report["timestamp"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    report["command"] = command
+    report["samples"] = results
+    return report
+
+
+def format_summary(report: dict) -> str:
+    lines = [f"Запусков: {report['runs']}" + (f", неудачных: {report['failed']}" if report.get("failed") else ""),
+             f"{'фаза':<20}{'медиана':>10}{'мин':>10}{'макс':>10}"]
+    for name, values in report["phases"].items():
+        lines.append(f"{name:<20}{values['median'] * 1000:>8.0f}мс{values['min'] * 1000:>8.0f}мс"
+                     f"{values['max'] * 1000:>8.0f}мс")
+    return "\n".join(lines)
+
+
+def benchmark_output_path(directory: Optional[str] = None) -> str:
+    name = time.strftime("startup-benchmark-%Y%m%d-%H%M%S.json")
+    return os.path.join(directory or os.getcwd(), name)
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional, Tuple
+
+TRACE_FILE = "trace.jsonl"
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+
+# Итог операции
+OK = "ok"
+ERROR = "error"
+
+# Границы гистограммы длительностей (секунды): от проб docker ps до скачивания моделей
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0)
+
+
+class Span:
+    """
+    Одна операция: имя, атрибуты (сервис, модель, код выхода, байты...), длительность, итог.
+
+    Синхронный код — `with tracer.span("docker.ps"):`, асинхронный (QProcess) —
+    span = tracer.span(...) при старте и span.end(exit_code=...) в обработчике finished.
+    Итог по умолчанию ok; ненулевой exit_code или исключение внутри with дают error.
+    """
+    def __init__(self, tracer: "Tracer", name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.status = OK
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def end(self, status: Optional[str] = None, **attrs):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._start
+        self.attrs.update(attrs)
+        if status is not None:
+            self.status = status
+        elif self.attrs.get("exit_code") not in (None, 0):
+            self.status = ERROR
+        self.tracer._finish(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.end(ERROR, error=str(exc) or exc_type.__name__)
+        else:
+            self.end()
+        return False
+
+
+class Tracer:
+    """
+    Сборщик спанов: каждая завершённая операция пишется строкой JSON в
+    trace.jsonl (с ротацией по размеру) и учитывается в агрегатах —
+    счётчиках, сумме байт и гистограмме длительностей по имени операции.
+    Агрегаты отдаются в текстовом формате Prometheus (metrics_text, serve_metrics).
+
+    Пока configure() не вызван, спаны только агрегируются — файл не пишется.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._logger: Optional[logging.Logger] = None
+        self.path: Optional[str] = None
+        self.release = os.environ.get("EVA_RELEASE", "")
+        # (имя, итог) → [количество, сумма секунд, сумма байт, счётчики по BUCKETS]
+        self._metrics: Dict[Tuple[str, str], list] = {}
+        self._server = None
+
+    def configure(self, directory: str, filename: str = TRACE_FILE, max_bytes: int = DEFAULT_MAX_BYTES,
+                  backups: int = DEFAULT_BACKUPS):
+        # У каждого процесса (GUI, CLI) свой файл: ротация файла, открытого другим процессом, в Windows не удаётся
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8",
+                                      delay=True)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("eva.trace")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        for old in list(logger.handlers):
+            logger.removeHandler(old)
+            old.close()
+        logger.addHandler(handler)
+        self._logger = logger
+
+    def span(self, name: str, **attrs) -> Span:
+        return Span(self, name, attrs)
+
+    def record(self, name: str, duration: float, status: str = OK, **attrs):
+        """
+        Операция, длительность которой уже измерена (например, готовность сервиса при запуске).
+        """
+        span = Span(self, name, attrs)
+        span.started_at -= duration
+        span.duration = duration
+        span.status = status
+        self._finish(span)
+
+    def _finish(self, span: Span):
+        bytes_count = span.attrs.get("bytes") or 0
+        with self._lock:
+            entry = self._metrics.get((span.name, span.status))
+            if entry is None:
+                entry = self._metrics[(span.name, span.status)] = [0, 0.0, 0, [0] * len(BUCKETS)]
+            entry[0] += 1
+            entry[1] += span.duration
+            entry[2] += bytes_count
+            for index, bound in enumerate(BUCKETS):
+                if span.duration <= bound:
+                    entry[3][index] += 1
+        if self._logger is not None:
+            record = {
+                "ts": round(span.started_at, 3),
+                "name": span.name,
+                "duration": round(span.duration, 4),
+                "status": span.status,
+                "attrs": span.attrs,
+            }
+            if self.release:
+                record["release"] = self.release
+            self._logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    def metrics_text(self) -> str:
+        lines = [
+            "# HELP eva_operation_duration_seconds Длительность операций Eva",
+            "# TYPE eva_operation_duration_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted((key, [count, total, size, list(buckets)])
+                           for key, (count, total, size, buckets) in self._metrics.items())
+        for (name, status), (count, total, size, buckets) in items:
+            labels = f'op="{name}",status="{status}"'
+            for bound, bucket_count in zip(BUCKETS, buckets):
+                lines.append(f'eva_operation_duration_seconds_bucket{{{labels},le="{bound}"}} {bucket_count}')
+            lines.append(f'eva_operation_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"eva_operation_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"eva_operation_duration_seconds_count{{{labels}}} {count}")
+        lines.append("# HELP eva_operation_bytes_total Байт передано операциями Eva")
+        lines.append("# TYPE eva_operation_bytes_total counter")
+        for (name, status), (count, total, size, buckets) in items:
+            if size:
+                lines.append(f'eva_operation_bytes_total{{op="{name}",status="{status}"}} {size}')
+        return "\n".join(lines) + "\n"
+
+    def serve_metrics(self, port: int):
+        """
+        GET http://127.0.0.1:port/metrics в формате Prometheus; сервер в фоновом потоке, только localhost.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        tracer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                raw = tracer.metrics_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="eva-metrics", daemon=True).start()
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# Общий трассировщик процесса (как logging.getLogger): GUI и CLI настраивают его при старте
+tracer = Tracer()
+
+
+def span(name: str, **attrs) -> Span:
+    return tracer.span(name, **attrs)
+
+
+def configure_from_env(default_directory: str, filename: str = TRACE_FILE):
+    """
+    EVA_TRACE_DIR (по умолчанию default_directory; "off" — не писать файл)
+    и EVA_METRICS_PORT (порт /metrics на localhost; не задан — выключено).
+    """
+    directory = os.environ.get("EVA_TRACE_DIR", default_directory)
+    if directory and directory.lower() != "off":
+        try:
+            tracer.configure(directory, filename)
+        except OSError:
+            pass
+    port = os.environ.get("EVA_METRICS_PORT")
+    if port:
+        try:
+            tracer.serve_metrics(int(port))
+        except (OSError, ValueError):
+            pass
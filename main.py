@@ -1,23 +1,57 @@
 import sys
 import os
-import subprocess
+import json
+# Первым: eva.timing запоминает момент импорта, и фаза imports включает тяжёлые импорты Qt
+from eva.timing import PhaseTimer, benchmark_output_path, format_summary, run_startup_benchmark
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QLabel, QMessageBox,
-    QDialog, QLineEdit, QVBoxLayout, QHBoxLayout
+    QDialog, QLineEdit, QVBoxLayout, QHBoxLayout, QMenu,
+    QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QSpinBox,
+    QListWidget, QPlainTextEdit, QGridLayout, QFileDialog, QComboBox, QCheckBox, QTableView
 )
-from PyQt5.QtGui import QPixmap, QIcon, QFont, QPalette, QBrush
-from PyQt5.QtCore import Qt, QUrl, QProcess
-from PyQt5.QtMultimedia import QSoundEffect
+from PyQt5.QtGui import QIcon, QFont, QPalette, QBrush, QDesktopServices
+from PyQt5.QtCore import Qt, QUrl, QTimer, pyqtSignal
 from typing import Optional
 
+from eva.gui.assets import LazySounds, cached_pixmap
+from eva.docker import SERVICES, ABSENT, RUNNING, UNKNOWN, compose_command, find_project_root, restart_command
+from eva.gui.lifecycle import FAILED, KILLED, NOT_RUNNING, STOPPED, StartupTask, StopPipeline
+from eva.startup import default_probes
+from eva import jobs
+from eva.gui.jobs import ModelJobManager
+from eva import preload
+from eva.preload import CONFIG_NAME, PreloadScheduler, load_config
+from eva.gui.preload import PreloadRunner
+from eva import tracing
+from eva.gui.monitor import ContainerMonitor
+from eva.gui.process import ProcessRunner
+from eva.ollama import OllamaClient, format_bytes
+# Модули диалогов (бенчмарк, архив, ресурсы, логи, список моделей) импортируются при первом
+# открытии окна — на путь до первой отрисовки они не попадают
+
+startup_timer = PhaseTimer.since_import()
+
 def resource_path(relative_path):
     if hasattr(sys, '_MEIPASS'):
         return os.path.join(sys._MEIPASS, relative_path)
     return os.path.join(os.path.abspath("."), relative_path)
 
+def container_running(owner: Optional[QWidget], service: str) -> bool:
+    # Состояние из общего ContainerMonitor главного окна; без монитора проверку пропускаем,
+    # а недоступность Ollama всплывёт ошибкой HTTP-запроса
+    monitor = getattr(owner, "containers", None)
+    if monitor is None or monitor.state(service) == UNKNOWN:
+        return True
+    return monitor.is_running(service)
+
+def parse_models(text: str):
+    # "llama3:8b, qwen2.5:7b mistral" → ["llama3:8b", "qwen2.5:7b", "mistral"]
+    return [name for name in text.replace(",", " ").split() if name]
+
 class ModelInstallDialog(QDialog):
     """
-    Диалог для ввода названия модели и её установки через docker exec ollama ollama pull <model>.
+    Диалог для ввода названий моделей и постановки их установки в очередь заданий главного окна.
+    Загрузка идёт в фоне и продолжается после закрытия диалога.
     """
     def __init__(self, owner: Optional[QWidget] = None):
         super().__init__(owner)
@@ -26,9 +60,10 @@ class ModelInstallDialog(QDialog):
         self.setFixedSize(400, 150)
 
         # Основные виджеты
-        self.input_label = QLabel("Введите название модели (например: deepseek-r1:7b):", self)
+        self.input_label = QLabel("Введите названия моделей через запятую (например: deepseek-r1:7b, llama3:8b):", self)
+        self.input_label.setWordWrap(True)
         self.model_input = QLineEdit(self)
-        self.model_input.setPlaceholderText("Название модели")
+        self.model_input.setPlaceholderText("Названия моделей")
         self.install_button = QPushButton("Установить", self)
         self.install_button.setFont(QFont("Segoe UI", 10))
         # Стиль кнопки — можно настроить по желанию
@@ -62,138 +97,39 @@ class ModelInstallDialog(QDialog):
         v_layout.addWidget(self.status_label)
         self.setLayout(v_layout)
 
-        # Подключаем события
+        # Подключаем события; Enter в поле ввода нажимает кнопку по умолчанию (autoDefault в QDialog)
         self.install_button.clicked.connect(self.on_click_install)
 
-        # QProcess для установки
-        self.proc_check = None
-        self.proc_pull = None
-
-        # Буферы для логов (если требуется)
-        self.pull_log = ""
-        self.pull_log_err = ""
-
     def on_click_install(self):
-        model_name = self.model_input.text().strip()
-        if not model_name:
+        models = parse_models(self.model_input.text())
+        if not models:
             QMessageBox.warning(self, "Ошибка", "Пожалуйста, введите название модели")
             return
 
-        # Блокируем ввод и кнопку
-        self.install_button.setEnabled(False)
-        self.model_input.setEnabled(False)
-        self.status_label.setText("⏳ Проверка контейнера ollama...")
-        # Обновляем главный статус
-        if self.owner and hasattr(self.owner, 'status_label'):
-            self.owner.status_label.setText(f"⏳ Проверка контейнера ollama для установки модели {model_name}...")
-
-        # Проверка, что контейнер ollama запущен
-        self.proc_check = QProcess(self)
-        # Сигнал finished срабатывает, когда процесс завершён
-        self.proc_check.finished.connect(lambda exitCode, exitStatus: self.on_check_finished(exitCode, exitStatus, model_name))
-        # Запускаем: docker ps --filter name=ollama --filter status=running --format {{.Names}}
-        self.proc_check.start("docker", ["ps", "--filter", "name=ollama", "--filter", "status=running", "--format", "{{.Names}}"])
-
-    def on_check_finished(self, exitCode, exitStatus, model_name):
-        # Читаем вывод
-        out = ""
-        if self.proc_check:
-            out = self.proc_check.readAllStandardOutput().data().decode().strip()
-        # Сбросим proc_check
-        self.proc_check = None
-
-        if "ollama" not in out:
+        if not container_running(self.owner, "ollama"):
             # Контейнер не запущен
             self.status_label.setText("❌ Контейнер ollama не запущен. Сначала запустите n8n или контейнер ollama вручную.")
             if self.owner and hasattr(self.owner, 'status_label'):
                 self.owner.status_label.setText("❌ Контейнер ollama не запущен. Сначала запустите n8n или контейнер ollama вручную.")
             QMessageBox.warning(self, "Контейнер не запущен",
                                 "Контейнер ollama не запущен.\nСначала нажмите «Запустить n8n» или запустите контейнер ollama.")
-            # Разблокируем ввод
-            self.install_button.setEnabled(True)
-            self.model_input.setEnabled(True)
             return
 
-        # Если контейнер запущен, начинаем установку
-        self.status_label.setText(f"⏳ Устанавливается модель {model_name}...")
-        if self.owner and hasattr(self.owner, 'status_label'):
-            self.owner.status_label.setText(f"⏳ Устанавливается модель {model_name}...")
-
-        # Подготовка буферов
-        self.pull_log = ""
-        self.pull_log_err = ""
-        # Запуск процесса pull
-        self.proc_pull = QProcess(self)
-        # Чтобы читать stdout и stderr отдельно, не объединяем:
-        # self.proc_pull.setProcessChannelMode(QProcess.MergedChannels)
-        self.proc_pull.readyReadStandardOutput.connect(self.on_pull_output)
-        self.proc_pull.readyReadStandardError.connect(self.on_pull_error)
-        self.proc_pull.finished.connect(lambda exitCode, exitStatus: self.on_pull_finished(exitCode, exitStatus, model_name))
-        # Команда: docker exec ollama ollama pull <model_name>
-        # Без "-it", т.к. интерактивность не нужна
-        self.proc_pull.start("docker", ["exec", "ollama", "ollama", "pull", model_name])
-
-    def on_pull_output(self):
-        if not self.proc_pull:
+        if not hasattr(self.owner, "jobs"):
+            # Очередь заданий — у главного окна; без него ставить задание некуда
+            QMessageBox.warning(self, "Ошибка", "Очередь заданий недоступна: окно открыто без главного окна.")
             return
-        data = self.proc_pull.readAllStandardOutput().data().decode()
-        self.pull_log += data
-        # Кратко обновлять статус — можно, но чтобы не мигало слишком часто, обновляем только последнее непустое сообщение
-        last_lines = [line for line in data.splitlines() if line.strip()]
-        if last_lines:
-            last_line = last_lines[-1]
-            # Обновляем диалоговый статус и главный
-            self.status_label.setText(f"… {last_line}")
-            if self.owner and hasattr(self.owner, 'status_label'):
-                self.owner.status_label.setText(f"… {last_line}")
 
-    def on_pull_error(self):
-        if not self.proc_pull:
-            return
-        data = self.proc_pull.readAllStandardError().data().decode()
-        self.pull_log_err += data
-        # Можно не обновлять GUI на каждую ошибку, оставим обработку в on_pull_finished
-
-    def on_pull_finished(self, exitCode, exitStatus, model_name):
-        # Процесс установки завершён
-        success = (exitCode == 0)
-        if success:
-            self.status_label.setText(f"✅ Модель {model_name} успешно установлена или уже была установлена")
-            if self.owner and hasattr(self.owner, 'status_label'):
-                self.owner.status_label.setText(f"✅ Модель {model_name} успешно установлена или уже была установлена")
-        else:
-            self.status_label.setText(f"❌ Ошибка установки модели {model_name}")
-            if self.owner and hasattr(self.owner, 'status_label'):
-                self.owner.status_label.setText(f"❌ Ошибка установки модели {model_name}")
-            # Показать подробности
-            detail = ""
-            if self.pull_log_err:
-                detail = self.pull_log_err
-            elif self.pull_log:
-                detail = self.pull_log
-            else:
-                detail = f"Код выхода: {exitCode}"
-            # Ограничить длину, если очень большой
-            if len(detail) > 1000:
-                detail = detail[:1000] + "\n…"
-            msg = QMessageBox(self)
-            msg.setWindowTitle("Ошибка установки модели")
-            msg.setText(f"Не удалось установить модель {model_name}.")
-            msg.setDetailedText(detail)
-            msg.setIcon(QMessageBox.Critical)
-            msg.exec_()
-
-        # Сбросим состояние, разблокируем ввод
-        self.install_button.setEnabled(True)
-        self.model_input.setEnabled(True)
-        # Сброс буферов
-        self.pull_log = ""
-        self.pull_log_err = ""
-        self.proc_pull = None
+        # Ставим в очередь главного окна и показываем окно заданий
+        added = self.owner.jobs.submit(models, jobs.PULL)
+        if self.owner and hasattr(self.owner, 'status_label'):
+            self.owner.status_label.setText(f"⏳ В очередь установки добавлено моделей: {len(added)}")
+        self.owner.open_jobs_dialog()
+        self.accept()
 
 class ModelDeleteDialog(QDialog):
     """
-    Диалог для удаления модели: docker exec ollama ollama rm <model_name>
+    Диалог для удаления моделей: удаление ставится в ту же очередь заданий, что и установка.
     """
     def __init__(self, owner: Optional[QWidget] = None):
         super().__init__(owner)
@@ -202,9 +138,10 @@ class ModelDeleteDialog(QDialog):
         self.setFixedSize(400, 150)
 
         # Виджеты
-        self.input_label = QLabel("Введите название модели для удаления (например: deepseek-r1:7b):", self)
+        self.input_label = QLabel("Введите названия моделей для удаления через запятую (например: deepseek-r1:7b):", self)
+        self.input_label.setWordWrap(True)
         self.model_input = QLineEdit(self)
-        self.model_input.setPlaceholderText("Название модели")
+        self.model_input.setPlaceholderText("Названия моделей")
         self.delete_button = QPushButton("Удалить", self)
         self.delete_button.setFont(QFont("Segoe UI", 10))
         self.delete_button.setStyleSheet("""
@@ -236,120 +173,622 @@ class ModelDeleteDialog(QDialog):
         v_layout.addWidget(self.status_label)
         self.setLayout(v_layout)
 
-        # Сигнал кнопки
+        # Сигнал кнопки; Enter в поле ввода нажимает её как кнопку по умолчанию
         self.delete_button.clicked.connect(self.on_click_delete)
 
-        # QProcess объекты
-        self.proc_check = None
-        self.proc_rm = None
-
-        # Буферы логов
-        self.rm_log = ""
-        self.rm_log_err = ""
-
     def on_click_delete(self):
-        model_name = self.model_input.text().strip()
-        if not model_name:
+        models = parse_models(self.model_input.text())
+        if not models:
             QMessageBox.warning(self, "Ошибка", "Пожалуйста, введите название модели")
             return
 
-        # Блокируем ввод
-        self.delete_button.setEnabled(False)
-        self.model_input.setEnabled(False)
-        self.status_label.setText("⏳ Проверка контейнера ollama...")
-        if self.owner and hasattr(self.owner, 'status_label'):
-            self.owner.status_label.setText(f"⏳ Проверка контейнера ollama для удаления модели {model_name}...")
-
-        # Проверка запущен ли контейнер ollama
-        self.proc_check = QProcess(self)
-        self.proc_check.finished.connect(lambda exitCode, exitStatus: self.on_check_finished(exitCode, exitStatus, model_name))
-        self.proc_check.start("docker", ["ps", "--filter", "name=ollama", "--filter", "status=running", "--format", "{{.Names}}"])
-
-    def on_check_finished(self, exitCode, exitStatus, model_name):
-        out = ""
-        if self.proc_check:
-            out = self.proc_check.readAllStandardOutput().data().decode().strip()
-        self.proc_check = None
-
-        if "ollama" not in out:
+        if not container_running(self.owner, "ollama"):
             # Контейнер не запущен
             self.status_label.setText("❌ Контейнер ollama не запущен. Сначала запустите n8n или контейнер ollama.")
             if self.owner and hasattr(self.owner, 'status_label'):
                 self.owner.status_label.setText("❌ Контейнер ollama не запущен. Сначала запустите n8n или контейнер ollama.")
             QMessageBox.warning(self, "Контейнер не запущен",
                                 "Контейнер ollama не запущен.\nСначала нажмите «Запустить n8n» или запустите контейнер ollama.")
-            # Разблокируем ввод
-            self.delete_button.setEnabled(True)
-            self.model_input.setEnabled(True)
             return
 
-        # Запускаем удаление
-        self.status_label.setText(f"⏳ Удаляется модель {model_name}...")
+        if not hasattr(self.owner, "jobs"):
+            # Очередь заданий — у главного окна; без него ставить задание некуда
+            QMessageBox.warning(self, "Ошибка", "Очередь заданий недоступна: окно открыто без главного окна.")
+            return
+
+        # Опечатку в имени видно сразу по кэшу списка моделей, без запроса к Ollama
+        unknown = self.owner.inventory.inventory.unknown(models)
+        if unknown:
+            self.status_label.setText(f"❌ Не установлены: {', '.join(unknown)}")
+            QMessageBox.warning(self, "Модель не найдена",
+                                "Эти модели не установлены:\n" + "\n".join(unknown) +
+                                "\n\nСписок установленных — «Настройки» → «Установленные модели».")
+            return
+
+        added = self.owner.jobs.submit(models, jobs.DELETE)
         if self.owner and hasattr(self.owner, 'status_label'):
-            self.owner.status_label.setText(f"⏳ Удаляется модель {model_name}...")
-
-        self.rm_log = ""
-        self.rm_log_err = ""
-        self.proc_rm = QProcess(self)
-        self.proc_rm.readyReadStandardOutput.connect(self.on_rm_output)
-        self.proc_rm.readyReadStandardError.connect(self.on_rm_error)
-        self.proc_rm.finished.connect(lambda exitCode, exitStatus: self.on_rm_finished(exitCode, exitStatus, model_name))
-        # Команда: docker exec ollama ollama rm <model_name>
-        self.proc_rm.start("docker", ["exec", "ollama", "ollama", "rm", model_name])
-
-    def on_rm_output(self):
-        if not self.proc_rm:
+            self.owner.status_label.setText(f"⏳ В очередь удаления добавлено моделей: {len(added)}")
+        self.owner.open_jobs_dialog()
+        self.accept()
+
+class ModelJobsDialog(QDialog):
+    """
+    Немодальное окно очереди операций над моделями: суммарный и по-модельный прогресс,
+    скорость загрузки, отмена и повтор. Закрытие окна задания не прерывает.
+    """
+    COLUMNS = ["Модель", "Операция", "Статус", "Прогресс", "Скорость"]
+    STATE_TEXT = {
+        jobs.QUEUED: "⏳ В очереди",
+        jobs.RUNNING: "⬇️ Выполняется",
+        jobs.DONE: "✅ Готово",
+        jobs.FAILED: "❌ Ошибка",
+        jobs.CANCELLED: "⛔ Отменено",
+    }
+
+    def __init__(self, owner: QWidget):
+        super().__init__(owner)
+        self.owner = owner
+        self.jobs: ModelJobManager = owner.jobs
+        self.setWindowTitle("Очередь моделей")
+        self.resize(640, 360)
+
+        self.summary_label = QLabel("", self)
+        self.total_bar = QProgressBar(self)
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+
+        self.cancel_button = QPushButton("Отменить", self)
+        self.retry_button = QPushButton("Повторить", self)
+        self.clear_button = QPushButton("Убрать завершённые", self)
+        self.concurrency_box = QSpinBox(self)
+        self.concurrency_box.setRange(1, 8)
+        self.concurrency_box.setValue(self.jobs.concurrency)
+
+        h_btn = QHBoxLayout()
+        h_btn.addWidget(self.cancel_button)
+        h_btn.addWidget(self.retry_button)
+        h_btn.addWidget(self.clear_button)
+        h_btn.addStretch(1)
+        h_btn.addWidget(QLabel("Параллельно:", self))
+        h_btn.addWidget(self.concurrency_box)
+
+        v_layout = QVBoxLayout()
+        v_layout.addWidget(self.summary_label)
+        v_layout.addWidget(self.total_bar)
+        v_layout.addWidget(self.table)
+        v_layout.addLayout(h_btn)
+        self.setLayout(v_layout)
+
+        self.cancel_button.clicked.connect(self.on_cancel)
+        self.retry_button.clicked.connect(self.on_retry)
+        self.clear_button.clicked.connect(self.on_clear)
+        self.concurrency_box.valueChanged.connect(self.jobs.set_concurrency)
+        self.jobs.job_changed.connect(self.refresh)
+
+        # Прогресс читаем из заданий по таймеру (4 раза в секунду), а не на каждое событие загрузки
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(250)
+        self.refresh()
+
+    def selected_jobs(self):
+        rows = {index.row() for index in self.table.selectionModel().selectedRows()}
+        return [job for row, job in enumerate(self.jobs.jobs) if row in rows]
+
+    def on_cancel(self):
+        for job in self.selected_jobs():
+            self.jobs.cancel(job)
+
+    def on_retry(self):
+        for job in self.selected_jobs():
+            self.jobs.retry(job)
+
+    def on_clear(self):
+        self.jobs.clear_finished()
+        self.refresh()
+
+    def refresh(self, *args):
+        job_list = list(self.jobs.jobs)
+        if self.table.rowCount() != len(job_list):
+            self.table.setRowCount(len(job_list))
+        for row, job in enumerate(job_list):
+            percent = job.percent
+            if job.state == jobs.FAILED:
+                status = f"{self.STATE_TEXT[job.state]}: {job.error}"
+            elif job.state == jobs.RUNNING and job.status_text:
+                status = job.status_text
+            else:
+                status = self.STATE_TEXT[job.state]
+            values = [
+                job.model,
+                "установка" if job.kind == jobs.PULL else "удаление",
+                status,
+                "" if percent is None else f"{percent:.0f}%" + (f" из {format_bytes(job.total)}" if job.total else ""),
+                f"{format_bytes(job.speed)}/s" if job.state == jobs.RUNNING and job.speed else "",
+            ]
+            for column, value in enumerate(values):
+                item = self.table.item(row, column)
+                if item is None:
+                    self.table.setItem(row, column, QTableWidgetItem(value))
+                elif item.text() != value:
+                    item.setText(value)
+
+        completed, total, speed = self.jobs.totals()
+        active = len(self.jobs.active_jobs())
+        self.total_bar.setValue(int(completed * 100 / total) if total else (0 if active else 100))
+        summary = f"Активных заданий: {active} из {len(job_list)}"
+        if total:
+            summary += f"  •  {format_bytes(completed)} / {format_bytes(total)}"
+        if speed:
+            summary += f"  •  {format_bytes(speed)}/s"
+        self.summary_label.setText(summary)
+
+class SizeItem(QTableWidgetItem):
+    # Ячейка размера сортируется по байтам (Qt.UserRole), а не по строке «4.3 GB»
+    def __lt__(self, other):
+        return (self.data(Qt.UserRole) or 0) < (other.data(Qt.UserRole) or 0)
+
+class ModelInventoryDialog(QDialog):
+    """
+    Немодальный список установленных моделей из кэша ModelInventory: размер, дайджест,
+    квантование, дата изменения, суммарный объём ollama_data. Выбранные модели
+    удаляются через общую очередь заданий; после pull/delete список обновляется сам.
+    Экспорт/импорт переносит модели между машинами без интернета (eva.archive).
+    """
+    COLUMNS = ["Модель", "Размер", "Параметры", "Квантование", "Дайджест", "Изменена"]
+
+    def __init__(self, owner: QWidget):
+        super().__init__(owner)
+        self.owner = owner
+        self.loader = owner.inventory
+        self.setWindowTitle("Установленные модели")
+        self.resize(720, 380)
+
+        self.summary_label = QLabel("", self)
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSortingEnabled(True)
+
+        self.refresh_button = QPushButton("🔄 Обновить", self)
+        self.delete_button = QPushButton("🗑️ Удалить выбранные", self)
+        self.export_button = QPushButton("📤 Экспорт...", self)
+        self.import_button = QPushButton("📥 Импорт...", self)
+        self.archive_task = None
+        h_btn = QHBoxLayout()
+        h_btn.addWidget(self.refresh_button)
+        h_btn.addWidget(self.export_button)
+        h_btn.addWidget(self.import_button)
+        h_btn.addStretch(1)
+        h_btn.addWidget(self.delete_button)
+
+        v_layout = QVBoxLayout()
+        v_layout.addWidget(self.summary_label)
+        v_layout.addWidget(self.table)
+        v_layout.addLayout(h_btn)
+        self.setLayout(v_layout)
+
+        self.refresh_button.clicked.connect(lambda: self.load(force=True))
+        self.delete_button.clicked.connect(self.on_delete)
+        self.export_button.clicked.connect(self.on_export)
+        self.import_button.clicked.connect(self.on_import)
+        self.loader.loaded.connect(self.show_snapshot)
+        self.loader.failed.connect(self.on_failed)
+        self.owner.jobs.job_changed.connect(self.on_job_changed)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.load()
+
+    def load(self, force: bool = False):
+        # Сначала мгновенно показываем то, что есть в кэше (даже устаревшее)
+        snapshot = self.loader.inventory.snapshot
+        if snapshot is not None:
+            self.show_snapshot(snapshot)
+        if force or not self.loader.inventory.is_fresh():
+            self.summary_label.setText(self.summary_label.text() + "  •  ⏳ обновление...")
+        self.loader.load(force)
+
+    def on_job_changed(self, job):
+        if job.state == jobs.DONE and self.isVisible():
+            self.load()
+
+    def on_failed(self, error):
+        self.summary_label.setText(f"❌ Не удалось получить список моделей: {error}")
+
+    def show_snapshot(self, snapshot):
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(snapshot.models))
+        for row, model in enumerate(snapshot.models):
+            values = [model.name, format_bytes(model.size), model.parameter_size,
+                      model.quantization, model.short_digest, model.modified_text]
+            for column, value in enumerate(values):
+                item = SizeItem(value) if column == 1 else QTableWidgetItem(value)
+                if column == 1:
+                    item.setData(Qt.UserRole, model.size)
+                item.setToolTip(model.digest if column == 4 else value)
+                self.table.setItem(row, column, item)
+        self.table.setSortingEnabled(True)
+
+        summary = f"Моделей: {len(snapshot.models)}, {format_bytes(snapshot.total_size)}"
+        if snapshot.disk_usage is not None:
+            summary += f"  •  ollama_data на диске: {format_bytes(snapshot.disk_usage)}"
+        if snapshot.age > 1:
+            summary += f"  •  обновлено {int(snapshot.age)} с назад"
+        self.summary_label.setText(summary)
+
+    def selected_models(self):
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        return [self.table.item(row, 0).text() for row in rows]
+
+    def on_delete(self):
+        models = self.selected_models()
+        if not models:
             return
-        data = self.proc_rm.readAllStandardOutput().data().decode()
-        self.rm_log += data
-        # Отображаем последнюю строку, если есть
-        lines = [line for line in data.splitlines() if line.strip()]
-        if lines:
-            last_line = lines[-1]
-            self.status_label.setText(f"… {last_line}")
-            if self.owner and hasattr(self.owner, 'status_label'):
-                self.owner.status_label.setText(f"… {last_line}")
+        answer = QMessageBox.question(self, "Удаление моделей",
+                                      "Удалить модели?\n" + "\n".join(models),
+                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if answer != QMessageBox.Yes:
+            return
+        added = self.owner.jobs.submit(models, jobs.DELETE)
+        self.owner.status_label.setText(f"⏳ В очередь удаления добавлено моделей: {len(added)}")
+        self.owner.open_jobs_dialog()
 
-    def on_rm_error(self):
-        if not self.proc_rm:
+    def on_export(self):
+        models = self.selected_models()
+        if not models:
+            QMessageBox.information(self, "Экспорт моделей", "Выберите модели в списке.")
             return
-        data = self.proc_rm.readAllStandardError().data().decode()
-        self.rm_log_err += data
-
-    def on_rm_finished(self, exitCode, exitStatus, model_name):
-        success = (exitCode == 0)
-        if success:
-            # Обычно команда выводит что-то вроде "deleted 'MODEL_NAME'"
-            self.status_label.setText(f"✅ Модель {model_name} успешно удалена")
-            if self.owner and hasattr(self.owner, 'status_label'):
-                self.owner.status_label.setText(f"✅ Модель {model_name} успешно удалена")
+        folder_filter = "Папка экспорта (дополняется, если уже есть)"
+        path, selected = QFileDialog.getSaveFileName(self, "Экспорт моделей", "models.tar",
+                                                     f"Архив tar (*.tar);;{folder_filter}")
+        if not path:
+            return
+        if selected == folder_filter and path.lower().endswith(".tar"):
+            path = path[:-4]
+        self.start_archive_task(path, models)
+
+    def on_import(self):
+        from eva import archive
+
+        path, _ = QFileDialog.getOpenFileName(self, "Импорт моделей", "",
+                                              f"Экспорт моделей (*.tar {archive.INDEX_NAME})")
+        if not path:
+            return
+        # Папку экспорта выбирают по её eva-export.json
+        if os.path.basename(path) == archive.INDEX_NAME:
+            path = os.path.dirname(path)
+        self.start_archive_task(path, None)
+
+    def start_archive_task(self, path, models):
+        if self.archive_task is not None and self.archive_task.isRunning():
+            return
+        self.export_button.setEnabled(False)
+        self.import_button.setEnabled(False)
+        self.summary_label.setText("⏳ Экспорт моделей..." if models else "⏳ Импорт моделей...")
+        from eva.gui.archive import ArchiveTask
+
+        store_root = os.path.join(self.owner.project_root, "ollama_data", "models")
+        self.archive_task = ArchiveTask(store_root, path, models, self)
+        self.archive_task.progress.connect(lambda text: self.summary_label.setText(f"⏳ {text}"))
+        self.archive_task.done.connect(self.on_archive_done)
+        self.archive_task.failed.connect(self.on_archive_failed)
+        self.archive_task.start()
+
+    def on_archive_done(self, report):
+        self.export_button.setEnabled(True)
+        self.import_button.setEnabled(True)
+        exported = self.archive_task.models is not None
+        text = (f"✅ {'Экспортировано' if exported else 'Импортировано'} моделей: {len(report['models'])}, "
+                f"скопировано {format_bytes(report['bytes'])}, блобов уже было: {report['skipped']}")
+        self.owner.status_label.setText(text)
+        if exported:
+            self.summary_label.setText(text)
         else:
-            self.status_label.setText(f"❌ Ошибка удаления модели {model_name}")
-            if self.owner and hasattr(self.owner, 'status_label'):
-                self.owner.status_label.setText(f"❌ Ошибка удаления модели {model_name}")
-            # Детали ошибки
-            detail = ""
-            if self.rm_log_err:
-                detail = self.rm_log_err
-            elif self.rm_log:
-                detail = self.rm_log
-            else:
-                detail = f"Код выхода: {exitCode}"
-            if len(detail) > 1000:
-                detail = detail[:1000] + "\n…"
-            msg = QMessageBox(self)
-            msg.setWindowTitle("Ошибка удаления модели")
-            msg.setText(f"Не удалось удалить модель {model_name}.")
-            msg.setDetailedText(detail)
-            msg.setIcon(QMessageBox.Critical)
-            msg.exec_()
+            # Ollama читает манифесты с диска — новые модели видны в /api/tags сразу
+            self.owner.inventory.invalidate()
+            self.load(force=True)
+
+    def on_archive_failed(self, error):
+        self.export_button.setEnabled(True)
+        self.import_button.setEnabled(True)
+        self.summary_label.setText(f"❌ {error}")
+
+class BenchmarkDialog(QDialog):
+    """
+    Бенчмарк выбранных установленных моделей: загрузка, первый токен, скорость
+    промпта и генерации, пропускная способность при 1/2/4/8 параллельных запросах.
+    Отчёты сохраняются в папку benchmarks проекта (тот же формат, что у python -m eva.bench).
+    """
+    def __init__(self, owner: QWidget):
+        from eva import bench
+
+        super().__init__(owner)
+        self.owner = owner
+        self.task = None
+        # Удаляется при закрытии, чтобы не оставлять подписку на сигналы owner.inventory
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle("Бенчмарк моделей")
+        self.resize(560, 440)
+
+        self.models_list = QListWidget(self)
+        self.models_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.levels_input = QLineEdit(",".join(map(str, bench.DEFAULT_LEVELS)), self)
+        self.run_button = QPushButton("▶ Запустить", self)
+        self.stop_button = QPushButton("⏹ Остановить", self)
+        self.stop_button.setEnabled(False)
+        self.log = QPlainTextEdit(self)
+        self.log.setReadOnly(True)
+
+        h_levels = QHBoxLayout()
+        h_levels.addWidget(QLabel("Параллельность:", self))
+        h_levels.addWidget(self.levels_input)
+        h_levels.addWidget(self.run_button)
+        h_levels.addWidget(self.stop_button)
+
+        v_layout = QVBoxLayout()
+        v_layout.addWidget(QLabel("Модели (можно выбрать несколько):", self))
+        v_layout.addWidget(self.models_list)
+        v_layout.addLayout(h_levels)
+        v_layout.addWidget(self.log, 1)
+        self.setLayout(v_layout)
+
+        self.run_button.clicked.connect(self.on_run)
+        self.stop_button.clicked.connect(self.on_stop)
+        self.owner.inventory.loaded.connect(self.show_models)
+        self.owner.inventory.load()
+
+    def show_models(self, snapshot):
+        selected = {item.text() for item in self.models_list.selectedItems()}
+        self.models_list.clear()
+        for model in snapshot.models:
+            self.models_list.addItem(model.name)
+            if model.name in selected:
+                self.models_list.item(self.models_list.count() - 1).setSelected(True)
+
+    def on_run(self):
+        models = [item.text() for item in self.models_list.selectedItems()]
+        try:
+            levels = [int(level) for level in self.levels_input.text().replace(" ", "").split(",") if level]
+        except ValueError:
+            levels = []
+        if not models or not levels or min(levels) < 1:
+            QMessageBox.warning(self, "Ошибка", "Выберите модели и укажите уровни параллельности, например 1,2,4,8")
+            return
+        if not container_running(self.owner, "ollama"):
+            QMessageBox.warning(self, "Контейнер не запущен", "Контейнер ollama не запущен.")
+            return
+        self.log.clear()
+        self.run_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        from eva.gui.bench import BenchmarkTask
+
+        self.task = BenchmarkTask(models, levels, os.path.join(self.owner.project_root, "benchmarks"), self)
+        self.task.progress.connect(self.log.appendPlainText)
+        self.task.done.connect(self.on_done)
+        self.task.failed.connect(self.on_failed)
+        self.task.finished.connect(self.task.deleteLater)
+        self.task.start()
+
+    def on_stop(self):
+        if self.task is not None:
+            self.stop_button.setEnabled(False)
+            self.log.appendPlainText("⏹ Остановка после текущего замера...")
+            self.task.stop_event.set()
+
+    def on_done(self, report, path):
+        from eva import bench
+
+        self.log.appendPlainText("")
+        self.log.appendPlainText(bench.format_report(report))
+        self.log.appendPlainText(f"\nОтчёт: {path}")
+        self.run_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.task = None
+
+    def on_failed(self, error):
+        self.log.appendPlainText(f"\n❌ Бенчмарк не завершён: {error}")
+        self.run_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.task = None
+
+    def done(self, result):
+        if self.task is not None:
+            # Диалог удаляется при закрытии — поток переходит к owner и удалится сам по finished
+            task, self.task = self.task, None
+            for signal in (task.progress, task.done, task.failed):
+                signal.disconnect()
+            task.setParent(self.owner)
+            task.stop()
+        super().done(result)
+
+class ResourceDialog(QDialog):
+    """
+    Немодальное окно ресурсов контейнеров: CPU, память, сеть и диск по каждому
+    сервису с историей за последние минуты. `docker stats` работает, только
+    пока окно открыто.
+    """
+    def __init__(self, owner: QWidget):
+        from eva.gui.stats import Sparkline, StatsMonitor
+
+        super().__init__(owner)
+        self.owner = owner
+        self.setWindowTitle("Ресурсы контейнеров")
+        self.resize(760, 60 + 44 * len(SERVICES))
+        self.monitor = StatsMonitor(self)
+        self.monitor.updated.connect(self.refresh)
+
+        grid = QGridLayout()
+        for column, title in enumerate(["Сервис", "CPU", "", "Память", "", "Сеть / диск"]):
+            grid.addWidget(QLabel(f"<b>{title}</b>", self), 0, column)
+        self.rows = {}
+        for row, service in enumerate(SERVICES, start=1):
+            cpu_line = Sparkline("#4caf50", self)
+            mem_line = Sparkline("#2196f3", self)
+            cpu_label = QLabel("—", self)
+            mem_label = QLabel("—", self)
+            io_label = QLabel("", self)
+            for label in (cpu_label, mem_label):
+                label.setMinimumWidth(100)
+            grid.addWidget(QLabel(service, self), row, 0)
+            grid.addWidget(cpu_line, row, 1)
+            grid.addWidget(cpu_label, row, 2)
+            grid.addWidget(mem_line, row, 3)
+            grid.addWidget(mem_label, row, 4)
+            grid.addWidget(io_label, row, 5)
+            self.rows[service] = (cpu_line, cpu_label, mem_line, mem_label, io_label)
+        grid.setColumnStretch(1, 1)
+        grid.setColumnStretch(3, 1)
+        self.setLayout(grid)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.monitor.start()
+
+    def hideEvent(self, event):
+        self.monitor.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        history = self.monitor.history
+        for service, (cpu_line, cpu_label, mem_line, mem_label, io_label) in self.rows.items():
+            sample = history.latest(service)
+            if sample is None or self.monitor.is_stale(service):
+                cpu_line.setValues([])
+                mem_line.setValues([])
+                cpu_label.setText("—")
+                mem_label.setText("не запущен" if sample is not None or self.monitor.proc else "—")
+                io_label.setText("")
+                continue
+            cpu_line.setValues(history.series(service, "cpu"))
+            mem_line.setValues(history.series(service, "memory"), sample.memory_limit or None)
+            cpu_label.setText(f"{sample.cpu:.1f}%")
+            mem_label.setText(format_bytes(sample.memory))
+            io_label.setText(f"⬇ {format_bytes(history.rate(service, 'net_rx'))}/s ⬆ {format_bytes(history.rate(service, 'net_tx'))}/s  "
+                             f"💾 {format_bytes(history.rate(service, 'block_read'))}/s / {format_bytes(history.rate(service, 'block_write'))}/s")
+
+class LogViewerDialog(QDialog):
+    """
+    Немодальное окно логов сервисов вместо `docker compose logs` в терминале.
+    Пока окно открыто, логи всех сервисов читаются в фоне, каждый в свой
+    ограниченный буфер; список показывает выбранный сервис с фильтром.
+    """
+    FILTER_DELAY_MS = 150
+
+    def __init__(self, owner: QWidget):
+        from eva.gui.logs import LogFollower, LogListModel
+
+        super().__init__(owner)
+        self.owner = owner
+        self.setWindowTitle("Логи сервисов")
+        self.resize(1000, 600)
+        self.follower = LogFollower(self)
+        self.follower.appended.connect(self.on_appended)
+        self.model = LogListModel(self)
+
+        self.service_box = QComboBox(self)
+        self.service_box.addItems(list(SERVICES))
+        self.service_box.setCurrentText("n8n")
+        self.service_box.currentTextChanged.connect(self.show_service)
+        self.filter_edit = QLineEdit(self)
+        self.filter_edit.setPlaceholderText("Фильтр (подстрока, без учёта регистра)")
+        self.filter_edit.setClearButtonEnabled(True)
+        # Фильтр применяется после паузы в наборе, а не на каждую букву
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(self.FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter_edit.textChanged.connect(self.filter_timer.start)
+        self.follow_check = QCheckBox("Следить за концом", self)
+        self.follow_check.setChecked(True)
+        self.copy_btn = QPushButton("📋 Копировать", self)
+        self.copy_btn.clicked.connect(self.copy_selected)
+
+        # Таблица в одну колонку с фиксированной высотой строк: QListView/QTreeView при каждой
+        # вставке перекладывают все строки (по вызову модели на строку), таблица — нет
+        self.view = QTableView(self)
+        self.view.setFont(QFont("Consolas", 9))
+        self.view.horizontalHeader().hide()
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.verticalHeader().hide()
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.view.verticalHeader().setDefaultSectionSize(self.view.fontMetrics().height() + 2)
+        self.view.setShowGrid(False)
+        self.view.setWordWrap(False)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.view.setModel(self.model)
+        self.count_label = QLabel("", self)
+
+        top = QHBoxLayout()
+        top.addWidget(self.service_box)
+        top.addWidget(self.filter_edit, 1)
+        top.addWidget(self.follow_check)
+        top.addWidget(self.copy_btn)
+        layout = QVBoxLayout()
+        layout.addLayout(top)
+        layout.addWidget(self.view, 1)
+        layout.addWidget(self.count_label)
+        self.setLayout(layout)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.follower.start()
+        self.show_service(self.service_box.currentText())
 
-        # Сброс и разблокировка
-        self.delete_button.setEnabled(True)
-        self.model_input.setEnabled(True)
-        self.rm_log = ""
-        self.rm_log_err = ""
-        self.proc_rm = None
+    def hideEvent(self, event):
+        self.follower.stop()
+        super().hideEvent(event)
+
+    def select_service(self, service):
+        self.service_box.setCurrentText(service)
+
+    def show_service(self, service):
+        self.model.set_buffer(self.follower.buffers.get(service), self.filter_edit.text())
+        self.scroll_to_end()
+        self.update_count()
+
+    def apply_filter(self):
+        self.model.set_filter(self.filter_edit.text())
+        self.scroll_to_end()
+        self.update_count()
+
+    def on_appended(self, service):
+        if service != self.service_box.currentText():
+            return
+        self.model.refresh()
+        self.scroll_to_end()
+        self.update_count()
+
+    def scroll_to_end(self):
+        if self.follow_check.isChecked():
+            self.view.scrollToBottom()
+
+    def update_count(self):
+        buffer = self.model.buffer
+        if buffer is None:
+            self.count_label.setText("")
+            return
+        text = f"Строк: {self.model.rowCount()}"
+        if self.filter_edit.text().strip():
+            text += f" из {len(buffer)}"
+        if buffer.dropped:
+            text += f" (старые вытеснены: {buffer.dropped})"
+        self.count_label.setText(text)
+
+    def copy_selected(self):
+        rows = sorted(index.row() for index in self.view.selectionModel().selectedIndexes())
+        if not rows:
+            rows = range(self.model.rowCount())
+        QApplication.clipboard().setText("\n".join(self.model.lines(rows)))
 
 class SettingsDialog(QDialog):
     """
@@ -359,7 +798,7 @@ class SettingsDialog(QDialog):
         super().__init__(owner)
         self.owner: Optional[QWidget] = owner  # главное окно (N8nGUI), чтобы передавать как parent в другие диалоги
         self.setWindowTitle("Настройки")
-        self.setFixedSize(300, 200)
+        self.setFixedSize(300, 360)
 
         # Кнопки внутри диалога
         self.install_btn = QPushButton("📥 Установить модель...", self)
@@ -394,6 +833,70 @@ class SettingsDialog(QDialog):
                 background-color: rgba(100, 0, 0, 200);
             }
         """)
+        self.inventory_btn = QPushButton("📦 Установленные модели...", self)
+        self.inventory_btn.setFont(QFont("Segoe UI", 10))
+        self.inventory_btn.setStyleSheet("""
+            QPushButton {
+                background-color: rgba(0, 0, 128, 180);
+                color: white;
+                border-radius: 8px;
+                padding: 5px 10px;
+            }
+            QPushButton:hover {
+                background-color: rgba(0, 0, 200, 200);
+            }
+            QPushButton:pressed {
+                background-color: rgba(0, 0, 100, 200);
+            }
+        """)
+        self.bench_btn = QPushButton("⏱️ Бенчмарк моделей...", self)
+        self.bench_btn.setFont(QFont("Segoe UI", 10))
+        self.bench_btn.setStyleSheet("""
+            QPushButton {
+                background-color: rgba(0, 0, 128, 180);
+                color: white;
+                border-radius: 8px;
+                padding: 5px 10px;
+            }
+            QPushButton:hover {
+                background-color: rgba(0, 0, 200, 200);
+            }
+            QPushButton:pressed {
+                background-color: rgba(0, 0, 100, 200);
+            }
+        """)
+        self.resources_btn = QPushButton("📊 Ресурсы контейнеров...", self)
+        self.resources_btn.setFont(QFont("Segoe UI", 10))
+        self.resources_btn.setStyleSheet("""
+            QPushButton {
+                background-color: rgba(0, 0, 128, 180);
+                color: white;
+                border-radius: 8px;
+                padding: 5px 10px;
+            }
+            QPushButton:hover {
+                background-color: rgba(0, 0, 200, 200);
+            }
+            QPushButton:pressed {
+                background-color: rgba(0, 0, 100, 200);
+            }
+        """)
+        self.jobs_btn = QPushButton("📋 Очередь моделей...", self)
+        self.jobs_btn.setFont(QFont("Segoe UI", 10))
+        self.jobs_btn.setStyleSheet("""
+            QPushButton {
+                background-color: rgba(0, 0, 128, 180);
+                color: white;
+                border-radius: 8px;
+                padding: 5px 10px;
+            }
+            QPushButton:hover {
+                background-color: rgba(0, 0, 200, 200);
+            }
+            QPushButton:pressed {
+                background-color: rgba(0, 0, 100, 200);
+            }
+        """)
         # Заготовка для будущих настроек Cloudflare
         self.cloudflare_btn = QPushButton("☁️ Настройки Cloudflare...", self)
         self.cloudflare_btn.setFont(QFont("Segoe UI", 10))
@@ -418,6 +921,10 @@ class SettingsDialog(QDialog):
         v_layout = QVBoxLayout()
         v_layout.addWidget(self.install_btn)
         v_layout.addWidget(self.delete_btn)
+        v_layout.addWidget(self.inventory_btn)
+        v_layout.addWidget(self.bench_btn)
+        v_layout.addWidget(self.resources_btn)
+        v_layout.addWidget(self.jobs_btn)
         v_layout.addWidget(self.cloudflare_btn)
         v_layout.addStretch(1)
         self.setLayout(v_layout)
@@ -425,8 +932,16 @@ class SettingsDialog(QDialog):
         # Сигналы кнопок
         self.install_btn.clicked.connect(self.open_install)
         self.delete_btn.clicked.connect(self.open_delete)
+        self.inventory_btn.clicked.connect(self.owner.open_inventory_dialog)
+        self.bench_btn.clicked.connect(self.open_bench)
+        self.resources_btn.clicked.connect(self.owner.open_resources_dialog)
+        self.jobs_btn.clicked.connect(self.owner.open_jobs_dialog)
         # self.cloudflare_btn.clicked.connect(self.open_cloudflare_settings)  # в будущем
 
+    def open_bench(self):
+        dlg = BenchmarkDialog(self.owner)
+        dlg.exec_()
+
     def open_install(self):
         # Открываем диалог установки модели
         dlg = ModelInstallDialog(owner=self.owner)
@@ -440,26 +955,36 @@ class SettingsDialog(QDialog):
     # В будущем можно добавить метод open_cloudflare_settings здесь
 
 class N8nGUI(QWidget):
+    # Окно отрисовано в первый раз (для замера времени запуска)
+    first_painted = pyqtSignal()
+
     def __init__(self):
         super().__init__()
-        # Звуковые эффекты
-        self.hover_sound = QSoundEffect()
-        self.hover_sound.setSource(QUrl.fromLocalFile(resource_path("assets/hover.wav")))
-        self.hover_sound.setVolume(0.25)
+        # Общий клиент HTTP API Ollama (пул keep-alive соединений на порт 11434)
+        self.ollama = OllamaClient()
+        # Очередь установки/удаления моделей живёт вместе с главным окном, а не с диалогами
+        self.jobs = ModelJobManager(self.ollama, concurrency=2, parent=self)
+        self.jobs.job_changed.connect(self.on_job_changed)
+        self.jobs_dialog = None
+        self.resources_dialog = None
+        self.logs_dialog = None
 
-        self.click_sound = QSoundEffect()
-        self.click_sound.setSource(QUrl.fromLocalFile(resource_path("assets/click.wav")))
-        self.click_sound.setVolume(0.25)
+        # Звуковые эффекты загружаются при первом наведении мыши, а не до показа окна
+        self.sounds = LazySounds({
+            "hover": resource_path("assets/hover.wav"),
+            "click": resource_path("assets/click.wav"),
+        })
+        self.first_paint_done = False
 
         # Настройки окна
         self.setWindowTitle("Eva: Red Dragon")
         self.setFixedSize(800, 600)
         self.setWindowIcon(QIcon(resource_path("assets/icon.ico")))
 
-        # Фоновое изображение
+        # Фоновое изображение (уже отмасштабированное берём из кэша на диске)
         bg_path = resource_path("assets/background.jpg")
         if os.path.exists(bg_path):
-            bg_pixmap = QPixmap(bg_path).scaled(self.size(), Qt.KeepAspectRatioByExpanding)
+            bg_pixmap = cached_pixmap(bg_path, self.size())
             palette = QPalette()
             palette.setBrush(QPalette.Window, QBrush(bg_pixmap))
             self.setPalette(palette)
@@ -538,37 +1063,350 @@ class N8nGUI(QWidget):
         self.status_label.setFont(QFont("Segoe UI", 10))
         self.status_label.setStyleSheet("color: white; background-color: rgba(0, 0, 0, 100);")
 
+        # Строка состояния сервисов стека (обновляется из ContainerMonitor)
+        self.services_label = QLabel("", self)
+        self.services_label.setGeometry(0, 522, 800, 28)
+        self.services_label.setAlignment(Qt.AlignCenter)
+        self.services_label.setFont(QFont("Segoe UI", 9))
+        self.services_label.setTextFormat(Qt.RichText)
+        self.services_label.setStyleSheet("color: white; background-color: rgba(0, 0, 0, 60);")
+        self.services_label.setToolTip("Правый клик — запустить или перезапустить отдельный сервис, логи, ресурсы")
+        self.services_label.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.services_label.customContextMenuRequested.connect(self.show_services_menu)
+        # Процессы docker restart / compose up для отдельных сервисов
+        self.service_procs = {}
+
+        # Один поток `docker events` на всё приложение вместо `docker ps` на каждое действие
+        self.containers = ContainerMonitor(self)
+        self.containers.state_changed.connect(self.on_container_state)
+        self.update_services_label()
+        # Сам поток событий запускается после первой отрисовки окна (after_first_paint)
+
+        # Текущий запуск стека (StartupTask) и время готовности сервисов последнего запуска
+        self.startup_task = None
+        self.startup_progress = {}
+        self.last_startup = {}
+
+        # Текущая асинхронная остановка стека (StopPipeline), если идёт
+        self.stop_pipeline = None
+        self.stop_progress = {}
+
         # Определяем корневую директорию проекта
         if getattr(sys, "frozen", False):
-            # Если запущен как скомпилированный .exe (PyInstaller)
+            # Если запущен как скомпилированный .exe (PyInstaller): onefile лежит в dist\,
+            # onedir — в dist\Eva\, поэтому docker-compose.yml ищем выше по дереву
             base_dir = os.path.dirname(sys.executable)
-            self.project_root = os.path.abspath(os.path.join(base_dir, ".."))
+            self.project_root = find_project_root(base_dir) or os.path.abspath(os.path.join(base_dir, ".."))
         else:
             # Если запущен как скрипт python gui.py
             self.project_root = os.path.dirname(os.path.abspath(__file__))
 
+        # Спаны операций (docker, compose, Ollama, задания моделей) — в logs/trace.jsonl,
+        # метрики Prometheus — на 127.0.0.1:EVA_METRICS_PORT, если порт задан
+        tracing.configure_from_env(os.path.join(self.project_root, "logs"))
+
+        # Кэш списка установленных моделей (сбрасывается после каждого pull/delete), см. inventory
+        self._inventory = None
+        self.inventory_dialog = None
+
+        # Планировщик прогрева моделей (создаётся, когда контейнер ollama запущен)
+        self.preload = None
+
+    @property
+    def inventory(self):
+        # Создаётся при первом обращении: после запуска ollama или при открытии диалога моделей
+        if self._inventory is None:
+            from eva.gui.inventory import InventoryLoader
+            from eva.inventory import ModelInventory
+
+            self._inventory = InventoryLoader(
+                ModelInventory(self.ollama, data_dir=os.path.join(self.project_root, "ollama_data")), self)
+        return self._inventory
+
+    def on_container_state(self, service, state):
+        self.update_services_label()
+        if service == "ollama":
+            if state == RUNNING:
+                self.start_preload()
+            elif self.preload is not None:
+                self.preload.stop()
+
+    def start_preload(self):
+        """
+        Прогрев моделей из preload.json (если файла нет — ничего не делаем).
+        Повторный вызов при уже работающем планировщике — внеочередной проход.
+        """
+        if self.preload is not None:
+            if self.preload.is_running():
+                self.preload.tick()
+            else:
+                self.preload.start()
+            return
+        path = os.path.join(self.project_root, CONFIG_NAME)
+        if not os.path.exists(path):
+            return
+        try:
+            config = load_config(path)
+        except (OSError, ValueError, KeyError) as e:
+            self.status_label.setText(f"❌ Ошибка в {CONFIG_NAME}: {e}")
+            return
+        # Загрузка весов в память может идти минуты — отдельный клиент с большим таймаутом
+        scheduler = PreloadScheduler(OllamaClient(timeout=600), config)
+        self.preload = PreloadRunner(scheduler, self)
+        self.preload.report.connect(self.on_preload_report)
+        self.preload.failed.connect(lambda error: self.status_label.setToolTip(f"Прогрев моделей: {error}"))
+        self.preload.start()
+
+    def on_preload_report(self, report):
+        details = [f"{name}: {action} ({detail})" for name, action, detail in report]
+        self.status_label.setToolTip("Прогрев моделей:\n" + "\n".join(details))
+        loaded = [name for name, action, detail in report if action == preload.LOAD]
+        unloaded = [name for name, action, detail in report if action == preload.UNLOAD]
+        if loaded:
+            self.status_label.setText(f"🔥 Модели загружены в память: {', '.join(loaded)}")
+        elif unloaded:
+            self.status_label.setText(f"💤 Модели выгружены (окно закончилось): {', '.join(unloaded)}")
+
+    def update_services_label(self):
+        parts = []
+        for service in SERVICES:
+            state = self.containers.state(service)
+            if state == RUNNING:
+                parts.append(f'<span style="color:#4caf50">●</span> {service}')
+            elif state == UNKNOWN:
+                parts.append(f'<span style="color:#9e9e9e">?</span> {service}')
+            else:
+                parts.append(f'<span style="color:#e53935">○</span> {service}')
+        self.services_label.setText("&nbsp;&nbsp;&nbsp;".join(parts))
+
+    def show_services_menu(self, pos):
+        menu = QMenu(self)
+        for service in SERVICES:
+            if self.containers.is_running(service):
+                action = menu.addAction(f"🔄 Перезапустить {service}")
+                action.triggered.connect(lambda checked=False, s=service: self.restart_service(s))
+            else:
+                action = menu.addAction(f"▶ Запустить {service}")
+                action.triggered.connect(lambda checked=False, s=service: self.start_service(s))
+            action.setEnabled(service not in self.service_procs)
+        menu.addSeparator()
+        menu.addAction("📊 Ресурсы контейнеров...").triggered.connect(self.open_resources_dialog)
+        menu.addAction("📜 Логи сервисов...").triggered.connect(lambda checked=False: self.open_logs_dialog())
+        menu.exec_(self.services_label.mapToGlobal(pos))
+
+    def restart_service(self, service):
+        # docker restart одного контейнера, остальной стек не трогаем
+        self.run_service_command(service, restart_command(service), "Перезапуск", "перезапущен", "docker.restart")
+
+    def start_service(self, service):
+        compose_file = os.path.join(self.project_root, "docker-compose.yml")
+        self.run_service_command(service, compose_command(compose_file, "up", "-d", service), "Запуск", "запущен",
+                                 "compose.up")
+
+    def run_service_command(self, service, args, verb, done_text, span):
+        if service in self.service_procs:
+            return
+        self.status_label.setText(f"⏳ {verb} {service}...")
+        runner = ProcessRunner(self)
+        # Вывод compose (Pulling/Creating/Starting) в статус — не чаще 10 раз в секунду
+        runner.updated.connect(lambda line, progress: self.status_label.setText(f"⏳ {service}: {line}"))
+        runner.finished.connect(lambda exitCode, tail: self.on_service_command_finished(service, exitCode, tail, done_text))
+        self.service_procs[service] = runner
+        runner.start("docker", args, span=span, service=service)
+
+    def on_service_command_finished(self, service, exitCode, tail, done_text):
+        self.service_procs.pop(service, None)
+        if exitCode == 0:
+            self.status_label.setText(f"✅ Сервис {service} {done_text}")
+            return
+        last_line = tail.strip().splitlines()[-1] if tail.strip() else f"код выхода {exitCode}"
+        self.status_label.setText(f"❌ Ошибка: {service}: {last_line}")
+        self.status_label.setToolTip(tail)
+
+    def open_resources_dialog(self):
+        if self.resources_dialog is None:
+            self.resources_dialog = ResourceDialog(self)
+        self.resources_dialog.show()
+        self.resources_dialog.raise_()
+        self.resources_dialog.activateWindow()
+
+    def open_logs_dialog(self, service=None):
+        if self.logs_dialog is None:
+            self.logs_dialog = LogViewerDialog(self)
+        if service:
+            self.logs_dialog.select_service(service)
+        self.logs_dialog.show()
+        self.logs_dialog.raise_()
+        self.logs_dialog.activateWindow()
+
+    def open_jobs_dialog(self):
+        if self.jobs_dialog is None:
+            self.jobs_dialog = ModelJobsDialog(self)
+        self.jobs_dialog.show()
+        self.jobs_dialog.raise_()
+        self.jobs_dialog.activateWindow()
+
+    def open_inventory_dialog(self):
+        if self.inventory_dialog is None:
+            self.inventory_dialog = ModelInventoryDialog(self)
+        self.inventory_dialog.show()
+        self.inventory_dialog.raise_()
+        self.inventory_dialog.activateWindow()
+
+    def on_job_changed(self, job):
+        if job.state == jobs.DONE:
+            self.inventory.invalidate()
+        action = "установлена" if job.kind == jobs.PULL else "удалена"
+        if job.state == jobs.DONE:
+            self.status_label.setText(f"✅ Модель {job.model} успешно {action}")
+        elif job.state == jobs.FAILED:
+            self.status_label.setText(f"❌ Ошибка: {job.model}: {job.error}")
+        elif job.state == jobs.RUNNING:
+            active = len(self.jobs.active_jobs())
+            self.status_label.setText(f"⏳ {'Устанавливается' if job.kind == jobs.PULL else 'Удаляется'} модель {job.model} (активных заданий: {active})")
+
+    def closeEvent(self, event):
+        self.jobs.shutdown()
+        if self.startup_task is not None:
+            self.startup_task.stop()
+        if self.preload is not None:
+            self.preload.stop()
+        self.containers.stop()
+        if self.logs_dialog is not None:
+            self.logs_dialog.follower.stop()
+        self.ollama.close()
+        tracing.tracer.shutdown()
+        super().closeEvent(event)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_paint_done:
+            self.first_paint_done = True
+            startup_timer.mark("first_paint")
+            QTimer.singleShot(0, self.after_first_paint)
+
+    def after_first_paint(self):
+        """
+        Всё, что не нужно для первого кадра: поток `docker events` и т.п.
+        """
+        self.containers.start()
+        self.first_painted.emit()
+
+    def enterEvent(self, event):
+        # Мышь над окном — скоро понадобятся звуки кнопок; загружаем их заранее
+        self.sounds.load()
+        super().enterEvent(event)
+
     def eventFilter(self, source, event):
         if event.type() == event.Enter and isinstance(source, QPushButton):
-            self.hover_sound.play()
+            self.sounds.play("hover")
         elif event.type() == event.MouseButtonPress and isinstance(source, QPushButton):
-            self.click_sound.play()
+            self.sounds.play("click")
         return super().eventFilter(source, event)
 
     def start_n8n(self):
-        try:
-            # Запуск без Cloudflare тоннеля
-            subprocess.Popen('cmd /c start "" "start_n8n.cmd"', cwd=self.project_root, shell=True)
-            self.status_label.setText("⏳ Запуск n8n через localhost...")
-        except Exception as e:
-            self.status_label.setText(f"❌ Ошибка запуска: {e}")
+        if self.startup_task is not None:
+            return
+        # Whisper без сетевого порта — его готовность берём из кэша ContainerMonitor
+        probes = default_probes()
+        probes["whisper"] = lambda: self.containers.is_running("whisper")
+        self.startup_progress = {service: None for service in probes}
+        self.start_button.setEnabled(False)
+        self.status_label.setText("⏳ Запуск n8n через localhost...")
+        # Запускаем только то, чего нет среди работающих контейнеров
+        states = dict(self.containers.table.states)
+        self.startup_task = StartupTask(os.path.join(self.project_root, "docker-compose.yml"), probes, states, self)
+        self.startup_task.stage.connect(lambda text: self.status_label.setText(f"⏳ {text}"))
+        self.startup_task.service_ready.connect(self.on_service_ready)
+        self.startup_task.service_timeout.connect(self.on_service_timeout)
+        self.startup_task.failed.connect(lambda error: self.status_label.setText(f"❌ Ошибка запуска: {error}"))
+        self.startup_task.done.connect(self.on_startup_finished)
+        self.startup_task.start()
+
+    def on_service_ready(self, service, seconds):
+        self.startup_progress[service] = seconds
+        self.show_startup_progress()
+        if service == "n8n":
+            QDesktopServices.openUrl(QUrl("http://localhost:5678"))
+        elif service == "ollama":
+            # Прогреваем кэш списка моделей, чтобы диалоги открывались мгновенно
+            self.inventory.load()
+            self.start_preload()
+
+    def on_service_timeout(self, service):
+        self.startup_progress[service] = False
+        self.show_startup_progress()
+
+    def show_startup_progress(self):
+        parts = []
+        for service, seconds in self.startup_progress.items():
+            if seconds is None:
+                parts.append(f"⏳ {service}")
+            elif seconds is False:
+                parts.append(f"❌ {service}")
+            else:
+                parts.append(f"✅ {service} {seconds:.1f} с")
+        self.status_label.setText("Запуск: " + "  ".join(parts))
+
+    def on_startup_finished(self, report):
+        self.startup_task = None
+        self.start_button.setEnabled(True)
+        self.containers.refresh()
+        if not report:
+            # Ошибку docker/compose уже показал сигнал failed
+            return
+        self.last_startup = report
+        late = [service for service, seconds in report.items() if seconds is None]
+        if late:
+            self.status_label.setText(f"⚠️ Не дождались готовности: {', '.join(late)}. Логи: правый клик по списку сервисов")
+        else:
+            total = max(seconds for service, seconds in report.items() if service != "compose")
+            self.status_label.setText(f"✅ Стек готов за {total:.1f} с (compose {report['compose']:.1f} с)")
+        self.status_label.setToolTip("\n".join(
+            f"{service}: {'—' if seconds is None else f'{seconds:.2f} с'}" for service, seconds in report.items()))
 
     def stop_processes(self):
-        try:
-            # Не убиваем cloudflared.exe, так как он не запускается
-            subprocess.call(f'docker compose -f "{os.path.join(self.project_root, "docker-compose.yml")}" down', shell=True)
+        if self.stop_pipeline is not None:
+            return
+        # Останавливаем только то, что по данным монитора запущено; если docker events
+        # ещё не ответил, пробуем остановить всё
+        running = None
+        if any(self.containers.state(service) != UNKNOWN for service in SERVICES):
+            running = [service for service in SERVICES if self.containers.state(service) != ABSENT]
+        self.stop_progress = {}
+        self.stop_button.setEnabled(False)
+        self.status_label.setText("⏳ Остановка сервисов...")
+        self.stop_pipeline = StopPipeline(os.path.join(self.project_root, "docker-compose.yml"), running, parent=self)
+        self.stop_pipeline.progress.connect(self.on_stop_progress)
+        self.stop_pipeline.finished.connect(self.on_stop_finished)
+        self.stop_pipeline.start()
+
+    def on_stop_progress(self, service, result):
+        self.stop_progress[service] = result
+        marks = {STOPPED: "✅", KILLED: "⚠️", FAILED: "❌", NOT_RUNNING: "▫️"}
+        parts = [f"{marks.get(state, '⏳')} {name}" for name, state in self.stop_progress.items()]
+        self.status_label.setText("Остановка: " + "  ".join(parts))
+
+    def on_stop_finished(self, results):
+        pipeline, self.stop_pipeline = self.stop_pipeline, None
+        self.stop_button.setEnabled(True)
+        failed = [name for name, result in results.items() if result == FAILED]
+        killed = [name for name, result in results.items() if result == KILLED]
+        if failed:
+            self.status_label.setText(f"❌ Не удалось остановить: {', '.join(failed)}")
+            detail = "\n".join(f"{name}: {error}" for name, error in pipeline.errors.items())
+            msg = QMessageBox(self)
+            msg.setWindowTitle("Ошибка остановки")
+            msg.setText("Не все сервисы удалось остановить.")
+            msg.setDetailedText(detail)
+            msg.setIcon(QMessageBox.Warning)
+            msg.exec_()
+        elif killed:
+            self.status_label.setText(f"⚠️ Остановлено, принудительно: {', '.join(killed)}")
+        else:
             self.status_label.setText("✅ Все процессы остановлены")
-        except Exception as e:
-            self.status_label.setText(f"❌ Ошибка остановки: {e}")
+        pipeline.deleteLater()
+        self.containers.refresh()
 
     def open_settings_dialog(self):
         """
@@ -577,8 +1415,37 @@ class N8nGUI(QWidget):
         dlg = SettingsDialog(owner=self)
         dlg.exec_()
 
+def bench_startup_runs(runs):
+    """
+    python main.py --bench-startup-runs N: N холодных запусков окна, медианы по фазам.
+    """
+    command = [sys.executable] if getattr(sys, "frozen", False) else [sys.executable, os.path.abspath(__file__)]
+    report = run_startup_benchmark(command, runs)
+    path = benchmark_output_path()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    if sys.stdout is not None:
+        print(format_summary(report))
+        print(f"Результаты: {path}")
+
 if __name__ == "__main__":
+    if "--bench-startup-runs" in sys.argv:
+        bench_startup_runs(int(sys.argv[sys.argv.index("--bench-startup-runs") + 1]))
+        sys.exit(0)
+    bench_file = None
+    if "--bench-startup" in sys.argv:
+        bench_file = sys.argv[sys.argv.index("--bench-startup") + 1]
+    startup_timer.mark("imports")
     app = QApplication(sys.argv)
+    startup_timer.mark("qapplication")
     window = N8nGUI()
+    startup_timer.mark("window")
+    if bench_file:
+        # Режим замера: записываем фазы и выходим сразу после первого кадра
+        def finish_benchmark():
+            startup_timer.write(bench_file)
+            app.quit()
+        window.first_painted.connect(finish_benchmark)
     window.show()
+    startup_timer.mark("show")
     sys.exit(app.exec_())
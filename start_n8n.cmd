@@ -14,13 +14,7 @@ if %errorlevel% neq 0 (
 
 :: Starting Docker containers
 echo Starting Docker containers...
-docker compose down
-if %errorlevel% neq 0 (
-    echo Error stopping containers
-    pause
-    exit /b 1
-)
-
+:: up -d only creates/starts missing services, running ones are left untouched
 docker compose up -d
 if %errorlevel% neq 0 (
     echo Error starting containers
@@ -50,7 +44,7 @@ if !n8n_ready! == 0 (
     echo WARNING: n8n did not start within 30 seconds
     echo Please try checking manually in a minute:
     echo 1. Open http://localhost:5678
-    echo 2. Check logs: docker compose logs n8n
+    echo 2. Check logs: Eva window, right-click the services list, Logs - or: docker compose logs n8n
     echo ========================================
     echo.
 )
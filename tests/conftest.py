@@ -0,0 +1,114 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class OllamaStubHandler(BaseHTTPRequestHandler):
+    """
+    Заглушка HTTP API Ollama: keep-alive как у настоящего сервера, потоковые ответы chunked.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _send_json(self, status: int, payload: dict):
+        self._maybe_drop()
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _send_stream(self, lines):
+        self._maybe_drop()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for line in lines:
+            chunk = (line if isinstance(line, str) else json.dumps(line)).encode() + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _maybe_drop(self):
+        # Сервер закрывает keep-alive соединение, не предупредив клиента (как Ollama после простоя).
+        # Решаем до отправки ответа: получив его, тест уже может сбросить drop_after_response
+        if self.server.drop_after_response:
+            self.close_connection = True
+
+    def _payload(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path, None))
+        if self.path == "/api/version":
+            self._send_json(200, {"version": "0.0-stub"})
+        elif self.path == "/api/tags":
+            self._send_json(200, {"models": self.server.models})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_DELETE(self):
+        payload = self._payload()
+        self.server.requests.append(("DELETE", self.path, payload))
+        if payload.get("model") in {model["name"] for model in self.server.models}:
+            self._send_json(200, {})
+        else:
+            self._send_json(404, {"error": f"model '{payload.get('model')}' not found"})
+
+    def do_POST(self):
+        payload = self._payload()
+        self.server.requests.append(("POST", self.path, payload))
+        model = payload.get("model")
+        if self.path == "/api/pull":
+            self._send_stream(self.server.pull_lines)
+        elif self.path == "/api/generate":
+            if model not in {item["name"] for item in self.server.models}:
+                self._send_json(404, {"error": f"model '{model}' not found, try pulling it first"})
+            elif payload.get("stream") is False:
+                self._send_json(200, {"model": model, "response": "", "done": True})
+            else:
+                self._send_stream(self.server.generate_lines)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+
+@pytest.fixture
+def ollama_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OllamaStubHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.requests = []
+    server.drop_after_response = False
+    server.models = [{"name": "stub:1b", "size": 1000, "digest": "sha256:" + "a" * 64}]
+    server.pull_lines = []
+    server.generate_lines = [
+        {"model": "stub:1b", "response": "При", "done": False},
+        {"model": "stub:1b", "response": "вет", "done": False},
+        {"model": "stub:1b", "response": "", "done": True, "load_duration": 500_000_000,
+         "prompt_eval_count": 200, "prompt_eval_duration": 100_000_000,
+         "eval_count": 50, "eval_duration": 2_000_000_000},
+    ]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def ollama_client(ollama_stub):
+    from eva.ollama import OllamaClient
+
+    client = OllamaClient("127.0.0.1", ollama_stub.server_address[1], timeout=5)
+    yield client
+    client.close()
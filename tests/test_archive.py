@@ -0,0 +1,190 @@
+import hashlib
+import io
+import json
+import os
+import tarfile
+
+import pytest
+
+from eva import archive
+from eva.archive import ArchiveError, ModelStore
+
+
+def add_model(store: ModelStore, name: str, layers: dict) -> dict:
+    """
+    Модель в хранилище раскладки Ollama: блобы по содержимому и манифест со ссылками на них.
+    """
+    entries = []
+    for content in layers.values():
+        digest = "sha256:" + hashlib.sha256(content).hexdigest()
+        path = store.blob_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        entries.append({"digest": digest, "size": len(content)})
+    manifest = {"schemaVersion": 2, "config": entries[0], "layers": entries[1:]}
+    path = store.manifest_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+@pytest.fixture
+def source(tmp_path):
+    store = ModelStore(str(tmp_path / "ollama" / "models"))
+    shared = b"shared-tokenizer" * 100
+    add_model(store, "llama3:8b", {"config": b"cfg-llama", "weights": b"W" * 5000, "tok": shared})
+    add_model(store, "qwen:1b", {"config": b"cfg-qwen", "weights": b"Q" * 3000, "tok": shared})
+    return store
+
+
+@pytest.mark.parametrize("suffix", ["", ".tar"])
+def test_export_import_round_trip_dedups_shared_blobs(source, tmp_path, suffix):
+    destination = str(tmp_path / ("export" + suffix))
+
+    exported = archive.export_models(source, ["llama3:8b", "qwen:1b"], destination)
+
+    assert exported["blobs"] == 5  # общий блоб токенизатора — один раз
+    target = ModelStore(str(tmp_path / "other" / "models"))
+    imported = archive.import_models(target, destination)
+    assert imported["copied"] == 5
+    assert target.read_manifest("qwen:1b") == source.read_manifest("qwen:1b")
+    for digest, size in archive.manifest_digests(target.read_manifest("llama3:8b")):
+        assert archive.file_sha256(target.blob_path(digest)) == digest
+
+    again = archive.import_models(target, destination)
+    assert again["copied"] == 0 and again["skipped"] == 5
+
+
+def test_export_to_folder_skips_blobs_already_there(source, tmp_path):
+    destination = str(tmp_path / "export")
+    archive.export_models(source, ["llama3:8b"], destination)
+
+    report = archive.export_models(source, ["qwen:1b"], destination)
+
+    assert report["skipped"] == 1 and report["copied"] == 2
+
+
+def test_export_to_folder_merges_index(source, tmp_path):
+    destination = str(tmp_path / "export")
+    archive.export_models(source, ["llama3:8b"], destination)
+    archive.export_models(source, ["qwen:1b"], destination)
+
+    with open(os.path.join(destination, archive.INDEX_NAME), encoding="utf-8") as f:
+        index = json.load(f)
+    assert set(index["models"]) == {"llama3:8b", "qwen:1b"}
+    assert len(index["blobs"]) == 5
+    target = ModelStore(str(tmp_path / "other" / "models"))
+    assert sorted(archive.import_models(target, destination)["models"]) == ["llama3:8b", "qwen:1b"]
+
+
+def test_import_rejects_blob_with_wrong_digest(source, tmp_path):
+    destination = str(tmp_path / "export")
+    archive.export_models(source, ["qwen:1b"], destination)
+    digest = archive.manifest_digests(source.read_manifest("qwen:1b"))[1][0]
+    with open(ModelStore(destination).blob_path(digest), "r+b") as f:
+        f.write(b"X")  # тот же размер, другое содержимое
+
+    target = ModelStore(str(tmp_path / "other" / "models"))
+    with pytest.raises(ArchiveError, match="Дайджест не совпал"):
+        archive.import_models(target, destination)
+    assert not os.path.exists(target.blob_path(digest))
+    assert not os.path.exists(target.manifest_path("qwen:1b"))
+
+
+def test_import_replaces_local_blob_with_wrong_size(source, tmp_path):
+    destination = str(tmp_path / "export.tar")
+    archive.export_models(source, ["qwen:1b"], destination)
+    target = ModelStore(str(tmp_path / "other" / "models"))
+    digest, size = archive.manifest_digests(source.read_manifest("qwen:1b"))[1]
+    os.makedirs(target.blobs)
+    with open(target.blob_path(digest), "wb") as f:
+        f.write(b"truncated")  # недокачанный блоб не считается уже имеющимся
+
+    report = archive.import_models(target, destination)
+
+    assert report["copied"] == 3
+    assert os.path.getsize(target.blob_path(digest)) == size
+
+
+def test_tar_import_rejects_corrupted_blob(source, tmp_path):
+    destination = str(tmp_path / "export.tar")
+    archive.export_models(source, ["llama3:8b"], destination)
+    with open(destination, "r+b") as f:
+        data = f.read()
+        offset = data.index(b"W" * 5000)
+        f.seek(offset)
+        f.write(b"w")
+
+    with pytest.raises(ArchiveError):
+        archive.import_models(ModelStore(str(tmp_path / "other" / "models")), destination)
+
+
+def test_missing_model_and_bad_source(source, tmp_path):
+    with pytest.raises(ArchiveError, match="не найдена"):
+        archive.export_models(source, ["absent:1b"], str(tmp_path / "export"))
+    bogus = tmp_path / "bogus.bin"
+    bogus.write_bytes(b"not an archive")
+    with pytest.raises(ArchiveError):
+        archive.import_models(source, str(bogus))
+
+
+@pytest.mark.parametrize("name, relpath", [
+    ("llama3:8b", "registry.ollama.ai/library/llama3/8b"),
+    ("llama3", "registry.ollama.ai/library/llama3/latest"),
+    ("user/model:q4", "registry.ollama.ai/user/model/q4"),
+])
+def test_manifest_relpath(name, relpath):
+    assert archive.manifest_relpath(name).replace(os.sep, "/") == relpath
+
+
+def malicious_tar(path, index: dict, members: dict):
+    with tarfile.open(path, "w") as tar:
+        for name, data in [(archive.INDEX_NAME, json.dumps(index).encode())] + list(members.items()):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+def test_tar_import_rejects_manifest_path_traversal(tmp_path):
+    source = str(tmp_path / "evil.tar")
+    malicious_tar(source, {"models": {"evil": "../../../pwned"}, "blobs": {}},
+                  {"manifests/../../../pwned": b"owned"})
+    store = ModelStore(str(tmp_path / "trv" / "store"))
+
+    with pytest.raises(ArchiveError, match="недопустимый путь"):
+        archive.import_models(store, source)
+    assert not list(tmp_path.rglob("pwned"))
+
+
+@pytest.mark.parametrize("member", ["blobs/../../evil", "blobs/sha256-" + "0" * 63, "blobs/sha256-" + "A" * 64])
+def test_tar_import_rejects_bad_blob_names(tmp_path, member):
+    source = str(tmp_path / "evil.tar")
+    malicious_tar(source, {"models": {}, "blobs": {}}, {member: b"data"})
+
+    with pytest.raises(ArchiveError, match="недопустимое имя блоба"):
+        archive.import_models(ModelStore(str(tmp_path / "store")), source)
+
+
+def test_folder_import_rejects_bad_digest_in_index(tmp_path):
+    source = tmp_path / "export"
+    source.mkdir()
+    (source / archive.INDEX_NAME).write_text(json.dumps({"models": {}, "blobs": {"sha256:../../x": 1}}))
+
+    with pytest.raises(ArchiveError, match="недопустимый дайджест"):
+        archive.import_models(ModelStore(str(tmp_path / "store")), str(source))
+
+
+def test_manifest_symlink_out_of_store_is_rejected(source, tmp_path):
+    destination = str(tmp_path / "export.tar")
+    archive.export_models(source, ["qwen:1b"], destination)
+    target = ModelStore(str(tmp_path / "other" / "models"))
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    os.makedirs(target.manifests)
+    os.symlink(str(outside), os.path.join(target.manifests, archive.DEFAULT_REGISTRY))
+
+    with pytest.raises(ArchiveError, match="выходит за пределы"):
+        archive.import_models(target, destination)
+    assert not list(outside.rglob("*"))
@@ -0,0 +1,60 @@
+import json
+import threading
+
+from eva import bench
+
+
+def test_run_request_rates_from_ollama_counters(ollama_client):
+    result = bench.run_request(ollama_client, "stub:1b", "привет", num_predict=8)
+
+    assert result["prompt_tokens"] == 200
+    assert result["prompt_tokens_per_second"] == 2000.0
+    assert result["eval_tokens"] == 50
+    assert result["eval_tokens_per_second"] == 25.0
+    assert result["load_seconds"] == 0.5
+    assert result["ttft_seconds"] is not None
+
+
+def test_measure_load_unloads_then_loads(ollama_stub, ollama_client):
+    bench.measure_load(ollama_client, "stub:1b")
+
+    generate = [payload for method, path, payload in ollama_stub.requests if path == "/api/generate"]
+    assert [payload.get("keep_alive") for payload in generate] == [0, None]
+    assert all(payload["stream"] is False for payload in generate)
+
+
+def test_concurrency_level_sends_distinct_prompts(ollama_stub, ollama_client):
+    result = bench.measure_concurrency(ollama_client, "stub:1b", 3, "промпт", 8, rounds=2)
+
+    assert result["requests"] == 6
+    prompts = [payload["prompt"] for method, path, payload in ollama_stub.requests if path == "/api/generate"]
+    assert len(set(prompts)) == 6
+    assert result["tokens_per_second"] > 0
+
+
+def test_benchmark_reports_failed_model_and_continues(ollama_client, tmp_path):
+    progress = []
+    report = bench.run_benchmark(ollama_client, ["missing:1b", "stub:1b"], levels=[1, 2], num_predict=8,
+                                 on_progress=progress.append)
+
+    assert "not found" in report["models"]["missing:1b"]["error"]
+    assert set(report["models"]["stub:1b"]["concurrency"]) == {"1", "2"}
+    assert any("2 параллельных" in line for line in progress)
+    assert "missing:1b: ❌" in bench.format_report(report)
+
+    path = bench.write_report(report, str(tmp_path))
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["levels"] == [1, 2]
+
+
+def test_benchmark_stops_between_levels(ollama_client):
+    stop = threading.Event()
+
+    def on_progress(text):
+        if "1 параллельных" in text:
+            stop.set()
+
+    report = bench.run_benchmark(ollama_client, ["stub:1b"], levels=[1, 2, 4], num_predict=8,
+                                 on_progress=on_progress, stop=stop)
+
+    assert list(report["models"]["stub:1b"]["concurrency"]) == ["1"]
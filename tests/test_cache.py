@@ -0,0 +1,85 @@
+import json
+import os
+import time
+
+from transcriber.cache import TranscriptCache, cache_key, file_digest
+
+RESULT = {"text": "привет", "segments": [{"start": 0.0, "end": 1.0, "text": "привет"}], "language": "ru"}
+
+
+def entry_size(result: dict) -> int:
+    return len(json.dumps(result, ensure_ascii=False).encode())
+
+
+def backdate(cache: TranscriptCache, key: str, seconds: float):
+    past = time.time() - seconds
+    os.utime(cache._path(key), (past, past))
+
+
+def test_cache_key_depends_on_audio_and_settings(tmp_path):
+    audio = tmp_path / "a.mp3"
+    audio.write_bytes(b"audio")
+    digest = file_digest(str(audio))
+
+    settings = {"model": "small", "language": "ru"}
+    assert cache_key(digest, settings) == cache_key(digest, dict(reversed(list(settings.items()))))
+    assert cache_key(digest, {"model": "small"}) != cache_key(digest, {"model": "medium"})
+    assert cache_key(digest, {"model": "small"}) != cache_key(file_digest(__file__), {"model": "small"})
+
+
+def test_hit_returns_stored_result(tmp_path):
+    cache = TranscriptCache(str(tmp_path))
+
+    assert cache.get("k1") is None
+    cache.put("k1", RESULT)
+
+    assert cache.get("k1") == RESULT
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    # Запись видна и новому экземпляру — например, после перезапуска контейнера
+    assert TranscriptCache(str(tmp_path)).get("k1") == RESULT
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = TranscriptCache(str(tmp_path), max_bytes=entry_size(RESULT) * 2)
+    cache.put("old", RESULT)
+    cache.put("used", RESULT)
+    backdate(cache, "old", 20)
+    backdate(cache, "used", 10)
+    cache = TranscriptCache(str(tmp_path), max_bytes=entry_size(RESULT) * 2)
+
+    assert cache.get("used") == RESULT  # попадание обновляет mtime — запись становится самой свежей
+    cache.put("new", RESULT)
+
+    assert cache.get("old") is None
+    assert cache.get("used") == RESULT and cache.get("new") == RESULT
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2 and stats["bytes"] <= stats["max_bytes"]
+
+
+def test_entry_larger_than_limit_is_kept_alone(tmp_path):
+    cache = TranscriptCache(str(tmp_path), max_bytes=10)
+
+    cache.put("big", RESULT)
+
+    assert cache.get("big") == RESULT
+
+
+def test_corrupt_entry_is_dropped(tmp_path):
+    cache = TranscriptCache(str(tmp_path))
+    cache.put("k1", RESULT)
+    with open(cache._path("k1"), "w", encoding="utf-8") as f:
+        f.write('{"text": "обрыв')
+
+    assert cache.get("k1") is None
+    assert not os.path.exists(cache._path("k1"))
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+
+
+def test_unserializable_result_is_not_stored(tmp_path):
+    cache = TranscriptCache(str(tmp_path))
+
+    cache.put("k1", {"text": object()})
+
+    assert cache.get("k1") is None
+    assert os.listdir(str(tmp_path)) == []
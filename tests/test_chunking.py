@@ -0,0 +1,101 @@
+import pytest
+
+# numpy ставится вместе с whisper в контейнере распознавания, в окружении лаунчера его может не быть
+np = pytest.importorskip("numpy")
+
+from transcriber.chunking import (  # noqa: E402
+    SAMPLE_RATE, Chunk, InOrderEmitter, make_chunks, merge_results, shift_segments,
+)
+
+
+def speech_with_pauses(seconds: float, pauses) -> np.ndarray:
+    """
+    «Речь» — шум постоянной громкости, паузы — полсекунды тишины с центром в pauses (секунды).
+    """
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, int(seconds * SAMPLE_RATE)).astype(np.float32)
+    for pause in pauses:
+        audio[int((pause - 0.25) * SAMPLE_RATE):int((pause + 0.25) * SAMPLE_RATE)] = 0.0
+    return audio
+
+
+def test_chunks_are_cut_in_pauses():
+    audio = speech_with_pauses(200, [50, 115, 170])
+
+    chunks = make_chunks(audio, target_seconds=60, overlap_seconds=1)
+
+    # Граница — в самой тихой точке окна [45; 75] с от предыдущей, а не ровно через 60 с
+    ends = [chunk.core_end / SAMPLE_RATE for chunk in chunks]
+    assert len(ends) == 4 and ends[-1] == 200
+    for end, pause in zip(ends, (50, 115, 170)):
+        assert abs(end - pause) < 0.3
+
+
+def test_chunk_cores_tile_the_audio_and_overlap_is_clipped():
+    audio = speech_with_pauses(150, [60, 120])
+
+    chunks = make_chunks(audio, target_seconds=60, overlap_seconds=1)
+
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    assert chunks[0].core_start == 0 and chunks[-1].core_end == len(audio)
+    for left, right in zip(chunks, chunks[1:]):
+        assert left.core_end == right.core_start
+        assert left.end == left.core_end + SAMPLE_RATE
+        assert right.start == right.core_start - SAMPLE_RATE
+    assert chunks[0].start == 0 and chunks[-1].end == len(audio)
+
+
+def test_short_audio_is_one_chunk():
+    audio = speech_with_pauses(30, [])
+
+    assert make_chunks(audio, target_seconds=60) == [Chunk(0, 0, len(audio), 0, len(audio))]
+
+
+def test_shift_segments_moves_to_record_time_and_drops_overlap():
+    # Фрагмент отдаётся модели с 99 с, но отвечает только за [100; 160)
+    chunk = Chunk(1, 99 * SAMPLE_RATE, 161 * SAMPLE_RATE, 100 * SAMPLE_RATE, 160 * SAMPLE_RATE)
+    result = {"segments": [
+        {"start": 0.2, "end": 1.5, "text": " хвост прошлого"},
+        {"start": 1.0, "end": 4.0, "text": " начало", "words": [{"word": "начало", "start": 1.0, "end": 1.6}]},
+        {"start": 61.2, "end": 61.9, "text": " уже следующий"},
+    ]}
+
+    segments = shift_segments(result, chunk)
+
+    assert [segment["text"] for segment in segments] == [" начало"]
+    assert segments[0]["start"] == pytest.approx(100.0) and segments[0]["end"] == pytest.approx(103.0)
+    assert segments[0]["words"][0]["start"] == pytest.approx(100.0)
+    assert result["segments"][1]["start"] == 1.0  # исходный результат не меняется
+
+
+def test_overlap_segment_is_kept_once():
+    audio = speech_with_pauses(130, [60])
+    first, second = make_chunks(audio, target_seconds=60, overlap_seconds=1)
+    boundary = first.core_end / SAMPLE_RATE
+    # Оба фрагмента слышат фразы рядом с границей; каждую должен отдать ровно один
+    phrases = [boundary - 0.5, boundary + 0.5]
+
+    def recognized(chunk):
+        return {"segments": [{"start": at - chunk.offset, "end": at - chunk.offset + 0.4, "text": f" {at:.1f}"}
+                             for at in phrases if chunk.start / SAMPLE_RATE <= at < chunk.end / SAMPLE_RATE]}
+
+    merged = merge_results([shift_segments(recognized(chunk), chunk) for chunk in (first, second)], "ru")
+
+    assert [segment["start"] for segment in merged["segments"]] == pytest.approx(phrases)
+    assert [segment["id"] for segment in merged["segments"]] == [0, 1]
+    assert merged["language"] == "ru"
+
+
+def test_emitter_releases_chunks_in_order():
+    emitted = []
+    emitter = InOrderEmitter(emitted.append)
+
+    emitter.add(2, ["c"])
+    emitter.add(1, ["b"])
+    assert emitted == []
+
+    emitter.add(0, ["a"])
+    assert emitted == [["a"], ["b"], ["c"]]
+
+    emitter.add(4, ["e"])
+    emitter.add(3, ["d"])
+    assert emitted[3:] == [["d"], ["e"]]
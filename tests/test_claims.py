@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+from transcriber.claims import CLAIMS_DIR, ClaimStore
+
+
+def touch(path: str, text: str = "audio") -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def age(path: str, seconds: float):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_only_one_racing_store_claims_a_file(tmp_path):
+    audio = str(tmp_path)
+    stores = [ClaimStore(audio, f"worker-{index}") for index in range(8)]
+    paths = [touch(os.path.join(audio, f"{index}.mp3")) for index in range(20)]
+    results = {store.worker_id: [] for store in stores}
+    start = threading.Barrier(len(stores))
+
+    def grab(store):
+        start.wait()
+        for path in paths:
+            claimed = store.claim(path)
+            if claimed:
+                results[store.worker_id].append(claimed)
+
+    threads = [threading.Thread(target=grab, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    claimed = [path for paths_of_worker in results.values() for path in paths_of_worker]
+    assert sorted(os.path.basename(path) for path in claimed) == sorted(os.path.basename(path) for path in paths)
+    assert all(os.path.exists(path) for path in claimed)
+    for store in stores:
+        assert sorted(store.claimed()) == sorted(results[store.worker_id])
+
+
+def test_claim_keeps_subfolder_and_release_restores_it(tmp_path):
+    audio = str(tmp_path)
+    store = ClaimStore(audio, "worker-1")
+    path = touch(os.path.join(audio, "priority", "call.mp3"))
+
+    claimed = store.claim(path)
+
+    assert claimed == os.path.join(audio, CLAIMS_DIR, "worker-1", "priority", "call.mp3")
+    assert store.claim(path) is None
+    assert store.release(store.own_dir) == 1
+    assert os.path.exists(path)
+    assert not os.path.exists(store.own_dir)
+
+
+def test_stale_claims_are_returned_by_a_live_worker(tmp_path):
+    audio = str(tmp_path)
+    dead = ClaimStore(audio, "dead", stale_seconds=60)
+    busy = ClaimStore(audio, "busy", stale_seconds=60)
+    live = ClaimStore(audio, "live", stale_seconds=60)
+    for store in (dead, busy, live):
+        store.heartbeat()
+    dead.claim(touch(os.path.join(audio, "a.mp3")))
+    busy.claim(touch(os.path.join(audio, "b.mp3")))
+    age(os.path.join(dead.own_dir, ".heartbeat"), 120)
+
+    assert live.recover_stale() == 1
+
+    assert os.path.exists(os.path.join(audio, "a.mp3"))
+    assert not os.path.exists(dead.own_dir)
+    assert [os.path.basename(path) for path in busy.claimed()] == ["b.mp3"]
+
+
+def test_worker_never_recovers_its_own_folder_as_stale(tmp_path):
+    audio = str(tmp_path)
+    store = ClaimStore(audio, "worker-1", stale_seconds=60)
+    store.heartbeat()
+    store.claim(touch(os.path.join(audio, "a.mp3")))
+    age(os.path.join(store.own_dir, ".heartbeat"), 120)
+
+    assert store.recover_stale() == 0
+    assert len(store.claimed()) == 1
+
+
+def test_restarted_worker_returns_its_leftovers(tmp_path):
+    audio = str(tmp_path)
+    before = ClaimStore(audio, "whisper-1")
+    before.heartbeat()
+    before.claim(touch(os.path.join(audio, "a.mp3")))
+    before.claim(touch(os.path.join(audio, "priority", "b.mp3")))
+
+    # Тот же worker_id после перезапуска супервизором: .heartbeat ещё свежий, ждать stale_seconds не нужно
+    after = ClaimStore(audio, "whisper-1")
+
+    assert after.recover_own() == 2
+    assert os.path.exists(os.path.join(audio, "a.mp3"))
+    assert os.path.exists(os.path.join(audio, "priority", "b.mp3"))
+    assert after.recover_own() == 0
+
+
+def test_close_keeps_folder_with_unfinished_file(tmp_path):
+    audio = str(tmp_path)
+    store = ClaimStore(audio, "worker-1")
+    store.heartbeat()
+    store.close()
+    assert not os.path.exists(store.own_dir)
+
+    store.heartbeat()
+    store.claim(touch(os.path.join(audio, "a.mp3")))
+    store.close()
+    assert len(store.claimed()) == 1
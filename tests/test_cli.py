@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+from http.client import HTTPConnection
+
+import pytest
+
+from eva.cli import build_parser, call_daemon, format_human, params_from_args
+from eva.daemon import Daemon
+
+
+def params(*argv) -> dict:
+    return params_from_args(build_parser().parse_args(list(argv)))
+
+
+@pytest.mark.parametrize("argv, expected", [
+    (["status"], {}),
+    (["up"], {}),
+    (["up", "n8n", "ollama", "--deadline", "30"], {"services": ["n8n", "ollama"], "deadline": 30.0}),
+    (["down", "--keep"], {"keep": True}),
+    (["down"], {}),
+    (["pull", "a:1b", "b:7b", "--parallel", "3"], {"models": ["a:1b", "b:7b"], "parallel": 3}),
+    (["rm", "a:1b"], {"models": ["a:1b"]}),
+    (["bench", "a:1b"], {"models": ["a:1b"], "levels": [1, 2, 4, 8]}),
+    (["bench", "a:1b", "--levels", "1, 3,", "--num-predict", "64"], {"models": ["a:1b"], "levels": [1, 3],
+                                                                      "num_predict": 64}),
+    (["export", "a:1b", "--to", "models.tar"], {"models": ["a:1b"], "path": "models.tar"}),
+    (["import", "models.tar"], {"path": "models.tar"}),
+])
+def test_params_from_args(argv, expected):
+    assert params(*argv) == expected
+
+
+@pytest.mark.parametrize("levels", ["1,x", "", "0,2", "-1"])
+def test_bad_levels_are_a_usage_error(levels, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        build_parser().parse_args(["bench", "a:1b", "--levels", levels])
+
+    assert exit_info.value.code == 2
+    assert "--levels" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("command, result, expected", [
+    ("status", {"ok": False, "error": "Docker не запущен"}, "❌ Docker не запущен"),
+    ("status", {"services": {"n8n": "running", "ollama": "absent"}, "ollama": False},
+     "n8n        running\nollama     absent\nollama api недоступен"),
+    ("up", {"ready": {"n8n": 12.34, "whisper": None}, "errors": ["docker up: код 1"]},
+     "n8n        готов за 12.3 с\nwhisper    не готов\n❌ docker up: код 1"),
+    ("down", {"results": {"n8n": "stopped", "ollama": "killed"}, "errors": {"ollama": "timeout"}},
+     "n8n        stopped\nollama     killed: timeout"),
+    ("pull", {"models": {"a:1b": {"state": "done", "error": ""}, "b:1b": {"state": "failed", "error": "not found"}}},
+     "a:1b: done\nb:1b: failed (not found)"),
+    ("import", {"models": ["a:1b", "b:7b"], "blobs": 5, "copied": 3, "bytes": 3 * 1024 ** 3, "skipped": 2},
+     "Модели: a:1b, b:7b\nБлобов: 5, скопировано 3 (3.00 ГБ), уже были: 2"),
+])
+def test_format_human(command, result, expected):
+    assert format_human(command, result) == expected
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    calls = []
+    daemon = Daemon({"status": lambda params: calls.append(params) or {"ok": True, "echo": params}}, 0)
+    monkeypatch.setattr(daemon.watcher, "start", lambda: None)  # без docker events
+    thread = threading.Thread(target=daemon.serve, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while daemon.server is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    daemon.port = daemon.server.server_address[1]
+    daemon.calls = calls
+    yield daemon
+    daemon.shutdown()
+    thread.join(5)
+
+
+def post(port: int, headers: dict, body: bytes = b"{}"):
+    conn = HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request("POST", "/status", body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_cli_request_reaches_handler(daemon):
+    result = call_daemon("status", {"services": ["n8n"]}, port=daemon.port)
+
+    assert result == {"ok": True, "echo": {"services": ["n8n"]}}
+    assert post(daemon.port, {"Content-Type": "application/json; charset=utf-8"})[0] == 200
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({"Content-Type": "application/json", "Origin": "https://example.com"}, 403),
+    ({"Content-Type": "application/json", "Origin": "null"}, 403),
+    ({"Content-Type": "text/plain"}, 415),
+    ({"Content-Type": "application/x-www-form-urlencoded"}, 415),
+    ({}, 415),
+])
+def test_browser_requests_are_rejected(daemon, headers, status):
+    code, result = post(daemon.port, headers)
+
+    assert code == status and "error" in result
+    assert daemon.calls == []
+
+
+def test_unknown_command_is_404(daemon):
+    assert call_daemon("down", {}, port=daemon.port) == {"error": "неизвестная команда: /down"}
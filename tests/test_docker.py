@@ -0,0 +1,13 @@
+from eva.docker import start_order, start_plan
+
+
+def test_start_plan_creates_dependency_before_starting_dependents():
+    plan = start_plan({"postgres": "absent", "n8n": "exited", "pgadmin": "paused",
+                       "whisper": "exited", "ollama": "running"})
+
+    assert plan == [("start", ["whisper"]), ("up", ["postgres"]), ("unpause", ["pgadmin"]), ("start", ["n8n"])]
+
+
+def test_start_plan_skips_running_services():
+    assert start_plan({service: "running" for service in start_order(["n8n", "postgres"])}, ["n8n", "postgres"]) == []
+    assert start_plan({"n8n": "running"}, ["n8n", "postgres"]) == [("up", ["postgres"])]
@@ -0,0 +1,101 @@
+import json
+import os
+
+import pytest
+
+from transcriber.index import TranscriptIndex, fts_query
+
+RESULT = {
+    "text": " Ёлка стоит в лесу. Всё ещё зелёная.",
+    "language": "ru",
+    "segments": [
+        {"start": 0.0, "end": 2.5, "text": " Ёлка стоит в лесу."},
+        {"start": 2.5, "end": 5.0, "text": " Всё ещё зелёная."},
+    ],
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TranscriptIndex(str(tmp_path / ".transcriber" / "index.sqlite"))
+    yield index
+    index.close()
+
+
+def test_fts_query_quotes_words_as_prefixes():
+    assert fts_query('Всё "ещё" OR зелёная*') == '"Все"* "еще"* "OR"* "зеленая"*'
+    assert fts_query("  ,.!") == ""
+
+
+def test_added_transcript_is_stored_with_segments(index):
+    index.add("call", RESULT, digest="abc", duration=5.0, source="call.mp3")
+
+    found = index.transcript("call")
+    assert found["language"] == "ru" and found["source"] == "call.mp3" and found["digest"] == "abc"
+    assert [segment["text"] for segment in found["segments"]] == ["Ёлка стоит в лесу.", "Всё ещё зелёная."]
+    assert index.has("call") and not index.has("other")
+    assert index.transcript("other") is None
+
+
+def test_readding_file_replaces_old_record(index):
+    index.add("call", RESULT)
+    index.add("call", {"text": "другой текст", "segments": []}, duration=3.0)
+
+    assert index.stats()["transcripts"] == 1 and index.stats()["segments"] == 1
+    assert index.search("ёлка") == []
+    assert index.search("другой")[0]["end"] == 3.0
+
+
+def test_search_ignores_case_and_yo_and_keeps_original_text(index):
+    index.add("call", RESULT, source="call.mp3")
+
+    hits = index.search("ЕЛК")
+    assert [(hit["file"], hit["start"]) for hit in hits] == [("call", 0.0)]
+    assert hits[0]["snippet"] == "[Ёлка] стоит в лесу."
+
+    hit, = index.search("все зеленая")
+    assert hit["text"] == "Всё ещё зелёная."
+    assert hit["snippet"] == "[Всё] ещё [зелёная]."
+
+
+def test_raw_query_and_limit(index):
+    index.add("a", RESULT)
+    index.add("b", {"text": "", "segments": [{"start": 1.0, "end": 2.0, "text": "ёлка в лесу"}]})
+
+    assert {hit["file"] for hit in index.search('"в лесу"', raw=True)} == {"a", "b"}
+    assert {hit["file"] for hit in index.search("стоит OR ёлка", raw=True)} == {"a", "b"}
+    assert len(index.search("ёлка", limit=1)) == 1
+
+
+def test_long_segment_snippet_is_trimmed(index):
+    text = "начало " + "слово " * 30 + "ёжик в тумане"
+    index.add("long", {"segments": [{"start": 0.0, "end": 30.0, "text": text}]})
+
+    snippet = index.search("ежик")[0]["snippet"]
+
+    assert snippet.startswith("…") and "[ёжик]" in snippet
+    assert len(snippet) < len(text)
+
+
+def test_backfill_prefers_json_and_skips_partial(index, tmp_path):
+    output = tmp_path / "transcriptions"
+    output.mkdir()
+    (output / "a.json").write_text(json.dumps(RESULT, ensure_ascii=False), encoding="utf-8")
+    (output / "a.txt").write_text("текст без таймкодов", encoding="utf-8")
+    (output / "b.txt").write_text("только текст", encoding="utf-8")
+    (output / "c.partial.txt").write_text("ещё распознаётся", encoding="utf-8")
+    (output / "d.json").write_text("[1, 2]", encoding="utf-8")
+    (output / "e.json").write_text("{битый", encoding="utf-8")
+
+    assert index.backfill(str(output)) == 2
+
+    assert len(index.transcript("a")["segments"]) == 2
+    assert index.transcript("b")["segments"][0]["text"] == "только текст"
+    assert index.transcript("b")["source"] == os.path.join(str(output), "b.txt")
+    assert not index.has("c.partial") and not index.has("d") and not index.has("e")
+    # Повторный проход ничего не добавляет: записи уже в индексе
+    assert index.backfill(str(output)) == 0
+
+
+def test_backfill_of_missing_folder_adds_nothing(index, tmp_path):
+    assert index.backfill(str(tmp_path / "missing")) == 0
@@ -0,0 +1,144 @@
+import threading
+import time
+
+import pytest
+
+from eva.jobs import CANCELLED, DELETE, DONE, FAILED, QUEUED, RUNNING, JobManager, ModelJob
+
+DIGEST = "sha256:" + "b" * 64
+
+
+class GatedLines:
+    """
+    Строки прогресса pull, после которых стрим «зависает», пока не открыт gate.
+    """
+    def __init__(self):
+        self.gate = threading.Event()
+
+    def __iter__(self):
+        yield {"status": f"pulling {DIGEST}", "digest": DIGEST, "total": 2000, "completed": 500}
+        self.gate.wait(10)
+        yield {"status": "success"}
+
+
+def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "условие не выполнилось вовремя"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def gated(ollama_stub):
+    lines = GatedLines()
+    ollama_stub.pull_lines = lines
+    yield lines
+    lines.gate.set()
+
+
+def pulls(stub):
+    return [payload["model"] for method, path, payload in stub.requests if path == "/api/pull"]
+
+
+def test_concurrency_limits_running_jobs(ollama_stub, ollama_client, gated):
+    manager = JobManager(ollama_client, concurrency=2)
+
+    added = manager.submit(["a:1b", "b:1b", "c:1b"])
+
+    wait_for(lambda: len(pulls(ollama_stub)) == 2)
+    assert [job.state for job in added] == [RUNNING, RUNNING, QUEUED]
+    gated.gate.set()
+    wait_for(lambda: all(job.finished for job in added))
+    assert [job.state for job in added] == [DONE, DONE, DONE]
+    assert sorted(pulls(ollama_stub)) == ["a:1b", "b:1b", "c:1b"]
+
+
+def test_submit_skips_models_already_in_queue(ollama_client, gated):
+    manager = JobManager(ollama_client, concurrency=1)
+
+    first = manager.submit(["a:1b", "b:1b"])
+    again = manager.submit([" a:1b", "b:1b", ""])
+
+    assert len(first) == 2 and again == []
+    assert manager.submit(["a:1b"], DELETE)[0].kind == DELETE
+
+
+def test_cancel_queued_job_never_starts(ollama_stub, ollama_client, gated):
+    manager = JobManager(ollama_client, concurrency=1)
+    running, queued = manager.submit(["a:1b", "b:1b"])
+
+    assert manager.cancel(queued)
+    assert queued.state == CANCELLED
+
+    gated.gate.set()
+    wait_for(lambda: running.finished)
+    assert running.state == DONE
+    assert pulls(ollama_stub) == ["a:1b"]
+
+
+def test_cancel_stalled_pull_closes_stream_at_once(ollama_client, gated):
+    manager = JobManager(ollama_client, concurrency=1)
+    job, = manager.submit(["a:1b"])
+    wait_for(lambda: job.completed == 500)
+
+    started = time.monotonic()
+    assert manager.cancel(job)
+    wait_for(lambda: job.finished)
+
+    # Следующего события прогресса нет — отмена не должна его ждать (таймаут клиента 5 с)
+    assert time.monotonic() - started < 2
+    assert job.state == CANCELLED
+    assert job.error == ""
+
+
+def test_running_delete_is_not_cancelled(ollama_client):
+    manager = JobManager(ollama_client)
+    job = ModelJob(1, "stub:1b", DELETE)
+    job.state = RUNNING
+
+    assert not manager.cancel(job)
+    assert not job.cancel_event.is_set()
+
+
+def test_delete_reports_its_result(ollama_client):
+    manager = JobManager(ollama_client)
+
+    done, failed = manager.submit(["stub:1b", "missing:1b"], DELETE)
+
+    wait_for(lambda: done.finished and failed.finished)
+    assert done.state == DONE
+    assert failed.state == FAILED
+    assert "not found" in failed.error
+
+
+def test_failed_job_frees_slot_and_can_be_retried(ollama_stub, ollama_client):
+    ollama_stub.pull_lines = [{"error": "pull model manifest: file does not exist"}]
+    manager = JobManager(ollama_client, concurrency=1)
+    states = []
+    manager.on_state = lambda job: states.append(job.state)
+
+    first, second = manager.submit(["a:1b", "b:1b"])
+    wait_for(lambda: first.finished and second.finished)
+    assert (first.state, second.state) == (FAILED, FAILED)
+    assert "file does not exist" in first.error
+
+    ollama_stub.pull_lines = [{"status": "success"}]
+    manager.retry(first)
+    wait_for(lambda: first.finished)
+
+    assert first.state == DONE
+    assert first.error == ""
+    assert states[-3:] == [QUEUED, RUNNING, DONE]
+
+
+def test_retry_ignores_done_jobs(ollama_stub, ollama_client):
+    ollama_stub.pull_lines = [{"status": "success"}]
+    manager = JobManager(ollama_client)
+    job, = manager.submit(["a:1b"])
+    wait_for(lambda: job.finished)
+
+    manager.retry(job)
+
+    assert job.state == DONE
+    assert pulls(ollama_stub) == ["a:1b"]
+
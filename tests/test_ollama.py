@@ -0,0 +1,71 @@
+import pytest
+
+from eva.ollama import OllamaError, PullProgress, format_progress, parse_host
+
+
+def test_pull_progress_is_parsed_line_by_line(ollama_stub, ollama_client):
+    digest = "sha256:" + "6a0746a1ec1a" + "0" * 52
+    ollama_stub.pull_lines = [
+        {"status": "pulling manifest"},
+        "",
+        "not json",
+        {"status": f"pulling {digest}", "digest": digest, "total": 2000, "completed": 500},
+        {"status": f"pulling {digest}", "digest": digest, "total": 2000, "completed": 2000},
+        {"status": "success"},
+    ]
+
+    events = list(ollama_client.pull("stub:1b"))
+
+    assert [event.status for event in events] == ["pulling manifest", f"pulling {digest}", f"pulling {digest}", "success"]
+    assert events[1] == PullProgress(f"pulling {digest}", digest, 2000, 500)
+    assert events[1].percent == 25.0
+    assert events[0].percent is None
+    assert format_progress(events[1]).startswith("pulling 6a0746a1ec1a: 25%")
+
+
+def test_pull_error_event_raises(ollama_stub, ollama_client):
+    ollama_stub.pull_lines = [{"status": "pulling manifest"}, {"error": "pull model manifest: file does not exist"}]
+
+    with pytest.raises(OllamaError, match="file does not exist"):
+        list(ollama_client.pull("missing:1b"))
+
+
+def test_error_json_becomes_ollama_error(ollama_client):
+    with pytest.raises(OllamaError, match="model 'missing:1b' not found"):
+        ollama_client.delete("missing:1b")
+
+
+def test_keep_alive_connection_is_reused(ollama_stub, ollama_client):
+    assert ollama_client.tags()[0]["name"] == "stub:1b"
+    assert ollama_client.is_available()
+    ollama_client.delete("stub:1b")
+
+    assert ollama_stub.connections == 1
+
+
+def test_request_is_retried_after_keep_alive_drop(ollama_stub, ollama_client):
+    ollama_stub.drop_after_response = True
+    ollama_client.tags()  # сервер закрыл соединение, клиент вернул его в пул
+    ollama_stub.drop_after_response = False
+
+    assert ollama_client.tags()[0]["name"] == "stub:1b"
+    assert ollama_stub.connections == 2
+
+
+def test_unreachable_server_raises():
+    from eva.ollama import OllamaClient
+
+    client = OllamaClient("127.0.0.1", 9, timeout=1)
+    with pytest.raises(OllamaError, match="недоступна"):
+        client.tags()
+    assert not client.is_available()
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("", ("127.0.0.1", 11434)),
+    ("0.0.0.0", ("127.0.0.1", 11434)),
+    ("ollama:11500", ("ollama", 11500)),
+    ("http://10.0.0.5:8080", ("10.0.0.5", 8080)),
+])
+def test_parse_host(value, expected):
+    assert parse_host(value) == expected
@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import pytest
+
+from eva.preload import (
+    KEEP, LOAD, SKIP, UNLOAD, PreloadConfig, PreloadModel, load_config, minutes_left, parse_window, plan,
+)
+
+GB = 1024 ** 3
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 3, 2, hour, minute)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("08:00-20:00", (480, 1200)),
+    (" 22:30 - 06:00 ", (1350, 360)),
+    ("00:00-24:00", (0, 1440)),
+])
+def test_parse_window(text, expected):
+    assert parse_window(text) == expected
+
+
+@pytest.mark.parametrize("text", ["8-20", "08:00", "25:00-26:00", "08:60-09:00", "утро"])
+def test_parse_window_rejects_garbage(text):
+    with pytest.raises(ValueError, match="Неверное окно"):
+        parse_window(text)
+
+
+@pytest.mark.parametrize("windows, now, expected", [
+    ((), at(3), -1),
+    (((480, 1200),), at(8), 720),
+    (((480, 1200),), at(19, 59), 1),
+    (((480, 1200),), at(20), None),
+    (((480, 1200),), at(7, 59), None),
+    (((1320, 360),), at(23), 420),   # через полночь: 22:00-06:00
+    (((1320, 360),), at(5), 60),
+    (((1320, 360),), at(6), None),
+    (((480, 600), (1080, 1200)), at(18, 30), 90),
+])
+def test_minutes_left(windows, now, expected):
+    assert minutes_left(windows, now) == expected
+
+
+def config(*models, reserve=0) -> PreloadConfig:
+    return PreloadConfig(models=[PreloadModel(*model) if isinstance(model, tuple) else PreloadModel(model)
+                                 for model in models], reserve=reserve)
+
+
+def test_untagged_config_name_matches_latest_tag():
+    actions = plan(config("nomic-embed-text"), at(12), {"nomic-embed-text:latest": 300}, {}, None)
+
+    assert actions == [("nomic-embed-text:latest", LOAD, -1)]
+
+
+def test_loaded_untagged_model_is_kept_and_unloaded_after_warming():
+    loaded = {"nomic-embed-text:latest": 500}
+    assert plan(config("nomic-embed-text"), at(12), {"nomic-embed-text": 300}, loaded, None) == [
+        ("nomic-embed-text:latest", KEEP, -1)]
+
+    night = config(("nomic-embed-text", None, ((480, 1200),)))
+    assert plan(night, at(22), {}, loaded, None, warmed={"nomic-embed-text"}) == [
+        ("nomic-embed-text:latest", UNLOAD, "вне окна")]
+
+
+def test_model_loaded_by_someone_else_is_not_unloaded():
+    night = config(("llama3:8b", None, ((480, 1200),)))
+
+    assert plan(night, at(22), {"llama3:8b": 4 * GB}, {"llama3:8b": 5 * GB}, None, warmed=set()) == []
+
+
+def test_keep_alive_lasts_until_window_end_unless_set():
+    models = config(("llama3:8b", None, ((480, 1200),)), ("qwen:7b", "2h", ((480, 1200),)))
+
+    actions = plan(models, at(19, 30), {"llama3:8b": GB, "qwen:7b": GB}, {}, None)
+
+    assert actions == [("llama3:8b", LOAD, "30m"), ("qwen:7b", LOAD, "2h")]
+
+
+def test_budget_follows_priority_and_counts_foreign_models():
+    models = config("big:70b", "small:1b", reserve=2 * GB)
+    installed = {"big:70b": 7 * GB, "small:1b": GB}
+
+    # 16 ГБ - 2 резерва - 5 чужой модели = 9: big (8.4 с запасом) помещается, small (ещё 1.2) уже нет
+    actions = plan(models, at(12), installed, {"other:3b": 5 * GB}, 16 * GB)
+    assert actions == [("big:70b", LOAD, -1), ("small:1b", SKIP, "не помещается в память")]
+
+    # Без чужой модели помещаются обе
+    assert [action for name, action, detail in plan(models, at(12), installed, {}, 16 * GB)] == [LOAD, LOAD]
+
+
+def test_loaded_model_is_kept_even_over_budget():
+    actions = plan(config("big:70b"), at(12), {"big:70b": 40 * GB}, {"big:70b": 45 * GB}, 16 * GB)
+
+    assert actions == [("big:70b", KEEP, -1)]
+
+
+def test_missing_model_is_skipped():
+    assert plan(config("absent:1b"), at(12), {}, {}, None) == [("absent:1b", SKIP, "не установлена")]
+
+
+def test_example_config_loads():
+    loaded = load_config("preload.example.json")
+
+    assert [model.name for model in loaded.models] == ["llama3:8b", "qwen2.5:7b", "nomic-embed-text"]
+    assert loaded.models[0].windows == ((480, 1200),)
+    assert loaded.reserve == 2 * GB and loaded.memory_limit is None
@@ -0,0 +1,131 @@
+import json
+
+import pytest
+
+from eva.stats import ResourceHistory, StatsSample, parse_pair, parse_percent, parse_size, parse_stats_line
+
+
+def stats_line(**fields) -> str:
+    data = {"Name": "ollama", "CPUPerc": "12.50%", "MemUsage": "1.5GiB / 15.6GiB",
+            "NetIO": "1.2kB / 648B", "BlockIO": "10.5MB / 0B", "PIDs": "17"}
+    data.update(fields)
+    return json.dumps(data)
+
+
+def sample(time: float, **counters) -> StatsSample:
+    fields = {"cpu": 0.0, "memory": 0, "memory_limit": 0, "net_rx": 0, "net_tx": 0,
+              "block_read": 0, "block_write": 0, "pids": 0}
+    fields.update(counters)
+    return StatsSample(time=time, **fields)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("0B", 0),
+    ("648B", 648),
+    ("1.2kB", 1200),
+    ("1.2KB", 1200),
+    ("10.5MB", 10_500_000),
+    ("2GB", 2_000_000_000),
+    ("512KiB", 512 * 2 ** 10),
+    ("1.5MiB", int(1.5 * 2 ** 20)),
+    ("15.6GiB", int(15.6 * 2 ** 30)),
+    ("1TiB", 2 ** 40),
+    (" 512 MiB ", 512 * 2 ** 20),
+    ("--", 0),
+    ("", 0),
+])
+def test_parse_size(text, expected):
+    assert parse_size(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1.2kB / 648B", (1200, 648)),
+    ("1.5GiB / 15.6GiB", (int(1.5 * 2 ** 30), int(15.6 * 2 ** 30))),
+    ("0B / 0B", (0, 0)),
+    ("-- / --", (0, 0)),
+    ("", (0, 0)),
+])
+def test_parse_pair(text, expected):
+    assert parse_pair(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("12.50%", 12.5),
+    ("250.03%", 250.03),
+    (" 0.00% ", 0.0),
+    ("--", 0.0),
+    ("", 0.0),
+])
+def test_parse_percent(text, expected):
+    assert parse_percent(text) == expected
+
+
+@pytest.mark.parametrize("prefix", [
+    "",
+    "\x1b[2J\x1b[H",     # очистка экрана перед каждой порцией docker stats
+    "\x1b[J\x1b[1;1H",
+    "\x1b[2J\x1b[H\r",
+])
+def test_stats_line_is_parsed_after_ansi_prefix(prefix):
+    service, parsed = parse_stats_line(prefix + stats_line(), now=5.0)
+
+    assert service == "ollama"
+    assert parsed == StatsSample(time=5.0, cpu=12.5, memory=int(1.5 * 2 ** 30), memory_limit=int(15.6 * 2 ** 30),
+                                 net_rx=1200, net_tx=648, block_read=10_500_000, block_write=0, pids=17)
+
+
+@pytest.mark.parametrize("name, service", [
+    ("n8n-postgres", "postgres"),
+    ("/whisper", "whisper"),
+    ("n8n", "n8n"),
+])
+def test_container_name_maps_to_service(name, service):
+    assert parse_stats_line(stats_line(Name=name))[0] == service
+
+
+@pytest.mark.parametrize("line", [
+    stats_line(Name="someone-else"),
+    "",
+    "\x1b[2J\x1b[H",
+    "CONTAINER ID   NAME   CPU %",
+    "{not json",
+])
+def test_foreign_containers_and_garbage_are_skipped(line):
+    assert parse_stats_line(line) is None
+
+
+def test_missing_fields_of_stopping_container_become_zero():
+    service, parsed = parse_stats_line(stats_line(CPUPerc="--", MemUsage="-- / --", PIDs="--"), now=1.0)
+
+    assert (parsed.cpu, parsed.memory, parsed.memory_limit, parsed.pids) == (0.0, 0, 0, 0)
+
+
+@pytest.mark.parametrize("samples, expected", [
+    ([], 0.0),
+    ([sample(1.0, net_rx=100)], 0.0),
+    ([sample(1.0, net_rx=100), sample(3.0, net_rx=2100)], 1000.0),
+    ([sample(1.0, net_rx=0), sample(2.0, net_rx=500), sample(2.5, net_rx=1500)], 2000.0),
+    # Счётчик обнулился при перезапуске контейнера
+    ([sample(1.0, net_rx=5000), sample(2.0, net_rx=100)], 0.0),
+    # Два сэмпла с одинаковым временем
+    ([sample(1.0, net_rx=0), sample(1.0, net_rx=100)], 0.0),
+])
+def test_rate_uses_last_interval(samples, expected):
+    history = ResourceHistory()
+    for item in samples:
+        history.append("ollama", item)
+
+    assert history.rate("ollama", "net_rx") == expected
+    assert history.rate("n8n", "net_rx") == 0.0
+
+
+def test_history_is_bounded_and_forgettable():
+    history = ResourceHistory(size=3)
+    for index in range(5):
+        history.append("ollama", sample(float(index), cpu=float(index)))
+
+    assert history.series("ollama", "cpu") == [2.0, 3.0, 4.0]
+    assert history.latest("ollama").time == 4.0
+
+    history.forget("ollama")
+    assert history.latest("ollama") is None and history.series("ollama", "cpu") == []
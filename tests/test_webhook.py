@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from transcriber.webhook import WebhookNotifier
+
+
+class ReceiverHandler(BaseHTTPRequestHandler):
+    """
+    Заглушка вебхука n8n: отвечает кодами из server.statuses по очереди, потом 200.
+    """
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        event = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            status = self.server.statuses.pop(0) if self.server.statuses else 200
+            self.server.attempts.append((event["file"], status, time.monotonic()))
+            if status == 200:
+                self.server.received.append(event)
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+@pytest.fixture
+def receiver():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ReceiverHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.statuses = []
+    server.attempts = []
+    server.received = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/webhook/transcription"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "условие не выполнилось вовремя"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def notifiers():
+    started = []
+    yield started
+    for notifier in started:
+        notifier.stop()
+
+
+def test_events_are_delivered_in_order(receiver, notifiers):
+    notifier = WebhookNotifier(receiver.url, retry_min=0.05)
+    notifiers.append(notifier)
+    notifier.start()
+
+    for name in ("a.mp3", "b.mp3", "c.mp3"):
+        notifier.notify({"file": name})
+
+    wait_for(lambda: notifier.stats()["sent"] == 3)
+    assert [event["file"] for event in receiver.received] == ["a.mp3", "b.mp3", "c.mp3"]
+    assert notifier.stats()["pending"] == 0
+
+
+def test_server_errors_are_retried_with_backoff(receiver, notifiers):
+    receiver.statuses = [503, 429, 408]
+    notifier = WebhookNotifier(receiver.url, retry_min=0.1, retry_max=0.2)
+    notifiers.append(notifier)
+    notifier.start()
+
+    notifier.notify({"file": "a.mp3"})
+
+    wait_for(lambda: notifier.stats()["sent"] == 1)
+    times = [at for name, status, at in receiver.attempts]
+    assert [status for name, status, at in receiver.attempts] == [503, 429, 408, 200]
+    # 0.1, затем 0.2 и потолок retry_max 0.2
+    assert times[1] - times[0] >= 0.1 and times[2] - times[1] >= 0.2 and times[3] - times[2] >= 0.2
+    assert notifier.stats()["last_error"] is None
+
+
+def test_new_events_do_not_cut_backoff_short(receiver, notifiers):
+    receiver.statuses = [503]
+    notifier = WebhookNotifier(receiver.url, retry_min=0.5)
+    notifiers.append(notifier)
+    notifier.start()
+
+    notifier.notify({"file": "a.mp3"})
+    wait_for(lambda: receiver.attempts)
+    for index in range(5):
+        notifier.notify({"file": f"extra{index}.mp3"})
+
+    wait_for(lambda: len(receiver.attempts) >= 2)
+    assert receiver.attempts[1][2] - receiver.attempts[0][2] >= 0.5
+
+
+def test_client_error_is_dropped_without_retry(receiver, notifiers):
+    receiver.statuses = [400]
+    notifier = WebhookNotifier(receiver.url, retry_min=5.0)
+    notifiers.append(notifier)
+    notifier.start()
+
+    notifier.notify({"file": "bad.mp3"})
+    notifier.notify({"file": "good.mp3"})
+
+    wait_for(lambda: notifier.stats()["sent"] == 1)
+    assert [(name, status) for name, status, at in receiver.attempts] == [("bad.mp3", 400), ("good.mp3", 200)]
+    assert notifier.stats()["rejected"] == 1
+
+
+def test_overflow_drops_oldest_events(receiver):
+    notifier = WebhookNotifier(receiver.url, max_queue=2)  # поток не запущен — всё копится в очереди
+
+    for name in ("a.mp3", "b.mp3", "c.mp3"):
+        notifier.notify({"file": name})
+
+    assert [event["file"] for event in notifier.pending] == ["b.mp3", "c.mp3"]
+    assert notifier.stats()["dropped"] == 1
+
+
+def test_spool_is_replayed_after_restart(receiver, tmp_path, notifiers):
+    spool = str(tmp_path / "status" / "webhook-queue.json")
+    offline = WebhookNotifier("http://127.0.0.1:9/unreachable", spool_file=spool)
+    offline.notify({"file": "a.mp3"})
+    offline.notify({"file": "b.mp3"})
+    with open(spool, encoding="utf-8") as f:
+        assert [event["file"] for event in json.load(f)] == ["a.mp3", "b.mp3"]
+
+    restarted = WebhookNotifier(receiver.url, spool_file=spool)
+    notifiers.append(restarted)
+    restarted.start()
+
+    wait_for(lambda: restarted.stats()["sent"] == 2)
+    assert [event["file"] for event in receiver.received] == ["a.mp3", "b.mp3"]
+    with open(spool, encoding="utf-8") as f:
+        assert json.load(f) == []
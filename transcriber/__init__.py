@@ -0,0 +1,4 @@
+"""
+Сервис транскрибации для контейнера whisper: модель загружается один раз,
+новые файлы в папке audio обнаруживаются через inotify.
+"""
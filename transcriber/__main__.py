@@ -0,0 +1,121 @@
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+
+from transcriber.backends import BACKENDS, BackendSettings
+from transcriber.cache import TranscriptCache
+from transcriber.claims import ClaimStore
+from transcriber.index import TranscriptIndex, serve_search
+from transcriber.service import ORDERS, PRIORITY_DIR, TranscriptionService
+from transcriber.supervisor import WorkerSupervisor
+from transcriber.webhook import WebhookNotifier
+
+
+def worker_file(path: str, worker_id: str) -> str:
+    # Несколько обработчиков в одной папке .transcriber: свой status/trace/очередь вебхука у каждого
+    if not path or not worker_id:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}-{worker_id}{ext}"
+
+
+def main(argv=None):
+    env = os.environ.get
+    parser = argparse.ArgumentParser(prog="python -m transcriber",
+                                     description="Транскрибация файлов из папки audio моделью whisper или faster-whisper")
+    parser.add_argument("--audio-dir", default=env("AUDIO_DIR", "/home/node/audio"))
+    parser.add_argument("--output-dir", default=env("TRANSCRIPTIONS_DIR", "/transcriptions"))
+    parser.add_argument("--backend", choices=BACKENDS, default=env("WHISPER_BACKEND", "whisper"),
+                        help="openai-whisper или faster-whisper (CTranslate2, int8 на CPU)")
+    parser.add_argument("--model", default=env("WHISPER_MODEL", "medium"),
+                        help="размер модели: tiny, base, small, medium, large-v3...")
+    parser.add_argument("--threads", type=int, default=int(env("WHISPER_THREADS", "0")),
+                        help="потоков CPU на процесс; 0 — по умолчанию движка (при --workers > 1 — ядра поровну)")
+    parser.add_argument("--beam-size", type=int, default=int(env("WHISPER_BEAM_SIZE", "0")),
+                        help="ширина beam search; 0 — по умолчанию движка, 1 — жадный поиск (быстрее)")
+    parser.add_argument("--compute-type", default=env("WHISPER_COMPUTE_TYPE", "int8"),
+                        help="квантование весов faster-whisper: int8, int8_float32, float32")
+    parser.add_argument("--language", default=env("WHISPER_LANGUAGE", "Russian"))
+    parser.add_argument("--output-format", default=env("WHISPER_OUTPUT_FORMAT", "txt"),
+                        help="форматы итоговых файлов через запятую (txt,srt,vtt,tsv,json), all или none")
+    parser.add_argument("--status-file", default=env("TRANSCRIBER_STATUS_FILE", "/transcriptions/.transcriber/status.json"))
+    parser.add_argument("--workers", default=env("WHISPER_WORKERS", "1"),
+                        help="число процессов распознавания или auto (по ядрам CPU)")
+    parser.add_argument("--chunk-seconds", type=float, default=float(env("WHISPER_CHUNK_SECONDS", "60")),
+                        help="длина фрагмента длинной записи; 0 — не резать")
+    parser.add_argument("--chunk-overlap", type=float, default=float(env("WHISPER_CHUNK_OVERLAP", "1.0")))
+    parser.add_argument("--cache-dir", default=env("TRANSCRIBER_CACHE_DIR", "/transcriptions/.transcriber/cache"),
+                        help="кэш результатов по хэшу содержимого; пустая строка — без кэша")
+    parser.add_argument("--cache-max-mb", type=int, default=int(env("TRANSCRIBER_CACHE_MAX_MB", "500")))
+    parser.add_argument("--index", default=env("TRANSCRIBER_INDEX", "/transcriptions/.transcriber/index.sqlite"),
+                        help="полнотекстовый индекс транскрипций (SQLite); пустая строка — без индекса")
+    parser.add_argument("--search-port", type=int, default=int(env("TRANSCRIBER_SEARCH_PORT", "0")),
+                        help="порт HTTP-поиска по индексу для n8n; 0 — выключен")
+    parser.add_argument("--webhook-url", default=env("TRANSCRIBER_WEBHOOK_URL", ""),
+                        help="вебхук n8n для событий о готовых транскрипциях; пустая строка — только папка")
+    parser.add_argument("--webhook-queue", type=int, default=int(env("TRANSCRIBER_WEBHOOK_QUEUE", "200")),
+                        help="сколько недоставленных событий держать, пока n8n недоступен")
+    parser.add_argument("--worker-id", default=env("TRANSCRIBER_WORKER_ID", ""),
+                        help="имя обработчика при нескольких на одну папку audio; пусто — hostname-pid")
+    parser.add_argument("--inbox-workers", type=int, default=int(env("TRANSCRIBER_INBOX_WORKERS", "1")),
+                        help="сколько обработчиков папки audio запустить в этом контейнере (каждый со своей моделью)")
+    parser.add_argument("--order", choices=ORDERS, default=env("TRANSCRIBER_ORDER", "oldest"),
+                        help="порядок разбора очереди; файлы из подпапки --priority-dir всегда первыми")
+    parser.add_argument("--priority-dir", default=env("TRANSCRIBER_PRIORITY_DIR", PRIORITY_DIR),
+                        help="подпапка audio для срочных файлов; пустая строка — без неё")
+    parser.add_argument("--claim-stale-seconds", type=float, default=float(env("TRANSCRIBER_CLAIM_STALE_SECONDS", "120")),
+                        help="через сколько секунд без heartbeat файлы упавшего обработчика возвращаются в очередь")
+    parser.add_argument("--rescan-interval", type=float, default=float(env("TRANSCRIBER_RESCAN_INTERVAL", "5")),
+                        help="секунд между проверками папки audio на файлы, о которых inotify не сообщил")
+    args = parser.parse_args(argv)
+    if args.inbox_workers > 1:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+        supervisor = WorkerSupervisor(sys.argv[1:] if argv is None else argv, args.inbox_workers, args.worker_id)
+        signal.signal(signal.SIGTERM, lambda signum, frame: supervisor.stop())
+        signal.signal(signal.SIGINT, lambda signum, frame: supervisor.stop())
+        sys.exit(supervisor.run())
+    status_file = worker_file(args.status_file, args.worker_id)
+
+    workers = (os.cpu_count() or 1) if args.workers == "auto" else int(args.workers)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    cache = TranscriptCache(args.cache_dir, args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+    notifier = None
+    if args.webhook_url:
+        spool = (worker_file(os.path.join(os.path.dirname(args.status_file), "webhook-queue.json"), args.worker_id)
+                 if args.status_file else None)
+        notifier = WebhookNotifier(args.webhook_url, max_queue=args.webhook_queue, spool_file=spool)
+    index = TranscriptIndex(args.index) if args.index else None
+    if index is not None:
+        # Транскрипции, записанные до появления индекса, добираются в фоне
+        threading.Thread(target=index.backfill, args=(args.output_dir,), name="transcriber-backfill",
+                         daemon=True).start()
+        if args.search_port:
+            try:
+                serve_search(index, args.search_port)
+            except OSError as e:  # порт уже занят соседним обработчиком в том же контейнере
+                logging.getLogger("transcriber").warning("Search port %d unavailable: %s", args.search_port, e)
+    service = TranscriptionService(
+        args.audio_dir, args.output_dir, model_name=args.model, language=args.language or None,
+        output_format=args.output_format, status_file=status_file or None,
+        rescan_interval=args.rescan_interval, workers=workers,
+        chunk_seconds=args.chunk_seconds, chunk_overlap=args.chunk_overlap, cache=cache,
+        notifier=notifier, index=index,
+        trace_file=(worker_file(os.path.join(os.path.dirname(args.status_file), "trace.jsonl"), args.worker_id)
+                    if args.status_file else None),
+        settings=BackendSettings(args.backend, args.model, args.threads, args.beam_size, args.compute_type),
+        claims=ClaimStore(args.audio_dir, args.worker_id or None, args.claim_stale_seconds),
+        order=args.order, priority_dir=args.priority_dir or None,
+    )
+    # docker stop шлёт SIGTERM — дорабатываем текущий файл не начиная следующий
+    signal.signal(signal.SIGTERM, lambda signum, frame: service.stop())
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import logging
+import os
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+log = logging.getLogger("transcriber")
+
+WHISPER = "whisper"
+FASTER_WHISPER = "faster-whisper"
+BACKENDS = (WHISPER, FASTER_WHISPER)
+
+SAMPLE_RATE = 16000
+
+# Названия языков, как их принимает whisper (--language Russian), → коды для faster-whisper
+LANGUAGE_CODES = {
+    "russian": "ru", "english": "en", "ukrainian": "uk", "belarusian": "be", "kazakh": "kk",
+    "german": "de", "french": "fr", "spanish": "es", "italian": "it", "chinese": "zh",
+}
+
+
+class BackendSettings(NamedTuple):
+    """
+    Что и как распознаёт: движок, размер модели, потоки CPU (0 — по умолчанию движка),
+    ширина beam search (0 — по умолчанию движка), квантование весов (только faster-whisper).
+    """
+    backend: str = WHISPER
+    model: str = "medium"
+    threads: int = 0
+    beam_size: int = 0
+    compute_type: str = "int8"
+
+    def label(self) -> str:
+        parts = [self.backend, self.model]
+        if self.backend == FASTER_WHISPER:
+            parts.append(self.compute_type)
+        parts.append(f"t{self.threads or 'auto'}")
+        parts.append(f"b{self.beam_size or 'default'}")
+        return ":".join(parts)
+
+
+def language_code(language: Optional[str]) -> Optional[str]:
+    if not language:
+        return None
+    language = language.lower()
+    try:
+        from whisper.tokenizer import TO_LANGUAGE_CODE
+        return TO_LANGUAGE_CODE.get(language, language)
+    except ImportError:
+        return LANGUAGE_CODES.get(language, language)
+
+
+class WhisperBackend:
+    """
+    Эталонный openai-whisper (PyTorch): fp16 на GPU, fp32 на CPU.
+    """
+    def __init__(self, settings: BackendSettings, language: Optional[str]):
+        self.settings = settings
+        self.language = language_code(language)
+        self.model = None
+        self.options: dict = {}
+
+    def load(self):
+        import torch
+        import whisper
+
+        if self.settings.threads:
+            torch.set_num_threads(self.settings.threads)
+        self.model = whisper.load_model(self.settings.model)
+        fp16 = getattr(getattr(self.model, "device", None), "type", "cpu") == "cuda"
+        self.options = {"language": self.language, "fp16": fp16}
+        if self.settings.beam_size:
+            self.options["beam_size"] = self.settings.beam_size
+
+    def transcribe(self, audio: np.ndarray) -> dict:
+        return self.model.transcribe(audio, **self.options)
+
+
+class FasterWhisperBackend:
+    """
+    faster-whisper (CTranslate2): квантованные int8 веса и оптимизированные ядра CPU —
+    на машинах без GPU в разы быстрее openai-whisper при той же модели.
+    """
+    def __init__(self, settings: BackendSettings, language: Optional[str]):
+        self.settings = settings
+        self.language = language_code(language)
+        self.model = None
+
+    def load(self):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(self.settings.model, device="cpu", compute_type=self.settings.compute_type,
+                                  cpu_threads=self.settings.threads)
+
+    def transcribe(self, audio: np.ndarray) -> dict:
+        options = {"language": self.language}
+        if self.settings.beam_size:
+            options["beam_size"] = self.settings.beam_size
+        segments, info = self.model.transcribe(audio, **options)
+        # Генератор: распознавание идёт по мере чтения сегментов
+        result_segments = [{"id": index, "start": segment.start, "end": segment.end, "text": segment.text}
+                           for index, segment in enumerate(segments)]
+        return {
+            "text": "".join(segment["text"] for segment in result_segments),
+            "segments": result_segments,
+            "language": info.language,
+        }
+
+
+def create_backend(settings: BackendSettings, language: Optional[str]):
+    """
+    Движок по настройкам. Если faster-whisper в образе не установлен, откатываемся
+    на openai-whisper с предупреждением, чтобы контейнер не уходил в цикл перезапусков.
+    """
+    if settings.backend not in BACKENDS:
+        raise ValueError(f"unknown backend {settings.backend!r}, expected one of: {', '.join(BACKENDS)}")
+    if settings.backend == FASTER_WHISPER:
+        try:
+            import faster_whisper  # noqa: F401
+            return FasterWhisperBackend(settings, language)
+        except ImportError:
+            log.warning("faster-whisper is not installed in this image, falling back to openai-whisper")
+            settings = settings._replace(backend=WHISPER)
+    return WhisperBackend(settings, language)
+
+
+def load_audio(path: str) -> np.ndarray:
+    """
+    Моно 16 кГц float32 через ffmpeg — загрузчиком того движка, который установлен.
+    """
+    try:
+        from whisper.audio import load_audio as whisper_load_audio
+    except ImportError:
+        from faster_whisper import decode_audio
+        return decode_audio(path, sampling_rate=SAMPLE_RATE)
+    return whisper_load_audio(path)
+
+
+def default_threads(workers: int) -> int:
+    # Ядра делятся между процессами пула поровну
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
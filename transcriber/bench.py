@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import List, Optional
+
+from transcriber.backends import BACKENDS, FASTER_WHISPER, SAMPLE_RATE, BackendSettings, create_backend, load_audio
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    WER по словам (без регистра и пунктуации, ё = е): расстояние Левенштейна / число слов эталона.
+    """
+    def words(text):
+        return WORD.findall(text.lower().replace("ё", "е"))
+
+    ref, hyp = words(reference), words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def parse_configs(backends: str, models: str, threads: str, beams: str, compute_types: str) -> List[BackendSettings]:
+    """
+    Декартово произведение списков через запятую; compute_type перебирается только для faster-whisper.
+    """
+    def split(value, cast=str):
+        return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+    configs = []
+    for backend in split(backends):
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown backend: {backend}")
+        for model in split(models):
+            for thread_count in split(threads, int):
+                for beam in split(beams, int):
+                    types = split(compute_types) if backend == FASTER_WHISPER else ["-"]
+                    for compute_type in types:
+                        configs.append(BackendSettings(backend, model, thread_count, beam,
+                                                       compute_type if compute_type != "-" else "int8"))
+    return configs
+
+
+def run_config(settings: BackendSettings, audio, language: Optional[str], repeats: int,
+               reference: Optional[str]) -> dict:
+    """
+    Загрузка модели, прогрев и repeats замеров распознавания; RTF = время распознавания / длительность записи
+    (меньше 1 — быстрее реального времени).
+    """
+    duration = len(audio) / SAMPLE_RATE
+    started = time.perf_counter()
+    backend = create_backend(settings, language)
+    backend.load()
+    load_seconds = time.perf_counter() - started
+    if backend.settings.backend != settings.backend:
+        return {"config": settings.label(), "error": f"{settings.backend} не установлен"}
+    # Прогрев на первых секундах: первый вызов платит за инициализацию ядер
+    backend.transcribe(audio[:SAMPLE_RATE * 5])
+    timings = []
+    result = None
+    for _ in range(max(1, repeats)):
+        started = time.perf_counter()
+        result = backend.transcribe(audio)
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    row = {
+        "config": settings.label(),
+        "settings": settings._asdict(),
+        "load_seconds": round(load_seconds, 2),
+        "transcribe_seconds": round(best, 2),
+        "rtf": round(best / duration, 3) if duration else None,
+        "text": result["text"].strip(),
+    }
+    if reference is not None:
+        row["wer"] = round(word_error_rate(reference, result["text"]), 3)
+    return row
+
+
+def format_table(report: dict) -> str:
+    lines = [f"Запись: {report['clip']} ({report['clip_seconds']:.1f} с), CPU: {report['cpu_count']}",
+             f"{'конфигурация':<42} {'загрузка':>9} {'распозн.':>9} {'RTF':>6} {'WER':>6}"]
+    for row in sorted(report["results"], key=lambda row: float("inf") if row.get("rtf") is None else row["rtf"]):
+        if "error" in row:
+            lines.append(f"{row['config']:<42} ❌ {row['error']}")
+            continue
+        wer = f"{row['wer']:.3f}" if "wer" in row else "—"
+        lines.append(f"{row['config']:<42} {row['load_seconds']:>8.1f}с {row['transcribe_seconds']:>8.1f}с "
+                     f"{row['rtf']:>6.3f} {wer:>6}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m transcriber.bench",
+        description="Скорость (RTF) и точность (WER) движков распознавания на образце записи")
+    parser.add_argument("clip", help="образец аудио (лучше 30–120 с типичной речи)")
+    parser.add_argument("--reference", default=None, help="файл с эталонной расшифровкой для WER")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--models", default="small,medium")
+    parser.add_argument("--threads", default=str(os.cpu_count() or 1), help="через запятую, например 4,8")
+    parser.add_argument("--beams", default="1,5")
+    parser.add_argument("--compute-types", default="int8")
+    parser.add_argument("--language", default=os.environ.get("WHISPER_LANGUAGE", "Russian"))
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--out", default=None, help="JSON-отчёт (по умолчанию только таблица)")
+    args = parser.parse_args(argv)
+
+    try:
+        configs = parse_configs(args.backends, args.models, args.threads, args.beams, args.compute_types)
+    except ValueError as e:
+        parser.error(str(e))
+    reference = None
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as f:
+            reference = f.read()
+    audio = load_audio(args.clip)
+    report = {
+        "clip": os.path.basename(args.clip),
+        "clip_seconds": round(len(audio) / SAMPLE_RATE, 2),
+        "cpu_count": os.cpu_count(),
+        "started_at": time.time(),
+        "results": [],
+    }
+    for settings in configs:
+        print(f"⏳ {settings.label()}...", file=sys.stderr, flush=True)
+        try:
+            report["results"].append(run_config(settings, audio, args.language, args.repeats, reference))
+        except Exception as e:  # одна неудачная конфигурация (нет модели, мало памяти) не должна прерывать остальные
+            report["results"].append({"config": settings.label(), "error": str(e)})
+    print(format_table(report))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+log = logging.getLogger("transcriber")
+
+HASH_BLOCK = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(audio_digest: str, settings: dict) -> str:
+    """
+    Ключ кэша: содержимое аудио плюс всё, что влияет на результат (модель, язык, форматы...).
+    """
+    payload = json.dumps(settings, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{audio_digest}\n{payload}".encode()).hexdigest()
+
+
+class TranscriptCache:
+    """
+    Кэш результатов model.transcribe() на диске: <ключ>.json в directory.
+
+    Повторно брошенная в папку запись (ретрай n8n, пересланное голосовое)
+    не распознаётся заново — итоговые файлы пишутся из кэша. Объём ограничен
+    max_bytes, вытесняются давно не использованные записи (LRU по mtime,
+    который обновляется при попадании).
+
+    Папку могут делить несколько обработчиков: перед вытеснением размеры
+    перечитываются с диска, так что общий лимит max_bytes соблюдается
+    с учётом записей соседей, а их записи находятся по get().
+    """
+    def __init__(self, directory: str, max_bytes: int = 500 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # ключ → размер, от старых к новым
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._rescan()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _rescan(self):
+        self._entries.clear()
+        self._size = 0
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # вытеснил соседний обработчик
+                    continue
+                entries.append((stat.st_mtime, entry.name[:-len(".json")], stat.st_size))
+        for mtime, key, size in sorted(entries):
+            self._entries[key] = size
+            self._size += size
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    result = json.load(f)
+                os.utime(path)
+            except FileNotFoundError:
+                # Нет записи или её вытеснил соседний обработчик
+                self._size -= self._entries.pop(key, 0)
+                self.misses += 1
+                return None
+            except (OSError, ValueError) as e:
+                log.warning("Dropping broken cache entry %s: %s", key, e)
+                self._drop(key)
+                self.misses += 1
+                return None
+            if key not in self._entries:  # записал соседний обработчик
+                self._entries[key] = size
+                self._size += size
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: str, result: dict):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with self._lock:
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(result, f, ensure_ascii=False)
+                os.replace(tmp, path)
+            except (OSError, TypeError, ValueError) as e:  # TypeError/ValueError — результат не сериализуется в JSON
+                log.warning("Cannot store cache entry %s: %s", key, e)
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                return
+            # Соседние обработчики тоже пишут в эту папку — лимит считаем по тому, что на диске
+            self._rescan()
+            self._evict()
+
+    def _drop(self, key: str):
+        self._size -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            self._drop(key)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
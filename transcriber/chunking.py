@@ -0,0 +1,177 @@
+import os
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000  # whisper.audio.SAMPLE_RATE
+
+# Анализ энергии: кадры по 30 мс, сглаживание по 0.3 с
+FRAME_SECONDS = 0.03
+SMOOTH_FRAMES = 10
+
+
+class Chunk(NamedTuple):
+    """
+    Фрагмент записи в отсчётах. [start, end) — то, что отдаётся модели (с перекрытием),
+    [core_start, core_end) — за какие сегменты этот фрагмент отвечает при склейке.
+    """
+    index: int
+    start: int
+    end: int
+    core_start: int
+    core_end: int
+
+    @property
+    def offset(self) -> float:
+        return self.start / SAMPLE_RATE
+
+
+def frame_energy(audio: np.ndarray) -> np.ndarray:
+    frame = int(SAMPLE_RATE * FRAME_SECONDS)
+    count = len(audio) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:count * frame].reshape(count, frame)
+    energy = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+    kernel = np.ones(SMOOTH_FRAMES, dtype=np.float32) / SMOOTH_FRAMES
+    return np.convolve(energy, kernel, mode="same")
+
+
+def split_points(audio: np.ndarray, target_seconds: float) -> List[int]:
+    """
+    Границы фрагментов (в отсчётах) длиной около target_seconds, каждая — в самом
+    тихом месте окна [0.75; 1.25] × target_seconds от предыдущей границы, чтобы
+    не резать слова посередине.
+    """
+    energy = frame_energy(audio)
+    frame = int(SAMPLE_RATE * FRAME_SECONDS)
+    target = int(target_seconds / FRAME_SECONDS)
+    lo, hi = int(target * 0.75), int(target * 1.25)
+    points = []
+    position = 0
+    while len(energy) - position > hi:
+        window = energy[position + lo:position + hi]
+        position += lo + int(np.argmin(window))
+        points.append(position * frame)
+    return points
+
+
+def make_chunks(audio: np.ndarray, target_seconds: float = 60.0, overlap_seconds: float = 1.0) -> List[Chunk]:
+    bounds = [0] + split_points(audio, target_seconds) + [len(audio)]
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    chunks = []
+    for index, (core_start, core_end) in enumerate(zip(bounds, bounds[1:])):
+        chunks.append(Chunk(index, max(0, core_start - overlap), min(len(audio), core_end + overlap),
+                            core_start, core_end))
+    return chunks
+
+
+def shift_segments(result: dict, chunk: Chunk) -> List[dict]:
+    """
+    Переводит сегменты фрагмента во время всей записи и отбрасывает те, что
+    начинаются в перекрытии (их отдаст соседний фрагмент).
+    """
+    offset = chunk.offset
+    core_start = chunk.core_start / SAMPLE_RATE
+    core_end = chunk.core_end / SAMPLE_RATE
+    segments = []
+    for segment in result.get("segments", []):
+        start = segment["start"] + offset
+        if not core_start <= start < core_end:
+            continue
+        shifted = dict(segment)
+        shifted["start"] = start
+        shifted["end"] = segment["end"] + offset
+        if "words" in segment:
+            shifted["words"] = [dict(word, start=word["start"] + offset, end=word["end"] + offset)
+                                for word in segment["words"]]
+        segments.append(shifted)
+    return segments
+
+
+def merge_results(chunk_segments: List[List[dict]], language: Optional[str]) -> dict:
+    """
+    Склеивает сегменты фрагментов (по порядку) в результат в формате model.transcribe().
+    """
+    segments = []
+    for part in chunk_segments:
+        for segment in part:
+            segment = dict(segment, id=len(segments))
+            segments.append(segment)
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": language,
+    }
+
+
+def format_timestamp(seconds: float, separator: str = ".") -> str:
+    """
+    ЧЧ:ММ:СС.ммм; separator="," — вариант SRT.
+    """
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+class PartialTranscript:
+    """
+    Файл <имя>.partial.txt, в который готовые сегменты дописываются по порядку,
+    не дожидаясь конца всей записи. После записи итоговых файлов удаляется.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        open(path, "w", encoding="utf-8").close()
+
+    def append(self, segments: List[dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for segment in segments:
+                f.write(f"[{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}] "
+                        f"{segment['text'].strip()}\n")
+
+
+class InOrderEmitter:
+    """
+    Фрагменты завершаются в любом порядке, а в частичный транскрипт попадают строго по порядку.
+    """
+    def __init__(self, callback: Callable[[List[dict]], None]):
+        self.callback = callback
+        self.ready: Dict[int, List[dict]] = {}
+        self.next_index = 0
+
+    def add(self, index: int, segments: List[dict]):
+        self.ready[index] = segments
+        while self.next_index in self.ready:
+            self.callback(self.ready[self.next_index])
+            self.next_index += 1
+
+
+# --- рабочие процессы пула ---
+
+_worker_backend = None
+
+
+def init_worker(settings, language: Optional[str]):
+    """
+    Инициализатор процесса пула: модель загружается один раз на процесс.
+    Число потоков (settings.threads) ограничено, чтобы процессы не делили ядра друг у друга.
+    """
+    global _worker_backend
+    from transcriber.backends import create_backend
+
+    _worker_backend = create_backend(settings, language)
+    _worker_backend.load()
+
+
+def worker_backend(_=None) -> str:
+    """
+    Движок, который процесс пула загрузил на самом деле (после отката faster-whisper → whisper).
+    """
+    return _worker_backend.settings.backend
+
+
+def transcribe_chunk(audio: np.ndarray) -> dict:
+    return _worker_backend.transcribe(audio)
@@ -0,0 +1,132 @@
+import logging
+import os
+import shutil
+import socket
+import time
+from typing import List, Optional
+
+log = logging.getLogger("transcriber")
+
+CLAIMS_DIR = ".claims"
+HEARTBEAT = ".heartbeat"
+
+
+def default_worker_id() -> str:
+    # В контейнере hostname — id контейнера, pid различает процессы внутри одного контейнера
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ClaimStore:
+    """
+    Захват файлов из общей папки audio несколькими обработчиками (процессами или контейнерами).
+
+    Файл захватывается атомарным os.rename в audio/.claims/<worker_id>/ — из нескольких
+    одновременных попыток удаётся ровно одна, остальные получают FileNotFoundError
+    и пропускают файл. Обработчик раз в heartbeat_interval обновляет mtime файла
+    .heartbeat в своей папке; папку, чей .heartbeat старше stale_seconds (обработчик
+    упал или контейнер убит), любой живой обработчик возвращает обратно в audio/.
+
+    Папки захвата лежат на том же томе, что и audio, иначе rename не атомарен.
+    """
+    def __init__(self, audio_dir: str, worker_id: Optional[str] = None, stale_seconds: float = 120.0):
+        self.audio_dir = audio_dir
+        self.worker_id = worker_id or default_worker_id()
+        self.stale_seconds = stale_seconds
+        self.root = os.path.join(audio_dir, CLAIMS_DIR)
+        self.own_dir = os.path.join(self.root, self.worker_id)
+
+    @property
+    def heartbeat_interval(self) -> float:
+        return max(1.0, self.stale_seconds / 4)
+
+    def heartbeat(self):
+        os.makedirs(self.own_dir, exist_ok=True)
+        beat = os.path.join(self.own_dir, HEARTBEAT)
+        with open(beat, "a", encoding="utf-8"):
+            pass
+        os.utime(beat)
+
+    def claim(self, path: str) -> Optional[str]:
+        """
+        Путь захваченного файла или None, если его уже забрал другой обработчик (или удалили).
+        Подпапка (priority/) сохраняется, чтобы при возврате файл попал туда же.
+        """
+        relative = os.path.relpath(path, self.audio_dir)
+        target = os.path.join(self.own_dir, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.rename(path, target)
+        except FileNotFoundError:
+            return None
+        return target
+
+    def claimed(self, worker_dir: Optional[str] = None) -> List[str]:
+        worker_dir = worker_dir or self.own_dir
+        paths = []
+        for folder, _, names in os.walk(worker_dir):
+            paths.extend(os.path.join(folder, name) for name in names if name != HEARTBEAT)
+        return paths
+
+    def _last_beat(self, worker_dir: str) -> float:
+        for path in (os.path.join(worker_dir, HEARTBEAT), worker_dir):
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                continue
+        return time.time()
+
+    def release(self, worker_dir: str) -> int:
+        """
+        Возвращает незавершённые файлы папки захвата в audio/ и удаляет папку.
+        """
+        returned = 0
+        for path in self.claimed(worker_dir):
+            target = os.path.join(self.audio_dir, os.path.relpath(path, worker_dir))
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.rename(path, target)
+                returned += 1
+            except FileNotFoundError:
+                continue  # тот же файл уже вернул другой обработчик
+            except OSError as e:
+                log.warning("Cannot return claimed %s: %s", path, e)
+        shutil.rmtree(worker_dir, ignore_errors=True)
+        return returned
+
+    def recover_stale(self) -> int:
+        """
+        Возвращает в очередь файлы обработчиков, переставших обновлять .heartbeat.
+        """
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return 0
+        returned = 0
+        now = time.time()
+        for name in names:
+            worker_dir = os.path.join(self.root, name)
+            if name == self.worker_id or not os.path.isdir(worker_dir):
+                continue
+            if now - self._last_beat(worker_dir) < self.stale_seconds:
+                continue
+            count = self.release(worker_dir)
+            if count:
+                log.warning("Recovered %d file(s) from stale worker %s", count, name)
+            returned += count
+        return returned
+
+    def recover_own(self) -> int:
+        """
+        При старте с постоянным worker_id: файлы, захваченные до падения этим же обработчиком.
+        """
+        if not os.path.isdir(self.own_dir):
+            return 0
+        count = self.release(self.own_dir)
+        if count:
+            log.warning("Returned %d file(s) left claimed by previous run of %s", count, self.worker_id)
+        return count
+
+    def close(self):
+        # Пустая папка больше не нужна; незавершённый файл (если есть) подберёт recover_stale
+        if not self.claimed():
+            shutil.rmtree(self.own_dir, ignore_errors=True)
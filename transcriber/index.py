@@ -0,0 +1,311 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+log = logging.getLogger("transcriber")
+
+DEFAULT_LIMIT = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL UNIQUE,
+    digest TEXT,
+    language TEXT,
+    duration REAL,
+    source TEXT,
+    text TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    transcript_id INTEGER NOT NULL REFERENCES transcripts(id) ON DELETE CASCADE,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    text TEXT NOT NULL,
+    search_text TEXT NOT NULL  -- normalize(text): по нему строится FTS, text остаётся для показа
+);
+CREATE INDEX IF NOT EXISTS segments_transcript ON segments(transcript_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    search_text, content='segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, search_text) VALUES (new.id, new.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts(segments_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+END;
+"""
+
+# Метки snippet(): управляющие символы не встречаются в тексте, поэтому их места однозначны
+SNIPPET_MARKS = {"\x02": "[", "\x03": "]", "\x01": "…"}
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_query(text: str) -> str:
+    """
+    Обычный текст → запрос FTS5: все слова должны встретиться, каждое как префикс
+    ("привет мир" → "привет"* "мир"*). Кавычки и операторы пользователя не ломают запрос.
+    ё приравнивается к е — так же, как при индексации.
+    """
+    return " ".join(f'"{word}"*' for word in WORD.findall(normalize(text)))
+
+
+def normalize(text: str) -> str:
+    # unicode61 снимает диакритику только с латиницы; длина строки не меняется
+    return text.replace("ё", "е").replace("Ё", "Е")
+
+
+def display_snippet(snippet: str, text: str, search_text: str) -> str:
+    """
+    snippet() строится по search_text (ё → е); переносит метки на исходный text.
+    Позиции в обоих совпадают, так как normalize не меняет длину.
+    """
+    fragment = "".join(char for char in snippet if char not in SNIPPET_MARKS)
+    position = search_text.find(fragment)
+    if position < 0:
+        return text
+    parts = []
+    for char in snippet:
+        if char in SNIPPET_MARKS:
+            parts.append(SNIPPET_MARKS[char])
+        else:
+            parts.append(text[position])
+            position += 1
+    return "".join(parts)
+
+
+class TranscriptIndex:
+    """
+    Полнотекстовый индекс транскрипций в SQLite (FTS5) рядом с папкой transcriptions.
+
+    Каждая запись хранится целиком (текст, язык, длительность, исходный файл)
+    и по сегментам с таймкодами; искать можно сегменты. Записи добавляются
+    сервисом по мере распознавания, повторное распознавание того же файла
+    заменяет старую запись. WAL позволяет читать индекс (поиск из CLI или
+    HTTP), пока сервис пишет.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Своё соединение на поток: сервис пишет из основного цикла, поиск идёт из потоков HTTP
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def add(self, file: str, result: dict, digest: Optional[str] = None, duration: Optional[float] = None,
+            source: Optional[str] = None):
+        """
+        Добавляет (или заменяет) транскрипцию файла file. result — как у model.transcribe():
+        text, language, segments со start/end/text.
+        """
+        segments = [(float(seg.get("start", 0)), float(seg.get("end", 0)), seg.get("text", "").strip())
+                    for seg in result.get("segments") or []]
+        text = (result.get("text") or "").strip()
+        if not segments and text:
+            segments = [(0.0, float(duration or 0), text)]
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM transcripts WHERE file = ?", (file,))
+            cursor = conn.execute(
+                "INSERT INTO transcripts (file, digest, language, duration, source, text, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file, digest, result.get("language"), duration, source, text, time.time()))
+            transcript_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO segments (transcript_id, start, end, text, search_text) VALUES (?, ?, ?, ?, ?)",
+                [(transcript_id, start, end, seg_text, normalize(seg_text))
+                 for start, end, seg_text in segments if seg_text])
+
+    def has(self, file: str) -> bool:
+        return self._connect().execute("SELECT 1 FROM transcripts WHERE file = ?", (file,)).fetchone() is not None
+
+    def search(self, text: str, limit: int = DEFAULT_LIMIT, raw: bool = False) -> List[dict]:
+        """
+        Сегменты, подходящие под запрос, от самых релевантных (bm25).
+        raw=True — text уже в синтаксисе FTS5 (фразы, OR, NEAR).
+        """
+        query = normalize(text) if raw else fts_query(text)
+        if not query:
+            return []
+        rows = self._connect().execute(
+            "SELECT t.file, t.source, t.language, t.duration, s.start, s.end, s.text, s.search_text, "
+            "snippet(segments_fts, 0, char(2), char(3), char(1), 12) AS snippet "
+            "FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid "
+            "JOIN transcripts t ON t.id = s.transcript_id "
+            "WHERE segments_fts MATCH ? ORDER BY rank LIMIT ?", (query, limit)).fetchall()
+        hits = []
+        for row in rows:
+            hit = dict(row)
+            hit["snippet"] = display_snippet(hit["snippet"], hit["text"], hit.pop("search_text"))
+            hits.append(hit)
+        return hits
+
+    def transcript(self, file: str) -> Optional[dict]:
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM transcripts WHERE file = ?", (file,)).fetchone()
+        if row is None:
+            return None
+        result = dict(row)
+        result["segments"] = [dict(seg) for seg in conn.execute(
+            "SELECT start, end, text FROM segments WHERE transcript_id = ? ORDER BY start", (row["id"],))]
+        return result
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        return {
+            "path": self.path,
+            "transcripts": conn.execute("SELECT count(*) FROM transcripts").fetchone()[0],
+            "segments": conn.execute("SELECT count(*) FROM segments").fetchone()[0],
+        }
+
+    def backfill(self, output_dir: str) -> int:
+        """
+        Индексирует транскрипции, записанные до появления индекса: <имя>.json
+        от whisper (с сегментами), иначе <имя>.txt одним сегментом.
+        """
+        added = 0
+        try:
+            names = sorted(os.listdir(output_dir))
+        except OSError as e:
+            log.warning("Cannot list %s: %s", output_dir, e)
+            return 0
+        stems = {}
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext in (".json", ".txt") and not stem.endswith(".partial"):
+                # .json приоритетнее: в нём есть таймкоды
+                if stems.get(stem) != ".json":
+                    stems[stem] = ext
+        for stem, ext in stems.items():
+            if self.has(stem):
+                continue
+            path = os.path.join(output_dir, stem + ext)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    result = json.load(f) if ext == ".json" else {"text": f.read()}
+            except (OSError, ValueError) as e:
+                log.warning("Skipping %s: %s", path, e)
+                continue
+            if not isinstance(result, dict):
+                continue
+            self.add(stem, result, source=path)
+            added += 1
+        return added
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def serve_search(index: TranscriptIndex, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    HTTP-поиск для n8n (узел HTTP Request): GET /search?q=...&limit=20,
+    GET /transcript?file=..., GET /stats. Сервер крутится в фоновом потоке.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status: int, payload):
+            raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                if url.path == "/search":
+                    started = time.perf_counter()
+                    limit = int(params.get("limit", DEFAULT_LIMIT))
+                    hits = index.search(params.get("q", ""), limit, raw=params.get("raw") == "1")
+                    self.reply(200, {"hits": hits, "took_ms": round((time.perf_counter() - started) * 1000, 2)})
+                elif url.path == "/transcript":
+                    found = index.transcript(params.get("file", ""))
+                    self.reply(200 if found else 404, found or {"error": "not found"})
+                elif url.path == "/stats":
+                    self.reply(200, index.stats())
+                else:
+                    self.reply(404, {"error": "not found"})
+            except (sqlite3.Error, ValueError) as e:
+                self.reply(400, {"error": str(e)})
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="transcriber-search", daemon=True).start()
+    log.info("Transcript search on http://%s:%d/search", host, port)
+    return server
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m transcriber.index",
+                                     description="Поиск по индексу транскрипций")
+    parser.add_argument("--db", default=os.environ.get("TRANSCRIBER_INDEX", "/transcriptions/.transcriber/index.sqlite"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    search = sub.add_parser("search", help="найти сегменты")
+    search.add_argument("query", nargs="+")
+    search.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    search.add_argument("--raw", action="store_true", help="запрос в синтаксисе FTS5")
+    search.add_argument("--json", action="store_true")
+    show = sub.add_parser("show", help="транскрипция файла целиком")
+    show.add_argument("file")
+    backfill = sub.add_parser("backfill", help="проиндексировать уже готовые транскрипции")
+    backfill.add_argument("output_dir", nargs="?", default=os.environ.get("TRANSCRIPTIONS_DIR", "/transcriptions"))
+    sub.add_parser("stats")
+    args = parser.parse_args(argv)
+
+    index = TranscriptIndex(args.db)
+    if args.command == "search":
+        started = time.perf_counter()
+        try:
+            hits = index.search(" ".join(args.query), args.limit, raw=args.raw)
+        except sqlite3.Error as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        took = (time.perf_counter() - started) * 1000
+        if args.json:
+            print(json.dumps({"hits": hits, "took_ms": round(took, 2)}, ensure_ascii=False))
+        else:
+            for hit in hits:
+                print(f"{hit['file']} [{hit['start']:.1f}–{hit['end']:.1f}] {hit['snippet']}")
+            print(f"Найдено: {len(hits)} за {took:.1f} мс", file=sys.stderr)
+    elif args.command == "show":
+        found = index.transcript(args.file)
+        if found is None:
+            print(f"❌ {args.file} нет в индексе", file=sys.stderr)
+            return 1
+        print(json.dumps(found, ensure_ascii=False, indent=2))
+    elif args.command == "backfill":
+        print(f"Добавлено в индекс: {index.backfill(args.output_dir)}")
+    else:
+        print(json.dumps(index.stats(), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+from typing import List
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyUnavailable(OSError):
+    """
+    inotify не поддерживается (не Linux, нет libc или файловая система не отдаёт события).
+    """
+
+
+class Inotify:
+    """
+    Минимальная обёртка над inotify(7) через ctypes — без сторонних зависимостей.
+
+    По умолчанию следит за завершённой записью (IN_CLOSE_WRITE) и переносом
+    файла в папку (IN_MOVED_TO): в обоих случаях файл уже целиком на месте.
+    """
+    def __init__(self, path: str, mask: int = IN_CLOSE_WRITE | IN_MOVED_TO):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise InotifyUnavailable("libc не найдена")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise InotifyUnavailable("inotify_init1 недоступна")
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise InotifyUnavailable(ctypes.get_errno(), "inotify_init1")
+        self._libc = libc
+        self.mask = mask
+        self.paths = {}  # дескриптор наблюдения → папка
+        self.path = path
+        self.overflowed = False
+        try:
+            self.add_watch(path)
+        except InotifyUnavailable:
+            os.close(self.fd)
+            raise
+
+    def add_watch(self, path: str):
+        """
+        Ещё одна папка в том же наблюдателе (например, audio/priority).
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.mask)
+        if wd < 0:
+            raise InotifyUnavailable(ctypes.get_errno(), f"inotify_add_watch {path}")
+        self.paths[wd] = path
+
+    def read(self, timeout: float) -> List[str]:
+        """
+        Ждёт события до timeout секунд и возвращает полные пути файлов.
+        При переполнении очереди ядра выставляет overflowed — нужен полный rescan.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths = []
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+            elif name and not mask & IN_ISDIR and wd in self.paths:
+                paths.append(os.path.join(self.paths[wd], os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
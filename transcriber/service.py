@@ -0,0 +1,527 @@
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Optional
+
+from transcriber.backends import WHISPER, BackendSettings, create_backend, default_threads, load_audio
+from transcriber.claims import ClaimStore
+from transcriber.cache import TranscriptCache, cache_key, file_digest
+from transcriber.index import TranscriptIndex
+from transcriber.inotify import Inotify, InotifyUnavailable
+from transcriber.webhook import WebhookNotifier, completion_event
+
+log = logging.getLogger("transcriber")
+
+# Файлы, которые точно не аудио (about.txt в папке audio, недокачанные файлы)
+SKIP_SUFFIXES = (".txt", ".md", ".json", ".part", ".tmp", ".crdownload", ".partial")
+
+# Сколько последних замеров по файлам хранить для статистики
+TIMINGS_HISTORY = 100
+
+# Ротация trace.jsonl: спаны того же формата, что eva.tracing в лаунчере
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUPS = 3
+
+# Порядок разбора очереди: по mtime, по размеру или по имени; файлы из priority/ всегда раньше
+ORDERS = ("oldest", "newest", "smallest", "name")
+PRIORITY_DIR = "priority"
+
+# Что пишет get_writer("all") в whisper.utils
+OUTPUT_EXTENSIONS = ("txt", "vtt", "srt", "tsv", "json")
+
+
+def parse_formats(value: str) -> tuple:
+    """
+    "all" → все форматы whisper, "txt,srt" → только они, "none"/"" → без файлов (только индекс).
+    """
+    value = (value or "").strip().lower()
+    if value == "all":
+        return OUTPUT_EXTENSIONS
+    formats = tuple(fmt.strip() for fmt in value.split(",") if fmt.strip() and fmt.strip() != "none")
+    unknown = [fmt for fmt in formats if fmt not in OUTPUT_EXTENSIONS]
+    if unknown:
+        raise ValueError(f"unknown output format(s): {', '.join(unknown)}")
+    return formats
+
+
+def is_candidate(path: str) -> bool:
+    name = os.path.basename(path)
+    return (not name.startswith(".") and not name.lower().endswith(SKIP_SUFFIXES)
+            and os.path.isfile(path))
+
+
+class TranscriptionService:
+    """
+    Долгоживущий воркер транскрибации вместо цикла `sleep 5` в process_audio.sh.
+
+    Модель загружается один раз при старте и остаётся в памяти. Новые
+    файлы попадают в очередь по событиям inotify; rescan раз в rescan_interval
+    (по умолчанию 5 с, как прежний цикл) страхует от пропущенных событий —
+    bind mount с хоста Windows их не доставляет вовсе. Состояние очереди
+    и время по каждому файлу пишутся в status_file (JSON).
+
+    Длинные записи режутся по паузам на фрагменты ~chunk_seconds с перекрытием.
+    При workers > 1 фрагменты распознаются пулом процессов (по модели на процесс,
+    модели в основном процессе нет), иначе — по очереди резидентной моделью.
+    Готовые сегменты по порядку дописываются в <имя>.partial.txt.
+
+    Если задан cache, запись с тем же содержимым и настройками распознавания
+    не распознаётся повторно: итоговые файлы пишутся из кэша.
+
+    Если задан notifier, о каждом готовом (или упавшем) файле сразу уходит
+    событие в вебхук n8n; итоговые файлы в output_dir пишутся как раньше.
+
+    output_format — "all" или список через запятую ("txt,srt"); если задан
+    index, каждая транскрипция с сегментами попадает в полнотекстовый индекс.
+    Если задан trace_file, загрузка модели и каждый файл пишутся спанами в JSONL с ротацией.
+
+    Движок распознавания (openai-whisper или faster-whisper int8), размер модели,
+    потоки и beam задаются settings (BackendSettings); model_name — для совместимости.
+
+    Если задан claims (ClaimStore), папку audio разбирают несколько обработчиков:
+    файл перед обработкой захватывается атомарным переносом, чужие захваченные файлы
+    пропускаются, файлы упавших обработчиков возвращаются в очередь. Очередь
+    упорядочена по order; файлы из подпапки priority_dir идут первыми.
+    """
+    def __init__(self, audio_dir: str, output_dir: str, model_name: str = "medium",
+                 language: Optional[str] = "Russian", output_format: str = "txt",
+                 status_file: Optional[str] = None, rescan_interval: float = 5.0,
+                 settle_seconds: float = 2.0, workers: int = 1, chunk_seconds: float = 60.0,
+                 chunk_overlap: float = 1.0, cache: Optional[TranscriptCache] = None,
+                 notifier: Optional[WebhookNotifier] = None, index: Optional[TranscriptIndex] = None,
+                 trace_file: Optional[str] = None, settings: Optional[BackendSettings] = None,
+                 claims: Optional[ClaimStore] = None, order: str = "oldest",
+                 priority_dir: Optional[str] = PRIORITY_DIR):
+        if order not in ORDERS:
+            raise ValueError(f"unknown order {order!r}, expected one of: {', '.join(ORDERS)}")
+        self.audio_dir = audio_dir
+        self.output_dir = output_dir
+        self.processed_dir = os.path.join(audio_dir, "processed")
+        self.failed_dir = os.path.join(audio_dir, "failed")
+        self.settings = settings or BackendSettings(model=model_name)
+        self.model_name = self.settings.model
+        self.language = language
+        self.output_format = output_format
+        self.formats = parse_formats(output_format)
+        self.status_file = status_file
+        self.rescan_interval = rescan_interval
+        self.settle_seconds = settle_seconds
+        self.workers = max(1, workers)
+        self.chunk_seconds = chunk_seconds
+        self.chunk_overlap = chunk_overlap
+        self.cache = cache
+        self.notifier = notifier
+        self.index = index
+        self.tracer = self._make_tracer(trace_file) if trace_file else None
+        self.claims = claims
+        self.order = order
+        self.priority_dir = os.path.join(audio_dir, priority_dir) if priority_dir else None
+
+        self.backend = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.model_load_seconds = 0.0
+        # (приоритет, ключ порядка, номер, путь) — номер сохраняет порядок при равных ключах
+        self.queue: "queue.PriorityQueue[tuple]" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self.queued: Dict[str, float] = {}  # путь → когда поставлен в очередь
+        self.current: Optional[str] = None
+        self.processed = 0
+        self.failed = 0
+        self.cache_hits = 0  # из processed — готовы из кэша, без распознавания
+        self.timings: deque = deque(maxlen=TIMINGS_HISTORY)
+        self.watch_mode = "inotify"
+        self.stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    # --- модель ---
+
+    def load_model(self):
+        started = time.monotonic()
+        if self.workers > 1:
+            import multiprocessing
+
+            from transcriber.chunking import init_worker, worker_backend
+
+            # spawn, а не fork: torch плохо переносит fork после инициализации потоков
+            settings = self.settings._replace(threads=self.settings.threads or default_threads(self.workers))
+            log.info("Starting %d transcription workers (%s)...", self.workers, settings.label())
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker, initargs=(settings, self.language))
+            # Прогреваем: модели загружаются сейчас, а не на первом файле
+            backend = list(self.pool.map(worker_backend, range(self.workers)))[0]
+        else:
+            log.info("Loading model %s...", self.settings.label())
+            self.backend = create_backend(self.settings, self.language)
+            self.backend.load()
+            backend = self.backend.settings.backend
+        # Ключ кэша и статистика — по движку, который реально распознаёт, а не по запрошенному
+        self.settings = self.settings._replace(backend=backend)
+        self.model_load_seconds = time.monotonic() - started
+        self.trace("model.load", self.model_load_seconds, "ok", model=self.settings.label(), workers=self.workers)
+        log.info("Model %s loaded in %.1f s", self.settings.label(), self.model_load_seconds)
+
+    def cache_settings(self) -> dict:
+        """
+        Всё, от чего зависит результат распознавания и набор итоговых файлов.
+        """
+        return {
+            "backend": self.settings.backend,
+            "model": self.model_name,
+            "beam_size": self.settings.beam_size,
+            "compute_type": self.settings.compute_type if self.settings.backend != WHISPER else None,
+            "language": self.language,
+            "output_format": ",".join(self.formats),
+            "chunk_seconds": self.chunk_seconds,
+            "chunk_overlap": self.chunk_overlap,
+        }
+
+    def partial_path(self, path: str) -> str:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.output_dir, stem + ".partial.txt")
+
+    def transcribe(self, path: str, timing: Optional[dict] = None) -> dict:
+        from transcriber import chunking
+
+        timing = timing if timing is not None else {}
+        audio = load_audio(path)
+        timing["audio_seconds"] = round(len(audio) / chunking.SAMPLE_RATE, 3)
+        if not self.chunk_seconds or len(audio) < self.chunk_seconds * 1.5 * chunking.SAMPLE_RATE:
+            timing["chunks"] = 1
+            if self.pool is not None:
+                return self.pool.submit(chunking.transcribe_chunk, audio).result()
+            return self.backend.transcribe(audio)
+
+        chunks = chunking.make_chunks(audio, self.chunk_seconds, self.chunk_overlap)
+        timing["chunks"] = len(chunks)
+        partial = chunking.PartialTranscript(self.partial_path(path))
+        emitter = chunking.InOrderEmitter(partial.append)
+        segments = [[] for _ in chunks]
+        language = None
+        if self.pool is not None:
+            futures = {self.pool.submit(chunking.transcribe_chunk, audio[chunk.start:chunk.end]): chunk
+                       for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                result = future.result()
+                language = language or result.get("language")
+                segments[chunk.index] = chunking.shift_segments(result, chunk)
+                emitter.add(chunk.index, segments[chunk.index])
+        else:
+            for chunk in chunks:
+                result = self.backend.transcribe(audio[chunk.start:chunk.end])
+                language = language or result.get("language")
+                segments[chunk.index] = chunking.shift_segments(result, chunk)
+                emitter.add(chunk.index, segments[chunk.index])
+        return chunking.merge_results(segments, language)
+
+    def output_paths(self, path: str) -> Dict[str, str]:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return {fmt: os.path.join(self.output_dir, f"{stem}.{fmt}") for fmt in self.formats}
+
+    def write_outputs(self, result: dict, path: str):
+        os.makedirs(self.output_dir, exist_ok=True)
+        try:
+            from whisper.utils import get_writer
+        except ImportError:
+            # Образ только с faster-whisper — те же форматы своими писателями
+            from transcriber.writers import write_result
+            for fmt in self.formats:
+                write_result(result, path, self.output_dir, fmt)
+            return
+        options = {"highlight_words": False, "max_line_count": None, "max_line_width": None}
+        for fmt in self.formats:
+            writer = get_writer(fmt, self.output_dir)
+            try:
+                writer(result, path, options)
+            except TypeError:
+                # Старые версии openai-whisper: writer(result, audio_path)
+                writer(result, path)
+
+    # --- трассировка ---
+
+    @staticmethod
+    def _make_tracer(path: str) -> Optional[logging.Logger]:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(path, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS,
+                                                           encoding="utf-8", delay=True)
+        except OSError as e:
+            log.warning("Cannot open trace file %s: %s", path, e)
+            return None
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        tracer = logging.getLogger("transcriber.trace")
+        tracer.propagate = False
+        tracer.setLevel(logging.INFO)
+        tracer.addHandler(handler)
+        return tracer
+
+    def trace(self, name: str, duration: float, status: str, **attrs):
+        if self.tracer is None:
+            return
+        record = {"ts": round(time.time() - duration, 3), "name": name, "duration": round(duration, 4),
+                  "status": status, "attrs": attrs}
+        self.tracer.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    # --- очередь ---
+
+    def sort_key(self, path: str) -> tuple:
+        priority = 0 if self.priority_dir and os.path.dirname(path) == os.path.abspath(self.priority_dir) else 1
+        if self.order == "name":
+            return priority, os.path.basename(path)
+        stat = os.stat(path)
+        if self.order == "smallest":
+            return priority, stat.st_size
+        return priority, -stat.st_mtime if self.order == "newest" else stat.st_mtime
+
+    def enqueue(self, path: str):
+        path = os.path.abspath(path)
+        try:
+            key = self.sort_key(path)
+        except OSError:
+            return  # файл уже забрал другой обработчик
+        with self._lock:
+            if path in self.queued or path == self.current:
+                return
+            self.queued[path] = time.monotonic()
+        self.queue.put((key[0], key[1], next(self._sequence), path))
+        log.info("Queued %s (queue depth %d)", os.path.basename(path), self.queue.qsize())
+        self.write_status()
+
+    def scan(self):
+        """
+        Полный обход папки: подхватывает файлы, появившиеся до старта или без события inotify.
+        Недописанные файлы (mtime моложе settle_seconds) пропускаются до следующего обхода.
+        """
+        for folder in self.inbox_dirs():
+            try:
+                names = sorted(os.listdir(folder))
+            except OSError as e:
+                log.warning("Cannot list %s: %s", folder, e)
+                continue
+            now = time.time()
+            for name in names:
+                path = os.path.join(folder, name)
+                if not is_candidate(path):
+                    continue
+                try:
+                    if now - os.path.getmtime(path) < self.settle_seconds:
+                        continue
+                except OSError:
+                    continue
+                self.enqueue(path)
+
+    def inbox_dirs(self) -> list:
+        return [self.priority_dir, self.audio_dir] if self.priority_dir else [self.audio_dir]
+
+    def watch(self):
+        """
+        Поток-наблюдатель: inotify, если доступен, иначе только периодический scan().
+        """
+        notifier = None
+        try:
+            notifier = Inotify(self.audio_dir)
+            if self.priority_dir:
+                notifier.add_watch(self.priority_dir)
+        except InotifyUnavailable as e:
+            if notifier is not None:
+                notifier.close()
+            log.warning("inotify unavailable (%s), falling back to rescans every %.0f s", e, self.rescan_interval)
+            self.watch_mode = "rescan"
+            notifier = None
+        last_scan = time.monotonic()
+        try:
+            while not self.stop_event.is_set():
+                if notifier is None:
+                    self.stop_event.wait(self.rescan_interval)
+                    self.scan()
+                    continue
+                for path in notifier.read(timeout=1.0):
+                    if is_candidate(path):
+                        self.enqueue(path)
+                if notifier.overflowed or time.monotonic() - last_scan >= self.rescan_interval:
+                    notifier.overflowed = False
+                    last_scan = time.monotonic()
+                    self.scan()
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+    # --- обработка ---
+
+    def _move(self, path: str, target_dir: str):
+        os.makedirs(target_dir, exist_ok=True)
+        shutil.move(path, os.path.join(target_dir, os.path.basename(path)))
+
+    def process(self, path: str):
+        name = os.path.basename(path)
+        with self._lock:
+            queued_at = self.queued.pop(path, time.monotonic())
+        if self.claims is not None:
+            try:
+                claimed = self.claims.claim(path)
+            except OSError as e:  # например, файл ещё открыт записывающим процессом — подберёт rescan
+                log.warning("Cannot claim %s: %s", name, e)
+                return
+            if claimed is None:
+                log.info("Skipping %s: claimed by another worker", name)
+                return
+            path = claimed
+        with self._lock:
+            self.current = path
+        self.write_status()
+        started = time.monotonic()
+        timing = {"file": name, "wait_seconds": round(started - queued_at, 3)}
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        result = None
+        try:
+            if not os.path.exists(path):
+                timing["status"] = "missing"
+                return
+            log.info("Processing file: %s", name)
+            key = None
+            digest = file_digest(path) if self.cache is not None or self.index is not None else None
+            if self.cache is not None:
+                key = cache_key(digest, self.cache_settings())
+                result = self.cache.get(key)
+                timing["cached"] = result is not None
+            if result is None:
+                result = self.transcribe(path, timing)
+                if key is not None:
+                    self.cache.put(key, result)
+            timing["inference_seconds"] = round(time.monotonic() - started, 3)
+            self.write_outputs(result, path)
+            if self.index is not None:
+                try:
+                    self.index.add(os.path.splitext(name)[0], result, digest=digest,
+                                   duration=timing.get("audio_seconds"), source=name)
+                except sqlite3.Error as e:  # индекс вторичен — файлы уже записаны
+                    log.warning("Cannot index %s: %s", name, e)
+            self._move(path, self.processed_dir)
+            timing["status"] = "ok"
+            self.processed += 1
+            if timing.get("cached"):
+                self.cache_hits += 1
+            log.info("Transcription of %s complete in %.1f s", name, timing["inference_seconds"])
+        except Exception as e:  # файл не должен уронить сервис — перекладываем в failed/
+            log.exception("Transcription of %s failed", name)
+            timing["status"] = "failed"
+            timing["error"] = str(e)
+            self.failed += 1
+            if os.path.exists(path):
+                try:
+                    self._move(path, self.failed_dir)
+                except OSError as move_error:  # иначе исключение уйдёт из finally и остановит обработчик
+                    log.error("Cannot move %s to failed/: %s", name, move_error)
+        finally:
+            if os.path.exists(self.partial_path(path)):
+                os.remove(self.partial_path(path))
+            timing["total_seconds"] = round(time.monotonic() - queued_at, 3)
+            timing["finished_at"] = time.time()
+            self.trace("transcribe.file", time.monotonic() - started, timing["status"], bytes=size,
+                       **{key: value for key, value in timing.items() if key not in ("status", "finished_at")})
+            with self._lock:
+                self.current = None
+                self.timings.append(timing)
+            if self.notifier is not None and timing["status"] != "missing":
+                outputs = self.output_paths(path) if timing["status"] == "ok" else {}
+                self.notifier.notify(completion_event(name, outputs, result, dict(timing)))
+            self.write_status()
+
+    # --- статистика ---
+
+    def stats(self) -> dict:
+        with self._lock:
+            timings = list(self.timings)
+            current = self.current
+        # Попадания в кэш длятся миллисекунды — в среднем времени распознавания их не учитываем
+        done = [t for t in timings if t.get("status") == "ok" and not t.get("cached")]
+        return {
+            "model": self.settings.label(),
+            "worker_id": self.claims.worker_id if self.claims is not None else None,
+            "order": self.order,
+            "model_load_seconds": round(self.model_load_seconds, 3),
+            "watch_mode": self.watch_mode,
+            "queue_depth": self.queue.qsize(),
+            "current": os.path.basename(current) if current else None,
+            "processed": self.processed,
+            "failed": self.failed,
+            "cache_hits": self.cache_hits,
+            "avg_inference_seconds": round(sum(t["inference_seconds"] for t in done) / len(done), 3) if done else None,
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "webhook": self.notifier.stats() if self.notifier is not None else None,
+            "index": self.index.stats() if self.index is not None else None,
+            "recent": timings[-20:],
+            "updated_at": time.time(),
+        }
+
+    def write_status(self):
+        if not self.status_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
+            tmp = self.status_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.stats(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.status_file)
+        except OSError as e:
+            log.warning("Cannot write status file %s: %s", self.status_file, e)
+
+    # --- основной цикл ---
+
+    def keep_claims(self):
+        """
+        Поток захватов: обновляет свой .heartbeat и возвращает в очередь файлы упавших обработчиков.
+        """
+        while not self.stop_event.wait(self.claims.heartbeat_interval):
+            try:
+                self.claims.heartbeat()
+                self.claims.recover_stale()
+            except OSError as e:
+                log.warning("Claim heartbeat failed: %s", e)
+
+    def run(self):
+        os.makedirs(self.processed_dir, exist_ok=True)
+        if self.priority_dir:
+            os.makedirs(self.priority_dir, exist_ok=True)
+        if self.claims is not None:
+            self.claims.recover_own()
+            self.claims.heartbeat()
+            self.claims.recover_stale()
+            threading.Thread(target=self.keep_claims, name="transcriber-claims", daemon=True).start()
+            log.info("Worker %s, queue order: %s", self.claims.worker_id, self.order)
+        if self.backend is None and self.pool is None:
+            self.load_model()
+        if self.notifier is not None:
+            self.notifier.start()
+        watcher = threading.Thread(target=self.watch, name="transcriber-watch", daemon=True)
+        watcher.start()
+        log.info("Whisper is watching for files in %s (%s)...", self.audio_dir, self.watch_mode)
+        self.scan()
+        while not self.stop_event.is_set():
+            try:
+                path = self.queue.get(timeout=1.0)[-1]
+            except queue.Empty:
+                continue
+            self.process(path)
+        if self.claims is not None:
+            self.claims.close()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.notifier is not None:
+            self.notifier.stop()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,68 @@
+import logging
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+log = logging.getLogger("transcriber")
+
+RESTART_DELAY = 5.0
+
+
+class WorkerSupervisor:
+    """
+    Несколько обработчиков одной папки audio в одном контейнере whisper.
+
+    Entrypoint (`python -m transcriber --inbox-workers N`) не распознаёт сам,
+    а держит N дочерних `python -m transcriber` с постоянными worker_id
+    <base>-1..N: файлы делят через ClaimStore, упавший процесс перезапускается
+    через RESTART_DELAY секунд и возвращает свои захваченные файлы (recover_own),
+    а SIGTERM от `docker stop` передаётся всем — каждый дорабатывает текущий файл.
+    HTTP-поиск поднимает только первый обработчик.
+    """
+    def __init__(self, argv: List[str], count: int, base_id: Optional[str] = None):
+        self.argv = list(argv)
+        self.count = count
+        self.base_id = base_id or socket.gethostname()
+        self.procs: Dict[int, subprocess.Popen] = {}
+        self._stopped = False
+
+    def command(self, number: int) -> List[str]:
+        # Последнее значение опции в argparse побеждает — дочерний процесс не станет супервизором снова
+        args = [sys.executable, "-m", "transcriber", *self.argv,
+                "--inbox-workers", "1", "--worker-id", f"{self.base_id}-{number}"]
+        if number > 1:
+            args += ["--search-port", "0"]
+        return args
+
+    def spawn(self, number: int):
+        self.procs[number] = subprocess.Popen(self.command(number))
+        log.info("Started transcriber worker %s-%d (pid %d)", self.base_id, number, self.procs[number].pid)
+
+    def stop(self):
+        self._stopped = True
+        for proc in self.procs.values():
+            if proc.poll() is None:
+                proc.send_signal(signal.SIGTERM)
+
+    def run(self) -> int:
+        for number in range(1, self.count + 1):
+            self.spawn(number)
+        restart_at: Dict[int, float] = {}
+        while not self._stopped:
+            for number, proc in self.procs.items():
+                if number not in restart_at and proc.poll() is not None:
+                    log.warning("Transcriber worker %s-%d exited with code %s, restart in %.1f s",
+                                self.base_id, number, proc.returncode, RESTART_DELAY)
+                    restart_at[number] = time.monotonic() + RESTART_DELAY
+            for number, deadline in list(restart_at.items()):
+                if time.monotonic() >= deadline and not self._stopped:
+                    del restart_at[number]
+                    self.spawn(number)
+            time.sleep(0.5)
+        self.stop()  # SIGTERM мог прийти, пока запускались не все обработчики
+        for proc in self.procs.values():
+            proc.wait()
+        return max((proc.returncode or 0 for proc in self.procs.values()), default=0)
@@ -0,0 +1,185 @@
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from typing import Optional
+
+log = logging.getLogger("transcriber")
+
+COMPLETED = "transcription.completed"
+FAILED = "transcription.failed"
+
+RETRYABLE_STATUS = {408, 429}  # из 4xx повторять имеет смысл только тайм-аут и «слишком часто»
+
+
+class WebhookNotifier:
+    """
+    Доставка событий транскрибации в вебхук n8n вместо опроса папки transcriptions.
+
+    События отправляются фоновым потоком по порядку. Пока n8n недоступен,
+    они ждут в ограниченной очереди (max_queue; при переполнении выбрасываются
+    самые старые — файлы в transcriptions всё равно остаются запасным путём)
+    с экспоненциальной паузой между попытками от retry_min до retry_max секунд.
+    Ответ 4xx (кроме 408 и 429) повтором не исправить — такое событие
+    выбрасывается с записью в лог, чтобы не застопорить очередь за ним.
+    Если задан spool_file, очередь переживает перезапуск контейнера.
+    """
+    def __init__(self, url: str, max_queue: int = 200, timeout: float = 10.0,
+                 retry_min: float = 1.0, retry_max: float = 60.0, spool_file: Optional[str] = None):
+        self.url = url
+        self.timeout = timeout
+        self.retry_min = retry_min
+        self.retry_max = retry_max
+        self.spool_file = spool_file
+        self.pending: deque = deque(maxlen=max(1, max_queue))
+        self.sent = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._load_spool()
+        self._thread = threading.Thread(target=self._run, name="transcriber-webhook", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def notify(self, event: dict):
+        with self._cond:
+            if len(self.pending) == self.pending.maxlen:
+                self.dropped += 1
+                log.warning("Webhook queue full, dropping event for %s", self.pending[0].get("file"))
+            self.pending.append(event)
+            self._save_spool()
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "url": self.url,
+                "pending": len(self.pending),
+                "sent": self.sent,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+            }
+
+    def post(self, event: dict):
+        data = json.dumps(event, ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(self.url, data=data, method="POST",
+                                         headers={"Content-Type": "application/json; charset=utf-8"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def _run(self):
+        delay = self.retry_min
+        while True:
+            with self._cond:
+                while not self.pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                event = self.pending[0]
+            try:
+                self.post(event)
+            except urllib.error.HTTPError as e:
+                if 400 <= e.code < 500 and e.code not in RETRYABLE_STATUS:
+                    # Битое тело или неверный адрес вебхука — повтор не поможет
+                    log.error("Webhook rejected event for %s (%s), dropping it", event.get("file"), e)
+                    delay = self.retry_min
+                    self._finish(event, error=str(e))
+                    continue
+                delay = self._backoff(e, delay)
+                continue
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                # n8n остановлен, перезапускается или отвечает 5xx — ждём и повторяем
+                delay = self._backoff(e, delay)
+                continue
+            delay = self.retry_min
+            self._finish(event)
+
+    def _backoff(self, error: Exception, delay: float) -> float:
+        """
+        Пауза перед повтором до крайнего срока next_attempt: новые события
+        (notify будит поток) и ложные пробуждения её не сокращают, только stop().
+        """
+        with self._cond:
+            self.last_error = str(error)
+            log.warning("Webhook delivery failed (%s), retry in %.1f s, %d pending",
+                        error, delay, len(self.pending))
+            next_attempt = time.monotonic() + delay
+            while not self._stopped:
+                remaining = next_attempt - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return min(delay * 2, self.retry_max)
+
+    def _finish(self, event: dict, error: Optional[str] = None):
+        with self._cond:
+            # За время отправки событие могло вытеснить переполнение очереди
+            if self.pending and self.pending[0] is event:
+                self.pending.popleft()
+            if error is None:
+                self.sent += 1
+            else:
+                self.rejected += 1
+            self.last_error = error
+            self._save_spool()
+
+    def _load_spool(self):
+        if not self.spool_file:
+            return
+        try:
+            with open(self.spool_file, encoding="utf-8") as f:
+                self.pending.extend(json.load(f))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.warning("Cannot read webhook spool %s: %s", self.spool_file, e)
+            return
+        if self.pending:
+            log.info("Restored %d undelivered webhook events", len(self.pending))
+
+    def _save_spool(self):
+        if not self.spool_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.spool_file), exist_ok=True)
+            tmp = self.spool_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(list(self.pending), f, ensure_ascii=False)
+            os.replace(tmp, self.spool_file)
+        except OSError as e:
+            log.warning("Cannot write webhook spool %s: %s", self.spool_file, e)
+
+
+def completion_event(name: str, outputs: dict, result: Optional[dict], timing: dict) -> dict:
+    """
+    Тело события для n8n: имя аудиофайла, пути итоговых файлов (в /transcriptions,
+    смонтированной в n8n по тому же пути), длительность, замеры и сам текст.
+    """
+    ok = timing.get("status") == "ok"
+    return {
+        "event": COMPLETED if ok else FAILED,
+        "file": name,
+        "transcript": outputs.get("txt") or next(iter(outputs.values()), None),
+        "outputs": outputs,
+        "text": (result or {}).get("text", "").strip() if ok else None,
+        "language": (result or {}).get("language") if ok else None,
+        "duration": timing.get("audio_seconds"),
+        "error": timing.get("error"),
+        "timings": timing,
+        "sent_at": time.time(),
+    }
@@ -0,0 +1,35 @@
+import json
+import os
+
+from transcriber.chunking import format_timestamp
+
+
+def write_result(result: dict, audio_path: str, output_dir: str, fmt: str):
+    """
+    Итоговый файл в формате whisper.utils.get_writer (txt, srt, vtt, tsv, json) —
+    для образов с faster-whisper, где пакета openai-whisper нет.
+    """
+    stem = os.path.splitext(os.path.basename(audio_path))[0]
+    segments = result.get("segments") or []
+    with open(os.path.join(output_dir, f"{stem}.{fmt}"), "w", encoding="utf-8") as f:
+        if fmt == "txt":
+            for segment in segments:
+                f.write(segment["text"].strip() + "\n")
+        elif fmt == "srt":
+            for index, segment in enumerate(segments, start=1):
+                start, end = format_timestamp(segment["start"], ","), format_timestamp(segment["end"], ",")
+                f.write(f"{index}\n{start} --> {end}\n{segment['text'].strip()}\n\n")
+        elif fmt == "vtt":
+            f.write("WEBVTT\n\n")
+            for segment in segments:
+                f.write(f"{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}\n"
+                        f"{segment['text'].strip()}\n\n")
+        elif fmt == "tsv":
+            f.write("start\tend\ttext\n")
+            for segment in segments:
+                text = segment["text"].strip().replace("\t", " ")
+                f.write(f"{round(segment['start'] * 1000)}\t{round(segment['end'] * 1000)}\t{text}\n")
+        elif fmt == "json":
+            json.dump(result, f, ensure_ascii=False)
+        else:
+            raise ValueError(f"unknown output format: {fmt}")